@@ -5,12 +5,17 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from dotenv import load_dotenv
 load_dotenv()
-from config.database import get_db_connection
+from config.database import get_db_connection, init_app as init_database
+from config.cache import init_app as init_cache
+from config.fragment_cache import init_app as init_fragment_cache
 from controllers.evento_controller import EventoController
 from controllers.restaurante_controller import RestauranteController
 from controllers.dashboard_controller import DashboardController
 from controllers.auth_controller import AuthController
 from controllers.geochat_controller import GeoChatController
+from controllers.busca_controller import BuscaController
+from models.memory_index import carregar_todos
+from migrations.runner import MigrationError, ensure_applied
 from models.restaurante import Restaurante  # opcional se quiser usar em utilitários
 from werkzeug.utils import secure_filename  # opcional se quiser usar em utilitários
 
@@ -32,12 +37,32 @@ app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif'}
 # 🌍 Libera CORS para acesso externo
 CORS(app)
 
+# 🗄️ Pool de conexões: cada requisição devolve sua conexão ao terminar
+init_database(app)
+
+# ⚡ Cache das leituras dos models (hits/misses no cabeçalho Server-Timing)
+init_cache(app)
+
+# 🧩 Cache de fragmentos dos templates ({% cache %}) e do bytecode compilado
+init_fragment_cache(app)
+
+# 🧱 Não sobe com migrações pendentes: models e índices usam as colunas delas
+try:
+    ensure_applied()
+except MigrationError as e:
+    sys.exit(f"❌ {e}")
+
+# 📅 Índices em memória (períodos dos eventos, busca textual, autocompletar)
+with app.app_context():
+    carregar_todos()
+
 # 🚀 Instancia os controllers
 evento_controller = EventoController()
 restaurante_controller = RestauranteController()
 dashboard_controller = DashboardController()
 auth_controller = AuthController()
 geochat_controller = GeoChatController()
+busca_controller = BuscaController()
 
 # 🔗 Importa as rotas (define todas as URLs da aplicação)
 from routes.web import *
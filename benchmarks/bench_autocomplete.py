@@ -0,0 +1,68 @@
+"""
+Benchmark do autocompletar: tempo de montagem e memória do índice de
+prefixos e latência das consultas (p50/p95) para prefixos curtos, que
+casam com muitas sugestões, e longos.
+
+Uso (com o banco configurado no .env):
+    python benchmarks/bench_autocomplete.py [--seed 50000]
+
+--seed insere a quantidade pedida de eventos e de restaurantes sintéticos
+antes de medir (use um banco descartável, por exemplo DB_BACKEND=sqlite).
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import Flask
+from config.database import init_app
+from models.autocomplete import INDICE, Autocomplete
+
+PREFIXOS = ['r', 're', 'sao', 'cal', 'centro h', 'festival de', 'restaurante 0042', 'xyz']
+REPETICOES = 200
+
+
+def percentis(amostras):
+    amostras = sorted(amostras)
+    return amostras[len(amostras) // 2], amostras[int(len(amostras) * 0.95) - 1]
+
+
+def run():
+    inicio = time.perf_counter()
+    INDICE.carregar()
+    montagem = time.perf_counter() - inicio
+    # A memória é medida numa segunda montagem: o tracemalloc deixa a primeira lenta
+    tracemalloc.start()
+    INDICE.carregar()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    with INDICE.usar() as indice:
+        print(f"índice montado em {montagem:.2f} s, {len(indice)} sugestões, "
+              f"{memoria / 1024 / 1024:.1f} MiB")
+
+    for prefixo in PREFIXOS:
+        amostras = []
+        for _ in range(REPETICOES):
+            inicio = time.perf_counter()
+            sugestoes = Autocomplete.sugestoes(prefixo)
+            amostras.append(time.perf_counter() - inicio)
+        p50, p95 = percentis(amostras)
+        primeira = sugestoes[0]['texto'] if sugestoes else '-'
+        print(f"  {prefixo!r:<20} p50={p50 * 1000:6.3f} ms  p95={p95 * 1000:6.3f} ms  "
+              f"{len(sugestoes):>2} sugestões (1ª: {primeira})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0,
+                        help='insere N eventos e N restaurantes sintéticos antes de medir')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        if args.seed:
+            from migrations.explain_check import seed
+            seed(args.seed)
+        run()
@@ -0,0 +1,80 @@
+"""
+Benchmark das distâncias do itinerário do chat: compara o caminho antigo
+(geopy great_circle dentro do min() de cada passo) com a matriz calculada
+pelo NumPy (models/distancias.py), calculada na hora e recortada da matriz
+em memória, para 10, 100 e 1000 pontos.
+
+Uso:
+    python benchmarks/bench_distancias.py [--pontos 10 100 1000]
+
+Não usa o banco: os pontos são gerados em memória.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geopy.distance import great_circle
+from models.distancias import MatrizFixa, comprimento, matriz, vizinho_mais_proximo
+
+# Retângulo aproximado da ilha de São Luís
+LATITUDES = (-2.62, -2.45)
+LONGITUDES = (-44.40, -44.18)
+# Execuções por medida (a menor conta)
+REPETICOES = {10: 200, 100: 20, 1000: 2}
+
+
+def antigo(pontos):
+    """O _generate_itinerary anterior, com great_circle"""
+    distancia = lambda a, b: great_circle(a, b).meters
+    ordenados = [pontos[0]]
+    restantes = pontos[1:]
+    while restantes:
+        mais_perto = min(restantes, key=lambda p: distancia(ordenados[-1], p))
+        ordenados.append(mais_perto)
+        restantes.remove(mais_perto)
+    total = sum(distancia(ordenados[i], ordenados[i + 1]) for i in range(len(ordenados) - 1))
+    return ordenados, total
+
+
+def novo(pontos, distancias_rota):
+    ordem = vizinho_mais_proximo(distancias_rota)
+    return [pontos[i] for i in ordem], comprimento(distancias_rota, ordem)
+
+
+def medir(chamada, repeticoes):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = chamada()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+
+def run(quantidades):
+    random.seed(42)
+    for quantidade in quantidades:
+        pontos = [(random.uniform(*LATITUDES), random.uniform(*LONGITUDES)) for _ in range(quantidade)]
+        fixa = MatrizFixa(pontos, maximo=quantidade)
+        fixa.recortar(pontos[:1])
+        repeticoes = REPETICOES.get(quantidade, 5)
+
+        t_antigo, (ordem_antiga, total_antigo) = medir(lambda: antigo(list(pontos)), repeticoes)
+        t_matriz, _ = medir(lambda: matriz(pontos), repeticoes)
+        t_novo, (ordem_nova, total_novo) = medir(lambda: novo(pontos, matriz(pontos)), repeticoes)
+        t_cache, _ = medir(lambda: novo(pontos, fixa.recortar(pontos)), repeticoes)
+
+        print(f"{quantidade} pontos")
+        print(f"  great_circle no min() (antes)     {t_antigo * 1000:10.3f} ms")
+        print(f"  só a matriz NumPy                  {t_matriz * 1000:10.3f} ms")
+        print(f"  matriz NumPy + vizinho mais perto  {t_novo * 1000:10.3f} ms  ({t_antigo / t_novo:.0f}x)")
+        print(f"  recorte da matriz em memória       {t_cache * 1000:10.3f} ms  ({t_antigo / t_cache:.0f}x)")
+        print(f"  mesma ordem: {ordem_antiga == ordem_nova}, "
+              f"diferença no total: {abs(total_antigo - total_novo):.3f} m de {total_antigo / 1000:.1f} km")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pontos', type=int, nargs='+', default=[10, 100, 1000], help='quantidades de pontos')
+    run(parser.parse_args().pontos)
@@ -0,0 +1,106 @@
+"""
+Benchmark dos filtros por faceta: montagem e memória dos bitmaps e tempo
+de uma página filtrada com as contagens de todas as facetas, em memória e
+com as queries equivalentes no banco (WHERE + GROUP BY por faceta).
+
+Uso (com o banco configurado no .env):
+    python benchmarks/bench_facets.py [--seed 50000]
+
+--seed insere a quantidade pedida de eventos e de restaurantes sintéticos
+antes de medir (use um banco descartável, por exemplo DB_BACKEND=sqlite).
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import Flask
+from config.database import execute_query, init_app
+from models import restaurante
+
+SELECOES = {
+    'culinária': {'tipo_culinaria': ('Italiana',)},
+    'culinária + delivery': {'tipo_culinaria': ('Italiana', 'Japonesa'), 'tem_delivery': (True,)},
+    'bairro + preço + reservas': {'bairro': ('Calhau',), 'faixa_preco': ('$$ - Moderado',),
+                                  'aceita_reservas': (True,)},
+}
+REPETICOES = 30
+
+
+def percentis(amostras):
+    amostras = sorted(amostras)
+    return amostras[len(amostras) // 2], amostras[int(len(amostras) * 0.95) - 1]
+
+
+def _where(selecao, exceto=None):
+    condicoes, params = [], []
+    for faceta, valores in selecao.items():
+        if faceta != exceto:
+            condicoes.append(f"{faceta} IN ({', '.join(['%s'] * len(valores))})")
+            params.extend(valores)
+    return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), params
+
+
+def em_memoria(selecao):
+    with restaurante.FACETAS.usar() as indice:
+        bits = indice.filtro(selecao)
+        ids, _ = indice.pagina(bits, limite=20)
+        contagens = indice.contagens(selecao)
+    return ids, contagens, bits.bit_count()
+
+
+def no_banco(selecao):
+    where, params = _where(selecao)
+    ids = [r['id'] for r in execute_query(
+        f"SELECT id FROM restaurantes{where} ORDER BY nome_restaurante, id LIMIT 20", tuple(params))]
+    contagens = {}
+    for faceta in restaurante.CAMPOS_FACETAS:
+        where, params = _where(selecao, exceto=faceta)
+        linhas = execute_query(f"SELECT {faceta} AS valor, COUNT(*) AS total FROM restaurantes{where} "
+                               f"GROUP BY {faceta}", tuple(params))
+        contagens[faceta] = {r['valor']: r['total'] for r in linhas}
+    return ids, contagens, None
+
+
+def medir(funcao, selecao):
+    amostras = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        funcao(selecao)
+        amostras.append(time.perf_counter() - inicio)
+    return percentis(amostras)
+
+
+def run():
+    inicio = time.perf_counter()
+    restaurante.FACETAS.carregar()
+    montagem = time.perf_counter() - inicio
+    # A memória é medida numa segunda montagem: o tracemalloc deixa a primeira lenta
+    tracemalloc.start()
+    restaurante.FACETAS.carregar()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"restaurantes: bitmaps montados em {montagem:.2f} s, {memoria / 1024 / 1024:.1f} MiB")
+
+    for nome, selecao in SELECOES.items():
+        memoria_p50, memoria_p95 = medir(em_memoria, selecao)
+        banco_p50, banco_p95 = medir(no_banco, selecao)
+        total = em_memoria(selecao)[2]
+        print(f"  {nome:<28} memória p50={memoria_p50 * 1000:6.2f} ms p95={memoria_p95 * 1000:6.2f} ms  "
+              f"banco p50={banco_p50 * 1000:7.1f} ms p95={banco_p95 * 1000:7.1f} ms  ({total} resultados)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0,
+                        help='insere N eventos e N restaurantes sintéticos antes de medir')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        if args.seed:
+            from migrations.explain_check import seed
+            seed(args.seed)
+        run()
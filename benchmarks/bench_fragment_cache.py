@@ -0,0 +1,122 @@
+"""
+Benchmark do cache de fragmentos: tempo de renderização das listagens com
+5 mil cards sem cache, com o cache vazio (primeira renderização), com todos
+os cards em cache e depois de alterar 1% dos cards pelo model (UPDATE de
+verdade, que soma 1 à versao da linha), contando quantos cards foram
+renderizados de novo. Mede também o tempo de compilar os templates numa
+subida a frio, com e sem o cache de bytecode.
+
+Uso (com o banco configurado no .env e as migrações aplicadas):
+    python benchmarks/bench_fragment_cache.py [--cards 5000] [--seed 5000]
+
+--seed insere a quantidade pedida de eventos e de restaurantes sintéticos
+antes de medir (use um banco descartável, por exemplo DB_BACKEND=sqlite).
+Os cards alterados são gravados no banco.
+"""
+import os
+import sys
+import time
+import tempfile
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# As escritas do benchmark não agendam geocodificação
+os.environ.setdefault('GEOCODE_ON_WRITE', '0')
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+from config.database import init_app as init_database, iter_query
+from config.fragment_cache import FragmentCacheExtension, get_fragment_cache_stats, init_app as init_fragment_cache
+from models.evento import Evento
+from models.restaurante import Restaurante
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = ('base.html', 'paginacao.html', 'visitantes.html', 'eventos/index.html', 'restaurantes/index.html')
+# template, tabela, model e nome da variável com os cards
+LISTAGENS = (('eventos/index.html', 'eventos', Evento, 'eventos'),
+             ('restaurantes/index.html', 'restaurantes', Restaurante, 'restaurantes'))
+
+
+def ler_ids(tabela, quantidade):
+    return [r['id'] for r in iter_query(f"SELECT id FROM {tabela} ORDER BY id LIMIT %s", (quantidade,))]
+
+
+def alterar(model, ids):
+    """Regrava cada linha pelo model, como o formulário de edição"""
+    for id in ids:
+        dados = vars(model.get_by_id(id))
+        if not model.update(id, dados):
+            raise RuntimeError(f"Falha ao alterar {model.__name__} {id}")
+
+
+def criar_app(bytecode_dir=None):
+    """App mínimo para renderizar os templates (links de url_for viram '#')"""
+    app = Flask(__name__, template_folder=os.path.join(BASE_DIR, 'templates'))
+    app.url_build_error_handlers.append(lambda error, endpoint, values: '#')
+    # base.html consulta request.endpoint para marcar o menu ativo
+    app.add_url_rule('/listagem', 'listagem', lambda: '')
+    if bytecode_dir is None:
+        init_fragment_cache(app)
+    else:
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(bytecode_dir)
+    return app
+
+
+def renderizar(app, template, contexto):
+    with app.test_request_context('/listagem'):
+        inicio = time.perf_counter()
+        app.jinja_env.get_template(template).render(**contexto)
+        return time.perf_counter() - inicio
+
+
+def run_render(app, quantidade):
+    # As escritas e leituras ficam fora da requisição medida (e do alerta de N+1)
+    for template, tabela, model, variavel in LISTAGENS:
+        ids = ler_ids(tabela, quantidade)
+        contexto = {variavel: model.get_cards(ids), 'pagina': None}
+        # Compila antes de medir
+        app.jinja_env.get_template(template)
+        os.environ['QUERY_CACHE'] = '0'
+        sem_cache = renderizar(app, template, contexto)
+        os.environ['QUERY_CACHE'] = '1'
+        frio = renderizar(app, template, contexto)
+        quente = renderizar(app, template, contexto)
+
+        # 1% dos cards alterados no banco e relidos: só esses são renderizados de novo
+        alterar(model, ids[::100])
+        contexto[variavel] = model.get_cards(ids)
+        antes = get_fragment_cache_stats()['misses']
+        alterados = renderizar(app, template, contexto)
+        renderizados = get_fragment_cache_stats()['misses'] - antes
+
+        print(f"{template:<24} cards={len(ids):<6} sem cache={sem_cache * 1000:8.1f} ms  "
+              f"cache vazio={frio * 1000:8.1f} ms  em cache={quente * 1000:8.1f} ms  "
+              f"1% alterado={alterados * 1000:8.1f} ms ({renderizados} renderizados)")
+
+
+def run_compilacao():
+    with tempfile.TemporaryDirectory() as diretorio:
+        for rodada in ('sem bytecode', 'bytecode (grava)', 'bytecode (lê)'):
+            app = criar_app(None if rodada == 'sem bytecode' else diretorio)
+            if rodada == 'sem bytecode':
+                app.jinja_env.bytecode_cache = None
+            inicio = time.perf_counter()
+            for template in TEMPLATES:
+                app.jinja_env.get_template(template)
+            print(f"compilação a frio {rodada:<17} {(time.perf_counter() - inicio) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cards', type=int, default=5000, help='quantidade de cards por listagem')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='insere N eventos e N restaurantes sintéticos antes de medir')
+    args = parser.parse_args()
+
+    app = criar_app()
+    init_database(app)
+    with app.app_context():
+        if args.seed:
+            from migrations.explain_check import seed
+            seed(args.seed)
+        run_render(app, args.cards)
+    run_compilacao()
@@ -0,0 +1,114 @@
+"""
+Benchmark das listagens: compara SELECT * (objetos completos) com a projeção
+dos cards (EventoCard/RestauranteCard) em bytes lidos do banco, tempo de
+leitura e tempo de renderização dos templates de listagem.
+
+Uso (com o banco configurado no .env):
+    python benchmarks/bench_list_projection.py [--seed 50000]
+
+--seed insere a quantidade pedida de eventos e restaurantes sintéticos
+antes de medir (use um banco descartável, por exemplo DB_BACKEND=sqlite).
+"""
+import os
+import sys
+import time
+import argparse
+from datetime import date, time as dtime
+from decimal import Decimal
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import Flask
+from config.database import MYSQL, PRIMARY, get_backend, get_pool, init_app
+from config.fragment_cache import init_app as init_fragment_cache
+from models.evento import Evento, EventoCard, CARD_SELECT as EVENTO_CARD
+from models.restaurante import Restaurante, RestauranteCard, CARD_SELECT as RESTAURANTE_CARD
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASOS = {
+    'eventos': ("SELECT {} FROM eventos ORDER BY data_inicio DESC, id DESC",
+                'eventos/index.html', Evento, EventoCard, EVENTO_CARD),
+    'restaurantes': ("SELECT {} FROM restaurantes ORDER BY nome_restaurante ASC, id ASC",
+                     'restaurantes/index.html', Restaurante, RestauranteCard, RESTAURANTE_CARD),
+}
+
+
+def tamanho(valor):
+    """Bytes aproximados de um valor no protocolo de texto do MySQL"""
+    if valor is None:
+        return 1
+    if isinstance(valor, (date, dtime)):
+        return len(valor.isoformat()) + 1
+    if isinstance(valor, (int, float, Decimal, bool)):
+        return len(str(valor)) + 1
+    return len(str(valor).encode('utf-8')) + 1
+
+
+def bytes_enviados(cursor):
+    """Contador Bytes_sent da sessão no MySQL (o que o servidor mandou ao cliente)"""
+    cursor.execute("SHOW SESSION STATUS LIKE 'Bytes_sent'")
+    return int(cursor.fetchall()[0]['Value'])
+
+
+def ler(query):
+    """Executa a query numa conexão do pool e devolve (linhas, segundos, bytes)"""
+    connection = get_pool(PRIMARY).acquire()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        antes = bytes_enviados(cursor) if get_backend() == MYSQL else None
+        inicio = time.perf_counter()
+        cursor.execute(query)
+        linhas = cursor.fetchall()
+        elapsed = time.perf_counter() - inicio
+        if antes is not None:
+            enviados = bytes_enviados(cursor) - antes
+        else:
+            enviados = sum(tamanho(v) for linha in linhas for v in linha.values())
+        return linhas, elapsed, enviados
+    finally:
+        cursor.close()
+        get_pool(PRIMARY).release(connection)
+
+
+def criar_app():
+    """App mínimo para renderizar os templates (links de url_for viram '#')"""
+    app = Flask(__name__, template_folder=os.path.join(BASE_DIR, 'templates'))
+    app.url_build_error_handlers.append(lambda error, endpoint, values: '#')
+    # base.html consulta request.endpoint para marcar o menu ativo
+    app.add_url_rule('/listagem', 'listagem', lambda: '')
+    init_app(app)
+    init_fragment_cache(app)
+    return app
+
+
+def run(app, nome):
+    sql, template, completo, card, projecao = CASOS[nome]
+    with app.test_request_context('/listagem'):
+        for modo, colunas, classe in (('SELECT *', '*', completo), ('cards', projecao, card)):
+            linhas, leitura, enviados = ler(sql.format(colunas))
+            inicio = time.perf_counter()
+            objetos = [classe(**l) for l in linhas]
+            montagem = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            html = app.jinja_env.get_template(template).render(**{nome: objetos, 'pagina': None})
+            render = time.perf_counter() - inicio
+
+            print(f"{nome:<13} {modo:<9} linhas={len(linhas):<7} "
+                  f"bytes={enviados / 1024 / 1024:8.2f} MiB  leitura={leitura * 1000:8.1f} ms  "
+                  f"objetos={montagem * 1000:7.1f} ms  render={render * 1000:8.1f} ms  "
+                  f"html={len(html) / 1024 / 1024:6.2f} MiB")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0,
+                        help='insere N eventos e restaurantes sintéticos antes de medir')
+    args = parser.parse_args()
+
+    app = criar_app()
+    with app.app_context():
+        if args.seed:
+            from migrations.explain_check import seed
+            seed(args.seed)
+        for nome in CASOS:
+            run(app, nome)
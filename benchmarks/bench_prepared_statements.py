@@ -0,0 +1,53 @@
+"""
+Micro-benchmark das páginas de detalhe (/eventos/<id> e /restaurantes/<id>):
+compara a query de get_by_id com e sem prepared statements reaproveitados.
+
+Uso (com o banco configurado no .env):
+    python benchmarks/bench_prepared_statements.py [iteracoes]
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.database import execute_query, execute_query_one, get_pool_stats
+
+QUERIES = {
+    'eventos': "SELECT * FROM eventos WHERE id = %s",
+    'restaurantes': "SELECT * FROM restaurantes WHERE id = %s",
+}
+
+
+def server_status():
+    """Contadores do servidor usados para mostrar quantos PREPAREs foram feitos"""
+    linhas = execute_query("SHOW GLOBAL STATUS WHERE Variable_name IN "
+                           "('Com_select', 'Com_stmt_prepare', 'Com_stmt_execute')") or []
+    return {l['Variable_name']: int(l['Value']) for l in linhas}
+
+
+def run(tabela, prepared, iteracoes):
+    ids = [r['id'] for r in execute_query(f"SELECT id FROM {tabela} LIMIT 50") or []]
+    if not ids:
+        print(f"Tabela {tabela} vazia, nada a medir")
+        return
+
+    antes = server_status()
+    inicio = time.perf_counter()
+    for i in range(iteracoes):
+        execute_query_one(QUERIES[tabela], (ids[i % len(ids)],), prepared=prepared)
+    elapsed = time.perf_counter() - inicio
+    depois = server_status()
+
+    delta = {k: depois.get(k, 0) - antes.get(k, 0) for k in depois}
+    modo = 'prepared' if prepared else 'texto   '
+    print(f"{tabela:<13} {modo} {elapsed / iteracoes * 1e6:9.1f} µs/query  "
+          f"prepares={delta.get('Com_stmt_prepare', 0):<6} "
+          f"executes={delta.get('Com_stmt_execute', 0):<6} "
+          f"selects_texto={delta.get('Com_select', 0)}")
+
+
+if __name__ == '__main__':
+    iteracoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for tabela in QUERIES:
+        run(tabela, prepared=False, iteracoes=iteracoes)
+        run(tabela, prepared=True, iteracoes=iteracoes)
+    print(get_pool_stats())
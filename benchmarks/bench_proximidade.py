@@ -0,0 +1,86 @@
+"""
+Benchmark da busca por proximidade: monta o índice espacial com pontos
+sintéticos espalhados por São Luís e mede a latência (p50/p95) de buscas
+por raio, com e sem filtro e limite, contra a varredura de todos os pontos.
+
+Uso:
+    python benchmarks/bench_proximidade.py [--pontos 100000]
+
+Não usa o banco: os pontos são gerados em memória.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.spatial_index import GridIndex, haversine
+
+# Retângulo aproximado da ilha de São Luís
+LATITUDES = (-2.62, -2.45)
+LONGITUDES = (-44.40, -44.18)
+RAIOS = [250, 1000, 5000]
+CULINARIAS = ['Maranhense', 'Brasileira', 'Italiana', 'Japonesa', 'Francesa', 'Mexicana']
+REPETICOES = 200
+# Limite padrão de /api/nearby (models/proximidade.py)
+LIMITE = 50
+
+
+def percentis(amostras):
+    amostras = sorted(amostras)
+    return amostras[len(amostras) // 2], amostras[int(len(amostras) * 0.95) - 1]
+
+
+def gerar(quantidade):
+    pontos = []
+    for i in range(quantidade):
+        categoria = 'restaurante' if i % 2 else 'evento'
+        dados = {'id': i, 'categoria': categoria, 'tipo_culinaria': random.choice(CULINARIAS)}
+        pontos.append(((categoria, i), random.uniform(*LATITUDES), random.uniform(*LONGITUDES), dados))
+    return pontos
+
+
+def medir(rotulo, chamada, centros):
+    amostras = []
+    for lat, lon in centros:
+        inicio = time.perf_counter()
+        encontrados = chamada(lat, lon)
+        amostras.append(time.perf_counter() - inicio)
+    p50, p95 = percentis(amostras)
+    print(f"  {rotulo:<42} p50={p50 * 1000:8.3f} ms  p95={p95 * 1000:8.3f} ms  ({len(encontrados)} pontos)")
+
+
+def run(quantidade):
+    random.seed(42)
+    pontos = gerar(quantidade)
+    inicio = time.perf_counter()
+    GridIndex(pontos)
+    montagem = time.perf_counter() - inicio
+    tracemalloc.start()
+    indice = GridIndex(pontos)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"índice montado em {montagem:.2f} s, {len(indice)} pontos, {memoria / 1024 / 1024:.1f} MiB")
+
+    centros = [(random.uniform(*LATITUDES), random.uniform(*LONGITUDES)) for _ in range(REPETICOES)]
+    maranhenses = lambda dados: dados['categoria'] == 'restaurante' and dados['tipo_culinaria'] == 'Maranhense'
+    for raio in RAIOS:
+        medir(f"raio {raio} m", lambda lat, lon: indice.raio(lat, lon, raio), centros)
+        medir(f"raio {raio} m, restaurantes maranhenses",
+              lambda lat, lon: indice.raio(lat, lon, raio, maranhenses), centros)
+        medir(f"raio {raio} m, {LIMITE} mais próximos",
+              lambda lat, lon: indice.raio(lat, lon, raio, limite=LIMITE), centros)
+        medir(f"raio {raio} m, {LIMITE} maranhenses mais próximos",
+              lambda lat, lon: indice.raio(lat, lon, raio, maranhenses, LIMITE), centros)
+
+    def varredura(lat, lon):
+        return sorted((haversine(lat, lon, plat, plon), chave)
+                      for chave, plat, plon, _ in pontos if haversine(lat, lon, plat, plon) <= 1000)
+    medir("varredura de todos os pontos, raio 1000 m", varredura, centros[:10])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pontos', type=int, default=100000, help='quantidade de pontos sintéticos')
+    run(parser.parse_args().pontos)
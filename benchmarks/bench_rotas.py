@@ -0,0 +1,74 @@
+"""
+Benchmark do otimizador de rotas do itinerário (models/rotas.py): compara
+o comprimento do caminho e o tempo de solução com o vizinho mais próximo
+(o itinerário anterior), com e sem ponto final fixo, para conjuntos
+resolvidos pelo Held-Karp (exato) e pela busca local (2-opt e Or-opt).
+
+Uso:
+    python benchmarks/bench_rotas.py [--pontos 5 8 12 25 50 100 250 1000]
+                                     [--orcamento 0.2] [--instancias 10]
+
+Não usa o banco: os pontos são gerados em memória.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models.distancias import comprimento, matriz, vizinho_mais_proximo
+from models.rotas import ROTA_EXATA_MAX, otimizar_rota
+
+# Retângulo aproximado da ilha de São Luís
+LATITUDES = (-2.62, -2.45)
+LONGITUDES = (-44.40, -44.18)
+
+
+def guloso(distancias_rota, fim):
+    """Vizinho mais próximo saindo do ponto 0; com ponto final, ele fica por último"""
+    if fim is None:
+        return vizinho_mais_proximo(distancias_rota)
+    restantes = [i for i in range(len(distancias_rota)) if i != fim]
+    sub = distancias_rota[restantes][:, restantes]
+    return [restantes[i] for i in vizinho_mais_proximo(sub)] + [fim]
+
+
+def run(quantidades, orcamento, instancias):
+    random.seed(42)
+    print(f"{'pontos':>6} {'fim':>5} {'método':<11} {'guloso (km)':>12} {'otimizado (km)':>15} "
+          f"{'ganho':>7} {'pior ganho':>10} {'tempo guloso':>13} {'tempo otimizado':>16}")
+    for quantidade in quantidades:
+        metodo = 'Held-Karp' if quantidade <= ROTA_EXATA_MAX else 'busca local'
+        for com_fim in (False, True):
+            fim = quantidade - 1 if com_fim else None
+            totais = {'guloso': 0.0, 'otimizado': 0.0, 't_guloso': 0.0, 't_otimizado': 0.0}
+            ganhos = []
+            for _ in range(instancias):
+                pontos = [(random.uniform(*LATITUDES), random.uniform(*LONGITUDES)) for _ in range(quantidade)]
+                distancias_rota = matriz(pontos)
+
+                inicio = time.perf_counter()
+                ordem_gulosa = guloso(distancias_rota, fim)
+                totais['t_guloso'] += time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                ordem = otimizar_rota(distancias_rota, 0, fim, orcamento)
+                totais['t_otimizado'] += time.perf_counter() - inicio
+
+                guloso_m, otimizado_m = comprimento(distancias_rota, ordem_gulosa), comprimento(distancias_rota, ordem)
+                totais['guloso'] += guloso_m
+                totais['otimizado'] += otimizado_m
+                ganhos.append(1 - otimizado_m / guloso_m)
+            print(f"{quantidade:>6} {'sim' if com_fim else 'não':>5} {metodo:<11} "
+                  f"{totais['guloso'] / instancias / 1000:>12.1f} {totais['otimizado'] / instancias / 1000:>15.1f} "
+                  f"{sum(ganhos) / len(ganhos):>7.1%} {max(ganhos):>10.1%} "
+                  f"{totais['t_guloso'] / instancias * 1000:>10.2f} ms {totais['t_otimizado'] / instancias * 1000:>13.2f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pontos', type=int, nargs='+', default=[5, 8, 12, 25, 50, 100, 250, 1000],
+                        help='quantidades de pontos')
+    parser.add_argument('--orcamento', type=float, default=0.2, help='prazo (s) da busca local')
+    parser.add_argument('--instancias', type=int, default=10, help='conjuntos aleatórios por quantidade')
+    argumentos = parser.parse_args()
+    run(argumentos.pontos, argumentos.orcamento, argumentos.instancias)
@@ -0,0 +1,83 @@
+"""
+Benchmark da busca textual: tempo de montagem e memória dos índices em
+memória e latência das consultas (p50/p95), comparadas com o LIKE '%termo%'
+que a busca usava antes.
+
+Uso (com o banco configurado no .env):
+    python benchmarks/bench_search.py [--seed 50000]
+
+--seed insere a quantidade pedida de eventos e de restaurantes sintéticos
+antes de medir (50000 de cada = 100 mil linhas; use um banco descartável,
+por exemplo DB_BACKEND=sqlite).
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import Flask
+from config.database import execute_query, init_app
+from models import evento, restaurante
+
+CONSULTAS = {
+    'eventos': ['festival', 'sao luis', 'centro historico familia', 'evento 4242', 'organizador 7'],
+    'restaurantes': ['maranhense', 'sao luis', 'italiana calhau', 'restaurante 004242', 'ponta da areia'],
+}
+LIKE = {
+    'eventos': ("SELECT id FROM eventos WHERE nome_evento LIKE %s OR descricao LIKE %s "
+                "OR local LIKE %s OR organizador LIKE %s"),
+    'restaurantes': ("SELECT id FROM restaurantes WHERE nome_restaurante LIKE %s OR descricao LIKE %s "
+                     "OR bairro LIKE %s OR endereco LIKE %s"),
+}
+INDICES = {'eventos': evento.BUSCA, 'restaurantes': restaurante.BUSCA}
+REPETICOES = 50
+
+
+def percentis(amostras):
+    amostras = sorted(amostras)
+    return amostras[len(amostras) // 2], amostras[int(len(amostras) * 0.95) - 1]
+
+
+def run(tabela):
+    inicio = time.perf_counter()
+    INDICES[tabela].carregar()
+    montagem = time.perf_counter() - inicio
+    # A memória é medida numa segunda montagem: o tracemalloc deixa a primeira lenta
+    tracemalloc.start()
+    INDICES[tabela].carregar()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{tabela}: índice montado em {montagem:.2f} s, {memoria / 1024 / 1024:.1f} MiB")
+
+    for consulta in CONSULTAS[tabela]:
+        amostras = []
+        for _ in range(REPETICOES):
+            inicio = time.perf_counter()
+            with INDICES[tabela].usar() as indice:
+                ids = indice.search(consulta, 20)
+            amostras.append(time.perf_counter() - inicio)
+        p50, p95 = percentis(amostras)
+
+        termo = f"%{consulta}%"
+        inicio = time.perf_counter()
+        like = execute_query(LIKE[tabela], (termo,) * 4) or []
+        tempo_like = time.perf_counter() - inicio
+        print(f"  {consulta!r:<28} índice p50={p50 * 1000:7.2f} ms  p95={p95 * 1000:7.2f} ms  "
+              f"top={len(ids):<3}  LIKE={tempo_like * 1000:8.1f} ms ({len(like)} linhas)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0,
+                        help='insere N eventos e N restaurantes sintéticos antes de medir')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        if args.seed:
+            from migrations.explain_check import seed
+            seed(args.seed)
+        for tabela in INDICES:
+            run(tabela)
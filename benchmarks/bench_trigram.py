@@ -0,0 +1,79 @@
+"""
+Benchmark da busca tolerante a erros de digitação: tempo de montagem e
+memória do índice de trigramas e latência (p50/p95) de nomes parecidos com
+um termo e de nomes citados numa frase.
+
+Uso (com o banco configurado no .env):
+    python benchmarks/bench_trigram.py [--seed 50000]
+
+--seed insere a quantidade pedida de eventos e de restaurantes sintéticos
+antes de medir (use um banco descartável, por exemplo DB_BACKEND=sqlite).
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import Flask
+from config.database import init_app
+from models.entidades import INDICE, Entidades
+
+TERMOS = ['maranhence', 'artur azevdo', 'lagoa da jansem', 'restaurante 0042', 'festval', 'xyz']
+FRASES = [
+    'quero ir na lagoa da jansem e depois no teatro artur azevdo',
+    'onde comer comida maranhence perto da praia grande?',
+    'tem algum evento no centro histórico hoje à noite?',
+]
+REPETICOES = 100
+
+
+def percentis(amostras):
+    amostras = sorted(amostras)
+    return amostras[len(amostras) // 2], amostras[int(len(amostras) * 0.95) - 1]
+
+
+def medir(rotulo, chamada, texto):
+    amostras = []
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        encontrados = chamada(texto)
+        amostras.append(time.perf_counter() - inicio)
+    p50, p95 = percentis(amostras)
+    primeiro = encontrados[0]['texto'] if encontrados else '-'
+    print(f"  {rotulo:<12} {texto[:40]!r:<44} p50={p50 * 1000:7.3f} ms  p95={p95 * 1000:7.3f} ms  "
+          f"{len(encontrados):>2} nomes (1º: {primeiro})")
+
+
+def run():
+    inicio = time.perf_counter()
+    INDICE.carregar()
+    montagem = time.perf_counter() - inicio
+    # A memória é medida numa segunda montagem: o tracemalloc deixa a primeira lenta
+    tracemalloc.start()
+    INDICE.carregar()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    with INDICE.usar() as indice:
+        print(f"índice montado em {montagem:.2f} s, {len(indice)} nomes, "
+              f"{memoria / 1024 / 1024:.1f} MiB")
+
+    for termo in TERMOS:
+        medir('parecidas', Entidades.parecidas, termo)
+    for frase in FRASES:
+        medir('mencionadas', Entidades.mencionadas, frase)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0,
+                        help='insere N eventos e N restaurantes sintéticos antes de medir')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    init_app(app)
+    with app.app_context():
+        if args.seed:
+            from migrations.explain_check import seed
+            seed(args.seed)
+        run()
@@ -0,0 +1,168 @@
+import os
+import sys
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.database import (MYSQL, PRIMARY, REPLICA, _db_setting, _is_read, _mark_write,
+                             _record_error, _record_query, _route, get_backend, replica_enabled)
+
+try:
+    import aiomysql
+except ImportError:  # camada assíncrona é opcional
+    aiomysql = None
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo (s) que uma requisição espera pelas queries assíncronas
+ASYNC_TIMEOUT = float(os.getenv('DB_ASYNC_TIMEOUT', 30))
+
+# Todas as conexões assíncronas vivem num único event loop, rodando numa
+# thread própria. Assim o pool sobrevive entre requisições (o Flask cria um
+# loop novo a cada view assíncrona, o que obrigaria a reconectar sempre).
+_loop = None
+_loop_lock = threading.Lock()
+_pools = {}
+
+# Pool usado nas leituras, queries executadas e falhas, definidos por
+# run_async a partir do contexto da requisição que disparou as corrotinas
+_read_role = contextvars.ContextVar('db_async_read_role', default=None)
+_records = contextvars.ContextVar('db_async_records', default=None)
+_errors = contextvars.ContextVar('db_async_errors', default=None)
+
+
+def async_enabled():
+    """
+    Indica se a camada assíncrona pode ser usada: backend MySQL, aiomysql
+    instalado e DB_ASYNC diferente de 0
+    """
+    return (aiomysql is not None and get_backend() == MYSQL
+            and os.getenv('DB_ASYNC', '1') != '0')
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='db-async-loop', daemon=True).start()
+    return _loop
+
+
+async def _get_pool(role):
+    """Pool aiomysql do primário ou da réplica, criado na primeira chamada"""
+    if role == REPLICA and not replica_enabled():
+        role = PRIMARY
+    task = _pools.get(role)
+    if task is None:
+        task = asyncio.ensure_future(aiomysql.create_pool(
+            host=_db_setting(role, 'HOST', 'localhost'),
+            db=_db_setting(role, 'NAME', 'encantos_da_ilha'),
+            user=_db_setting(role, 'USER', 'novousuario'),
+            password=_db_setting(role, 'PASSWORD', 'usuario123'),
+            port=int(_db_setting(role, 'PORT', 3306)),
+            charset='utf8mb4',
+            autocommit=True,
+            minsize=1,
+            maxsize=int(_db_setting(role, 'POOL_SIZE', 5)),
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 3600))
+        ))
+        _pools[role] = task
+    try:
+        return await task
+    except Exception:
+        # Não guarda a falha: a próxima chamada tenta conectar de novo
+        _pools.pop(role, None)
+        raise
+
+
+def run_async(coro):
+    """
+    Executa uma corrotina da camada assíncrona a partir de código síncrono
+    (controllers) e devolve o resultado.
+
+    O pool das leituras é escolhido aqui, ainda no contexto da requisição,
+    para respeitar a fixação no primário após escritas. As métricas das
+    queries são repassadas aos hooks de instrumentação ao final, e as falhas
+    são contadas de novo no contexto de quem chamou: as corrotinas rodam no
+    contexto do event loop, e o query_error_count() da requisição (usado
+    pelos caches para não guardar resultados de leituras que falharam)
+    precisa vê-las.
+    """
+    role = _route('SELECT')
+    records = []
+    erros = []
+
+    async def _com_contexto():
+        _read_role.set(role)
+        _records.set(records)
+        _errors.set(erros)
+        return await coro
+
+    future = asyncio.run_coroutine_threadsafe(_com_contexto(), _get_loop())
+    try:
+        return future.result(ASYNC_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        # A corrotina continuaria no event loop, presa a uma conexão do pool,
+        # depois do fim da requisição: é cancelada
+        future.cancel()
+        _record_error()
+        raise
+    except Exception:
+        # Tempo esgotado ou erro nas corrotinas: também é uma leitura que falhou
+        _record_error()
+        raise
+    finally:
+        for query, params, rows, elapsed, pool in records:
+            if not _is_read(query):
+                _mark_write()
+            _record_query(query, params, rows, elapsed, pool)
+        for _ in erros:
+            _record_error()
+
+
+async def _execute(query, params, one):
+    role = (_read_role.get() or _route(query)) if _is_read(query) else PRIMARY
+    try:
+        pool = await _get_pool(role)
+        inicio = time.perf_counter()
+        async with pool.acquire() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params)
+                if one:
+                    result = await cursor.fetchone()
+                    rows = 1 if result else 0
+                elif _is_read(query):
+                    result = await cursor.fetchall()
+                    rows = len(result)
+                else:
+                    result = cursor.rowcount
+                    rows = result
+        records = _records.get()
+        if records is not None:
+            records.append((query, params, rows, time.perf_counter() - inicio, role))
+        return result
+    except (aiomysql.Error, OSError) as e:
+        logger.error(f"Erro ao executar query assíncrona: {e}")
+        _record_error()
+        erros = _errors.get()
+        if erros is not None:
+            erros.append(query)
+        return None
+
+
+async def execute_query_async(query, params=None):
+    """
+    Versão assíncrona de execute_query
+    """
+    return await _execute(query, params, one=False)
+
+
+async def execute_query_one_async(query, params=None):
+    """
+    Versão assíncrona de execute_query_one
+    """
+    return await _execute(query, params, one=True)
@@ -0,0 +1,330 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import functools
+import inspect
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import g, has_app_context, has_request_context
+from config.database import execute_query_one, query_error_count
+
+# Cache dos resultados das leituras dos models. Cada entrada é marcada com
+# as tabelas que consultou; as escritas dos models chamam invalidate() com
+# a tabela alterada e todas as entradas dela são descartadas.
+#
+# invalidate() só alcança o cache deste processo (no backend local). Por
+# isso cada entrada guarda também a versão (table_version) das tabelas
+# lidas e só é servida enquanto ela não mudar: uma escrita feita por outro
+# worker derruba as entradas daqui em no máximo TABLE_VERSION_SECONDS, e
+# não no fim da validade (QUERY_CACHE_TTL ou a meia-noite).
+#
+# A versão de uma tabela é uma linha de contadores (migração v005) que a
+# transação de cada escrita dos models soma em 1: é lida pela chave
+# primária, então validar não custa uma varredura da tabela, e muda a cada
+# escrita confirmada, de qualquer processo.
+
+# Validade padrão (s) de uma entrada
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', 300))
+# Limites do cache: quantidade de entradas e memória estimada (bytes)
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', 1024))
+QUERY_CACHE_MAX_BYTES = int(os.getenv('QUERY_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+# local: um cache por processo; shared: arquivo compartilhado pelos workers
+# do servidor (config/shared_cache.py), com invalidação entre processos
+QUERY_CACHE_BACKEND = os.getenv('QUERY_CACHE_BACKEND', 'local')
+# Por quanto tempo (s) a versão de uma tabela (table_version) é reaproveitada
+# antes de ser consultada de novo. As escritas feitas neste processo a
+# invalidam na hora; as de outros processos aparecem depois de no máximo
+# este intervalo.
+TABLE_VERSION_SECONDS = float(os.getenv('PAGE_CACHE_VALIDATE_SECONDS', 5))
+# Tabelas com versão em contadores (as demais tags, como 'schema', valem
+# só pela validade)
+TABELAS_VERSIONADAS = ('eventos', 'restaurantes')
+
+
+def cache_enabled():
+    """O cache pode ser desligado com QUERY_CACHE=0"""
+    return os.getenv('QUERY_CACHE', '1') != '0'
+
+
+def _next_midnight():
+    amanha = date.today() + timedelta(days=1)
+    return datetime.combine(amanha, datetime.min.time()).timestamp()
+
+
+def _estimate_size(obj, _vistos=None):
+    """Memória aproximada (bytes) de um resultado: listas, dicts e objetos dos models"""
+    if _vistos is None:
+        _vistos = set()
+    if id(obj) in _vistos:
+        return 0
+    _vistos.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool, type(None), date)):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(_estimate_size(k, _vistos) + _estimate_size(v, _vistos) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(_estimate_size(i, _vistos) for i in obj)
+    if hasattr(obj, '__dict__'):
+        return size + _estimate_size(vars(obj), _vistos)
+    for campo in getattr(obj, '__slots__', ()):
+        size += _estimate_size(getattr(obj, campo, None), _vistos)
+    return size
+
+
+class _Entry:
+    __slots__ = ('value', 'tags', 'expires', 'size')
+
+    def __init__(self, value, tags, expires, size):
+        self.value = value
+        self.tags = tags
+        self.expires = expires
+        self.size = size
+
+
+class QueryCache:
+    """
+    Cache LRU com validade por entrada, limite de memória e invalidação por
+    tag (nome da tabela)
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES, max_bytes=QUERY_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._tags = {}
+        # Contador de invalidações por tag: uma leitura que começou antes de
+        # uma escrita não pode guardar o resultado depois dela
+        self._generations = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Retorna (True, valor) se a chave estiver no cache e válida"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry.value
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def generation(self, tags):
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def set(self, key, value, tags, expires, generation=None):
+        """Guarda um valor, a menos que alguma tag tenha sido invalidada desde `generation`"""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation(tags):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, tags, expires, size)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *tags):
+        """Descarta todas as entradas marcadas com alguma das tags"""
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+def _create_cache():
+    if QUERY_CACHE_BACKEND == 'shared':
+        from config.shared_cache import get_shared_cache
+        return get_shared_cache()
+    return QueryCache()
+
+
+_cache = _create_cache()
+
+
+def get_cache():
+    return _cache
+
+
+def get_cache_stats():
+    """Retorna os contadores do cache de queries (hits, misses, evictions...)"""
+    return _cache.stats()
+
+
+def invalidate(*tags):
+    """Descarta os resultados em cache das tabelas alteradas"""
+    _cache.invalidate(*tags)
+
+
+def contador_versao(tabela):
+    """Nome da linha de contadores com a versão da tabela"""
+    return f"versao_{tabela}"
+
+
+def table_version(tabela):
+    """
+    Versão da tabela (contador somado por cada escrita), com cache curto, ou
+    None se o banco não a der (migração v005 não aplicada, banco fora do ar).
+    As escritas deste processo descartam a versão guardada na hora.
+    """
+    chave = ('table_version', tabela)
+    encontrado, versao = _cache.get(chave)
+    if encontrado:
+        return versao
+
+    generation, erros = _cache.generation((tabela,)), query_error_count()
+    resultado = execute_query_one("SELECT valor FROM contadores WHERE nome = %s", (contador_versao(tabela),))
+    if resultado is None:
+        return None
+    versao = resultado['valor']
+    if query_error_count() == erros:
+        _cache.set(chave, versao, (tabela,), time.time() + TABLE_VERSION_SECONDS, generation)
+    return versao
+
+
+def _versoes(tags):
+    """Versões das tabelas versionadas entre as tags"""
+    return tuple(table_version(t) for t in tags if t in TABELAS_VERSIONADAS)
+
+
+def _em_dia(versoes, atuais):
+    # Sem acesso ao banco não há como validar: a entrada continua valendo
+    return None in atuais or versoes == atuais
+
+
+def _count(resultado):
+    if has_app_context():
+        chave = '_cache_hits' if resultado else '_cache_misses'
+        setattr(g, chave, g.get(chave, 0) + 1)
+
+
+def _copy(value):
+    # Listas são copiadas para que quem chamou possa alterá-las sem mexer no cache
+    return list(value) if isinstance(value, list) else value
+
+
+def cached(*tags, ttl=None, until_midnight=False):
+    """
+    Decorator para métodos de leitura dos models. A chave é o nome do método
+    mais os argumentos; `tags` são as tabelas lidas. Com `until_midnight`,
+    a entrada expira na virada do dia (para consultas que usam a data de hoje).
+    A entrada guarda as versões das tabelas lidas antes da consulta e deixa
+    de valer quando elas mudam. Funciona com métodos síncronos e assíncronos.
+    """
+    def decorator(func):
+        nome = func.__qualname__
+
+        def _key(args, kwargs):
+            key = (nome, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return None
+            return key
+
+        def _expires():
+            expires = time.time() + (QUERY_CACHE_TTL if ttl is None else ttl)
+            return min(expires, _next_midnight()) if until_midnight else expires
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = _key(args, kwargs) if cache_enabled() else None
+                if key is None:
+                    return await func(*args, **kwargs)
+                # table_version é síncrona: roda fora do event loop
+                atuais = await asyncio.to_thread(_versoes, tags)
+                encontrado, entrada = _cache.get(key)
+                if encontrado and _em_dia(entrada[0], atuais):
+                    return _copy(entrada[1])
+                generation, erros = _cache.generation(tags), query_error_count()
+                value = await func(*args, **kwargs)
+                if query_error_count() == erros and None not in atuais:
+                    _cache.set(key, (atuais, value), tags, _expires(), generation)
+                return _copy(value)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _key(args, kwargs) if cache_enabled() else None
+            if key is None:
+                return func(*args, **kwargs)
+            erros = query_error_count()
+            atuais = _versoes(tags)
+            encontrado, entrada = _cache.get(key)
+            encontrado = encontrado and _em_dia(entrada[0], atuais)
+            _count(encontrado)
+            if encontrado:
+                return _copy(entrada[1])
+            generation = _cache.generation(tags)
+            value = func(*args, **kwargs)
+            # Resultado de uma leitura que falhou não vai para o cache
+            if query_error_count() == erros and None not in atuais:
+                _cache.set(key, (atuais, value), tags, _expires(), generation)
+            return _copy(value)
+        return wrapper
+    return decorator
+
+
+def init_app(app):
+    """Publica os hits e misses do cache de cada requisição no Server-Timing"""
+    app.after_request(_report_request_cache)
+
+
+def _report_request_cache(response):
+    if has_request_context():
+        hits, misses = g.get('_cache_hits', 0), g.get('_cache_misses', 0)
+        if hits or misses:
+            response.headers.add('Server-Timing', f'cache;desc="{hits} hits, {misses} misses"')
+    return response
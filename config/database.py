@@ -1,76 +1,697 @@
 import os
+import re
 import sys
+import logging
+import contextvars
+import threading
+import time
+from collections import OrderedDict
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import mysql.connector
 from mysql.connector import Error
 from dotenv import load_dotenv
+from flask import g, has_app_context, has_request_context, request, session
 
 # Carrega variáveis de ambiente do arquivo .env
 load_dotenv()
 
-def get_db_connection():
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(__name__ + '.slow')
+
+# Quantidade de linhas trazidas do servidor a cada leitura em iter_query
+STREAM_CHUNK_SIZE = int(os.getenv('DB_STREAM_CHUNK_SIZE', 500))
+# Conexões do pool próprio dos iteradores de iter_query (por processo)
+STREAM_POOL_SIZE = int(os.getenv('DB_STREAM_POOL_SIZE', 2))
+# Máximo de prepared statements mantidos abertos por conexão
+PREPARED_CACHE_SIZE = int(os.getenv('DB_PREPARED_CACHE_SIZE', 64))
+# Por quantos segundos, após uma escrita, as leituras da mesma sessão
+# continuam no primário (a réplica pode ainda não ter recebido a alteração)
+REPLICA_STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', 5))
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+
+# Backend do banco: 'mysql' (padrão) ou 'sqlite' (arquivo embutido, para
+# quiosques e instalações pequenas sem servidor MySQL)
+MYSQL = 'mysql'
+SQLITE = 'sqlite'
+
+def get_backend():
+    """Retorna o backend configurado em DB_BACKEND"""
+    return os.getenv('DB_BACKEND', MYSQL).lower()
+
+def replica_enabled():
+    """
+    Indica se há uma réplica de leitura configurada (DB_REPLICA_HOST, ou
+    DB_REPLICA_SQLITE_PATH no backend SQLite)
+    """
+    if get_backend() == SQLITE:
+        return bool(os.getenv('DB_REPLICA_SQLITE_PATH'))
+    return bool(os.getenv('DB_REPLICA_HOST'))
+
+def _db_setting(role, name, default):
+    """Lê DB_<name>; para a réplica, DB_REPLICA_<name> tem precedência"""
+    if role == REPLICA:
+        valor = os.getenv(f'DB_REPLICA_{name}')
+        if valor:
+            return valor
+    return os.getenv(f'DB_{name}', default)
+
+def get_db_connection(role=PRIMARY):
     """
-    Estabelece conexão com o banco de dados MySQL
+    Estabelece conexão com o banco de dados (primário ou réplica)
     """
+    if get_backend() == SQLITE:
+        return _get_sqlite_connection(role)
+
     try:
         connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST', 'localhost'),
-            database=os.getenv('DB_NAME', 'encantos_da_ilha'),
-            user=os.getenv('DB_USER', 'novousuario'),
-            password=os.getenv('DB_PASSWORD', 'usuario123'),
-            port=int(os.getenv('DB_PORT', 3306)),
+            host=_db_setting(role, 'HOST', 'localhost'),
+            database=_db_setting(role, 'NAME', 'encantos_da_ilha'),
+            user=_db_setting(role, 'USER', 'novousuario'),
+            password=_db_setting(role, 'PASSWORD', 'usuario123'),
+            port=int(_db_setting(role, 'PORT', 3306)),
             charset='utf8mb4',
             collation='utf8mb4_unicode_ci'
         )
         return connection
     except Error as e:
-        print(f"Erro ao conectar ao MySQL: {e}")
+        logger.error(f"Erro ao conectar ao MySQL: {e}")
+        return None
+
+def _get_sqlite_connection(role=PRIMARY):
+    """Abre o arquivo SQLite do primário ou da réplica"""
+    from config import sqlite_backend
+
+    try:
+        return sqlite_backend.connect(_db_setting(role, 'SQLITE_PATH', 'encantos_da_ilha.db'))
+    except Error as e:
+        logger.error(f"Erro ao abrir o banco SQLite: {e}")
         return None
 
-def execute_query(query, params=None):
+
+class PreparedStatementCache:
+    """
+    Cursores preparados (cursor(prepared=True)) de uma conexão, indexados
+    pelo texto do SQL. Reexecutar um cursor com o mesmo SQL não envia um
+    novo PREPARE ao servidor, apenas os parâmetros. Os menos usados são
+    fechados (DEALLOCATE) quando o limite é atingido.
+    """
+
+    def __init__(self, connection, max_size=64):
+        self.connection = connection
+        self.max_size = max_size
+        self._cursors = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cursor(self, query):
+        """Retorna o cursor preparado para `query`, criando-o se necessário"""
+        cursor = self._cursors.get(query)
+        if cursor is not None:
+            self._cursors.move_to_end(query)
+            self.hits += 1
+            return cursor
+
+        self.misses += 1
+        cursor = self.connection.cursor(prepared=True, dictionary=True)
+        self._cursors[query] = cursor
+        if len(self._cursors) > self.max_size:
+            _, antigo = self._cursors.popitem(last=False)
+            self._close_cursor(antigo)
+        return cursor
+
+    def discard(self, query):
+        """Remove um statement do cache (por exemplo, após um erro)"""
+        cursor = self._cursors.pop(query, None)
+        if cursor is not None:
+            self._close_cursor(cursor)
+
+    def clear(self):
+        """Fecha todos os statements da conexão"""
+        while self._cursors:
+            _, cursor = self._cursors.popitem()
+            self._close_cursor(cursor)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except Error:
+            pass
+
+
+class ConnectionPool:
+    """
+    Pool de conexões MySQL reutilizadas entre requisições.
+
+    Mantém no máximo `size` conexões abertas. Quando todas estão em uso,
+    quem pede uma conexão espera até `timeout` segundos. Conexões ociosas
+    são testadas (ping) antes de serem entregues e recicladas após
+    `recycle` segundos de vida.
+    """
+
+    def __init__(self, connect, size=5, timeout=30.0, recycle=3600):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self._cond = threading.Condition()
+        self._idle = []        # pilha LIFO: a conexão mais recente é reutilizada primeiro
+        self._created_at = {}  # id(conexão) -> instante de criação
+        self._statements = {}  # id(conexão) -> PreparedStatementCache
+        self._total = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        """Retira uma conexão do pool (ou None se não for possível obter uma)"""
+        inicio = time.monotonic()
+        with self._cond:
+            while True:
+                if self._idle:
+                    connection = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    # Reserva a vaga; a conexão é aberta fora do lock
+                    connection = None
+                    self._total += 1
+                    break
+                restante = self.timeout - (time.monotonic() - inicio)
+                if restante <= 0:
+                    self._timeouts += 1
+                    logger.error(f"Pool de conexões esgotado após {self.timeout}s de espera")
+                    return None
+                self._cond.wait(restante)
+
+            espera = time.monotonic() - inicio
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += espera
+            self._wait_max = max(self._wait_max, espera)
+
+        if connection is not None and not self._is_healthy(connection):
+            self._close(connection)
+            self._recycled += 1
+            connection = None
+
+        if connection is None:
+            connection = self._connect()
+            if connection is None:
+                with self._cond:
+                    self._total -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                return None
+            self._created_at[id(connection)] = time.monotonic()
+            self._created += 1
+
+        return connection
+
+    def release(self, connection, discard=False):
+        """Devolve uma conexão ao pool (ou a fecha, se `discard` for verdadeiro)"""
+        descartar = discard
+        if not descartar:
+            try:
+                # Encerra a transação implícita aberta pelos SELECTs para que o
+                # próximo uso não leia um snapshot antigo
+                connection.rollback()
+            except Error:
+                descartar = True
+
+        with self._cond:
+            self._in_use -= 1
+            if descartar:
+                self._total -= 1
+            else:
+                self._idle.append(connection)
+            self._cond.notify()
+
+        if descartar:
+            self._close(connection)
+
+    def close_all(self):
+        """Fecha todas as conexões ociosas"""
+        with self._cond:
+            ociosas, self._idle = self._idle, []
+            self._total -= len(ociosas)
+        for connection in ociosas:
+            self._close(connection)
+
+    def stats(self):
+        """Retorna as estatísticas de uso do pool"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'open': self._total,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': self._checkouts,
+                'created': self._created,
+                'recycled': self._recycled,
+                'timeouts': self._timeouts,
+                'wait_total_ms': self._wait_total * 1000,
+                'wait_max_ms': self._wait_max * 1000,
+                'wait_avg_ms': (self._wait_total / self._checkouts * 1000) if self._checkouts else 0.0,
+                'prepared_statements': sum(len(c) for c in self._statements.values()),
+                'prepared_hits': sum(c.hits for c in self._statements.values()),
+                'prepared_misses': sum(c.misses for c in self._statements.values()),
+            }
+
+    def statement_cache(self, connection):
+        """
+        Retorna o cache de prepared statements da conexão. O cache vive
+        enquanto a conexão viver: ao ser reciclada ou descartada pelo pool,
+        seus statements deixam de existir no servidor e o cache é esquecido.
+        """
+        cache = self._statements.get(id(connection))
+        if cache is None:
+            cache = PreparedStatementCache(connection, PREPARED_CACHE_SIZE)
+            self._statements[id(connection)] = cache
+        return cache
+
+    def _is_healthy(self, connection):
+        criada_em = self._created_at.get(id(connection), 0)
+        if self.recycle and time.monotonic() - criada_em > self.recycle:
+            return False
+        try:
+            return connection.is_connected()
+        except Error:
+            return False
+
+    def _close(self, connection):
+        self._created_at.pop(id(connection), None)
+        self._statements.pop(id(connection), None)
+        try:
+            connection.close()
+        except Error:
+            pass
+
+
+_pools = {}
+_stream_pools = {}
+_pool_lock = threading.Lock()
+
+def _pool(pools, role, size):
+    if role == REPLICA and not replica_enabled():
+        role = PRIMARY
+    pool = pools.get(role)
+    if pool is None:
+        with _pool_lock:
+            pool = pools.get(role)
+            if pool is None:
+                pool = ConnectionPool(
+                    lambda: get_db_connection(role),
+                    size=size,
+                    timeout=float(os.getenv('DB_POOL_TIMEOUT', 30)),
+                    recycle=int(os.getenv('DB_POOL_RECYCLE', 3600))
+                )
+                pools[role] = pool
+    return pool
+
+def get_pool(role=PRIMARY):
+    """
+    Retorna o pool de conexões do primário ou da réplica, criando-o na
+    primeira chamada. Sem réplica configurada, ambos são o mesmo pool.
+    """
+    return _pool(_pools, role, int(_db_setting(role, 'POOL_SIZE', 5)))
+
+def get_stream_pool(role=PRIMARY):
+    """
+    Pool separado das conexões de iter_query. Uma requisição que já segura
+    uma conexão do pool principal não espera por outra do mesmo pool: com
+    todas as requisições fazendo isso ao mesmo tempo, nenhuma avançaria.
+    """
+    return _pool(_stream_pools, role, STREAM_POOL_SIZE)
+
+def get_pool_stats(role=PRIMARY):
+    """Retorna as estatísticas do pool de conexões"""
+    return get_pool(role).stats()
+
+def init_app(app):
+    """
+    Devolve ao pool, no fim de cada requisição, a conexão usada por ela e
+    publica o resumo das queries executadas
+    """
+    app.after_request(_report_request_queries)
+    app.teardown_appcontext(_release_request_connection)
+
+def _release_request_connection(exception=None):
+    connections = g.pop('_db_connections', {})
+    for role, connection in connections.items():
+        if connection is not None:
+            get_pool(role).release(connection)
+
+# ===== Instrumentação de queries =====
+
+# Quantas vezes a mesma query pode rodar numa requisição antes do alerta de N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('DB_N_PLUS_ONE_THRESHOLD', 5))
+# Queries mais lentas que isto (ms) vão para o log de queries lentas
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', 200))
+SLOW_QUERY_LOG = os.getenv('DB_SLOW_QUERY_LOG', 'slow_queries.log')
+
+_query_hooks = []
+
+def register_query_hook(hook):
+    """
+    Registra uma função chamada após cada query com um dict contendo
+    fingerprint, sql, pool, params (quantidade), values, rows e ms
+    """
+    _query_hooks.append(hook)
+    return hook
+
+def fingerprint(query):
+    """Normaliza o SQL para agrupar queries iguais com valores diferentes"""
+    sql = re.sub(r"'(?:[^'\\]|\\.|'')*'", '?', query)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(?+)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+def _record_query(query, params, rows, elapsed, role=PRIMARY):
+    """Repassa as métricas de uma query a todos os hooks registrados"""
+    info = {
+        'fingerprint': fingerprint(query),
+        'sql': query,
+        'pool': role,
+        'params': len(params) if params else 0,
+        'values': params,
+        'rows': rows,
+        'ms': elapsed * 1000,
+    }
+    for hook in _query_hooks:
+        try:
+            hook(info)
+        except Exception:
+            logger.exception("Erro em hook de instrumentação de query")
+
+# Falhas de query no contexto atual (thread ou tarefa assíncrona). O cache
+# de queries compara este contador para não guardar o resultado vazio de
+# uma leitura que falhou.
+_query_errors = contextvars.ContextVar('db_query_errors', default=0)
+
+def _record_error():
+    _query_errors.set(_query_errors.get() + 1)
+
+def query_error_count():
+    """Quantidade de queries que falharam no contexto atual"""
+    return _query_errors.get()
+
+def get_request_queries():
+    """Retorna as queries registradas na requisição atual"""
+    if not has_request_context():
+        return []
+    return g.get('_db_queries', [])
+
+@register_query_hook
+def _track_request_query(info):
+    """Agrupa as queries por requisição e detecta padrões N+1"""
+    if not has_request_context():
+        return
+    queries = g.setdefault('_db_queries', [])
+    queries.append(info)
+
+    contagem = g.setdefault('_db_fingerprints', {})
+    contagem[info['fingerprint']] = contagem.get(info['fingerprint'], 0) + 1
+    if contagem[info['fingerprint']] == N_PLUS_ONE_THRESHOLD + 1:
+        logger.warning(
+            f"Possível N+1 em {request.path}: query executada mais de "
+            f"{N_PLUS_ONE_THRESHOLD} vezes na mesma requisição: {info['fingerprint']}"
+        )
+
+@register_query_hook
+def _log_slow_query(info):
+    """Grava no log de queries lentas as que passam de SLOW_QUERY_MS"""
+    if info['ms'] < SLOW_QUERY_MS:
+        return
+    if SLOW_QUERY_LOG and not slow_query_logger.handlers:
+        handler = logging.FileHandler(SLOW_QUERY_LOG, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.INFO)
+    rota = request.path if has_request_context() else '-'
+    slow_query_logger.info(
+        f"{info['ms']:.1f}ms rows={info['rows']} params={info['params']} "
+        f"rota={rota} sql={info['fingerprint']}"
+    )
+
+def _report_request_queries(response):
+    """Resume as queries da requisição no log e no cabeçalho Server-Timing"""
+    queries = get_request_queries()
+    if queries:
+        total_ms = sum(q['ms'] for q in queries)
+        response.headers.add('Server-Timing', f'db;dur={total_ms:.1f};desc="{len(queries)} queries"')
+        logger.debug(f"{request.method} {request.path}: {len(queries)} queries em {total_ms:.1f}ms")
+    return response
+
+# ===== Roteamento primário / réplica =====
+
+def _is_read(query):
+    return query.strip().upper().startswith('SELECT')
+
+def _route(query):
+    """
+    Escolhe o pool da query: escritas vão para o primário e SELECTs para a
+    réplica, exceto logo após uma escrita da mesma requisição ou sessão,
+    para que quem acabou de salvar veja a própria alteração.
+    """
+    if not _is_read(query) or not replica_enabled():
+        return PRIMARY
+    if has_app_context() and g.get('_db_wrote'):
+        return PRIMARY
+    if has_request_context():
+        ultima_escrita = session.get('_db_last_write')
+        if ultima_escrita and time.time() - ultima_escrita < REPLICA_STICKY_SECONDS:
+            return PRIMARY
+    return REPLICA
+
+def _mark_write():
+    """Fixa as próximas leituras da requisição e da sessão no primário"""
+    if not replica_enabled():
+        return
+    if has_app_context():
+        g._db_wrote = True
+    if has_request_context():
+        session['_db_last_write'] = time.time()
+
+def _checkout(role=PRIMARY):
+    """
+    Obtém uma conexão do pool. Dentro de um contexto Flask a mesma conexão
+    é reaproveitada por todas as queries até o fim da requisição.
+    """
+    if has_app_context():
+        connections = g.setdefault('_db_connections', {})
+        connection = connections.get(role)
+        if connection is None:
+            connection = get_pool(role).acquire()
+            connections[role] = connection
+        return connection
+    return get_pool(role).acquire()
+
+def _checkin(connection, role=PRIMARY):
+    """Devolve a conexão ao pool quando ela não pertence a uma requisição"""
+    if not has_app_context():
+        get_pool(role).release(connection)
+
+def _prepared_cursor(connection, query, role=PRIMARY):
+    """Cursor preparado e reaproveitado para o SQL na conexão"""
+    return get_pool(role).statement_cache(connection).cursor(query)
+
+def _discard_prepared(connection, query, role=PRIMARY):
+    """Esquece o statement após um erro, para que seja preparado de novo"""
+    get_pool(role).statement_cache(connection).discard(query)
+
+def execute_query(query, params=None, prepared=False):
     """
-    Executa uma query no banco de dados
+    Executa uma query no banco de dados. Com `prepared=True` o statement é
+    preparado uma única vez por conexão e reaproveitado nas chamadas seguintes.
     """
-    connection = get_db_connection()
+    role = _route(query)
+    connection = _checkout(role)
     if connection is None:
+        _record_error()
         return None
 
+    cursor = None
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(query, params) if params else cursor.execute(query)
+        inicio = time.perf_counter()
+        if prepared:
+            cursor = _prepared_cursor(connection, query, role)
+            cursor.execute(query, params or ())
+        else:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(query, params) if params else cursor.execute(query)
 
-        if query.strip().upper().startswith('SELECT'):
+        if _is_read(query):
             result = cursor.fetchall()
+            rows = len(result)
         else:
             connection.commit()
+            _mark_write()
             result = cursor.rowcount
+            rows = result
 
+        _record_query(query, params, rows, time.perf_counter() - inicio, role)
         return result
     except Error as e:
-        print(f"Erro ao executar query: {e}")
+        logger.error(f"Erro ao executar query: {e}")
+        _record_error()
+        if prepared:
+            _discard_prepared(connection, query, role)
         return None
     finally:
-        if connection.is_connected():
+        # Cursores preparados ficam abertos no cache da conexão
+        if cursor is not None and not prepared:
             cursor.close()
-            connection.close()
+        _checkin(connection, role)
 
-def execute_query_one(query, params=None):
+def execute_query_one(query, params=None, prepared=False):
     """
-    Executa uma query e retorna apenas um resultado
+    Executa uma query e retorna apenas um resultado. Com `prepared=True` o
+    statement é preparado uma única vez por conexão e reaproveitado.
     """
-    connection = get_db_connection()
+    role = _route(query)
+    connection = _checkout(role)
     if connection is None:
+        _record_error()
         return None
 
+    cursor = None
     try:
+        inicio = time.perf_counter()
+        if prepared:
+            cursor = _prepared_cursor(connection, query, role)
+            cursor.execute(query, params or ())
+            # O cursor continua em uso pelo cache: lê o resultado inteiro
+            linhas = cursor.fetchall()
+            result = linhas[0] if linhas else None
+        else:
+            # Cursor bufferizado: linhas não lidas não podem ficar pendentes numa
+            # conexão que volta para o pool
+            cursor = connection.cursor(dictionary=True, buffered=True)
+            cursor.execute(query, params) if params else cursor.execute(query)
+            result = cursor.fetchone()
+
+        _record_query(query, params, 1 if result else 0, time.perf_counter() - inicio, role)
+        return result
+    except Error as e:
+        logger.error(f"Erro ao executar query: {e}")
+        _record_error()
+        if prepared:
+            _discard_prepared(connection, query, role)
+        return None
+    finally:
+        if cursor is not None and not prepared:
+            cursor.close()
+        _checkin(connection, role)
+
+class Transaction:
+    """Executa queries de uma transação aberta por execute_transaction"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.lastrowid = None
+
+    def execute(self, query, params=None):
+        """Retorna as linhas de um SELECT ou a quantidade de linhas afetadas"""
+        cursor = self.connection.cursor(dictionary=True)
+        try:
+            inicio = time.perf_counter()
+            cursor.execute(query, params) if params else cursor.execute(query)
+            if _is_read(query):
+                result = cursor.fetchall()
+                rows = len(result)
+            else:
+                result = cursor.rowcount
+                rows = result
+                self.lastrowid = cursor.lastrowid
+            _record_query(query, params, rows, time.perf_counter() - inicio, PRIMARY)
+            return result
+        finally:
+            cursor.close()
+
+def execute_transaction(operacao):
+    """
+    Executa `operacao(tx)` numa única transação no primário: as queries
+    feitas com tx.execute são confirmadas juntas ao final ou, se alguma
+    falhar, todas são desfeitas. Retorna o resultado de `operacao` ou None
+    em caso de erro.
+    """
+    connection = _checkout(PRIMARY)
+    if connection is None:
+        _record_error()
+        return None
+
+    try:
+        result = operacao(Transaction(connection))
+        connection.commit()
+        _mark_write()
+        return result
+    except Error as e:
+        logger.error(f"Erro na transação, alterações desfeitas: {e}")
+        _record_error()
+        try:
+            connection.rollback()
+        except Error:
+            pass
+        return None
+    finally:
+        _checkin(connection, PRIMARY)
+
+def iter_query(query, params=None, chunk_size=None):
+    """
+    Executa um SELECT e gera as linhas aos poucos, em blocos de `chunk_size`.
+
+    Usa um cursor não bufferizado, então as linhas ficam no servidor até
+    serem lidas e a memória usada não cresce com o tamanho da tabela. A
+    conexão é exclusiva do iterador: vem do pool de get_stream_pool (não é
+    a da requisição, que pode fazer outras queries durante a iteração) e
+    volta a ele quando a iteração termina.
+    """
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+    role = _route(query)
+    pool = get_stream_pool(role)
+    connection = pool.acquire()
+    if connection is None:
+        _record_error()
+        return
+
+    cursor = None
+    esgotado = False
+    rows = 0
+    elapsed = 0.0
+    try:
+        inicio = time.perf_counter()
         cursor = connection.cursor(dictionary=True)
         cursor.execute(query, params) if params else cursor.execute(query)
 
-        return cursor.fetchone()
+        while True:
+            linhas = cursor.fetchmany(chunk_size)
+            # Mede apenas o tempo gasto no banco, não o do consumidor
+            elapsed += time.perf_counter() - inicio
+            if not linhas:
+                break
+            rows += len(linhas)
+            yield from linhas
+            inicio = time.perf_counter()
+        esgotado = True
+        _record_query(query, params, rows, elapsed, role)
     except Error as e:
-        print(f"Erro ao executar query: {e}")
-        return None
+        logger.error(f"Erro ao executar query: {e}")
+        _record_error()
     finally:
-        if connection.is_connected():
+        if esgotado:
             cursor.close()
-            connection.close()
+            pool.release(connection)
+        else:
+            # Iteração interrompida: ainda há linhas pendentes no socket, então
+            # é mais barato descartar a conexão do que ler o resto do resultado
+            pool.release(connection, discard=True)
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.cache import QueryCache, cache_enabled
+
+# Cache de fragmentos de template. Nos templates:
+#
+#     {% cache 'evento', evento.id, evento.versao %}
+#         ... markup do card ...
+#     {% endcache %}
+#
+# O HTML renderizado fica guardado pela chave (template + partes). A chave
+# inclui a versao da linha (migração v006), que cada UPDATE soma em 1 na
+# própria escrita: um card alterado, por qualquer processo, gera uma chave
+# nova e só ele é renderizado de novo; os demais continuam em cache e os
+# antigos saem por validade ou LRU. Se alguma parte da chave for None, o
+# bloco é renderizado sem cache. O bloco não pode usar
+# variáveis que mudam entre requisições (usuário, loop.first...) sem que
+# elas façam parte da chave.
+
+FRAGMENT_CACHE_TTL = float(os.getenv('FRAGMENT_CACHE_TTL', 3600))
+FRAGMENT_CACHE_MAX_ENTRIES = int(os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', 10000))
+FRAGMENT_CACHE_MAX_BYTES = int(os.getenv('FRAGMENT_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+# local: por processo; shared: no cache compartilhado pelos workers
+FRAGMENT_CACHE_BACKEND = os.getenv('FRAGMENT_CACHE_BACKEND', 'local')
+# Entra na chave: troque a cada deploy que altere o markup dos fragmentos
+FRAGMENT_CACHE_VERSION = os.getenv('PAGE_CACHE_VERSION', '1')
+# Diretório do cache de bytecode dos templates (vazio: diretório temporário do sistema)
+JINJA_BYTECODE_CACHE_DIR = os.getenv('JINJA_BYTECODE_CACHE_DIR', '')
+
+
+def _create_store():
+    if FRAGMENT_CACHE_BACKEND == 'shared':
+        from config.shared_cache import get_shared_cache
+        return get_shared_cache()
+    return QueryCache(max_entries=FRAGMENT_CACHE_MAX_ENTRIES, max_bytes=FRAGMENT_CACHE_MAX_BYTES)
+
+
+_fragments = _create_store()
+
+
+def get_fragment_cache_stats():
+    """Contadores do cache de fragmentos"""
+    return _fragments.stats()
+
+
+class FragmentCacheExtension(Extension):
+    """Tag {% cache parte, parte... %}...{% endcache %}"""
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        partes = [nodes.Const(parser.name), parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            partes.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(partes)]),
+                               [], [], body).set_lineno(lineno)
+
+    def _render(self, partes, caller):
+        if not cache_enabled() or any(p is None for p in partes):
+            return caller()
+        chave = ('fragment', FRAGMENT_CACHE_VERSION, tuple(partes))
+        try:
+            hash(chave)
+        except TypeError:
+            return caller()
+        encontrado, html = _fragments.get(chave)
+        if encontrado:
+            return Markup(html)
+        html = caller()
+        _fragments.set(chave, str(html), (), time.time() + FRAGMENT_CACHE_TTL)
+        return html
+
+
+def init_app(app):
+    """Liga a tag {% cache %} e o cache de bytecode dos templates"""
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    # Templates compilados ficam em disco: um worker novo não recompila tudo
+    if JINJA_BYTECODE_CACHE_DIR:
+        os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR)
+    else:
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
@@ -0,0 +1,195 @@
+import os
+import re
+import time
+import logging
+import threading
+import unicodedata
+from config.shared_cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+# Geocodificação (endereço -> coordenadas) e geocodificação reversa
+# (coordenadas -> endereço) com cache persistente. O Nominatim aceita uma
+# requisição por segundo, então cada consulta nova custa ao menos 1 s:
+# as respostas ficam num arquivo SQLite próprio (o mesmo SharedCache do
+# cache compartilhado, com limite e remoção LRU separados, para que
+# páginas e fragmentos não expulsem coordenadas), válido para todos os
+# workers e mantido entre reinícios e deploys.
+#
+# Endereços não encontrados também ficam guardados (por menos tempo), para
+# que o mesmo endereço ruim não volte ao geocodificador a cada mensagem.
+# Falhas de rede não são guardadas.
+
+GEOCODE_CACHE_PATH = os.getenv('GEOCODE_CACHE_PATH', 'geocode_cache.db')
+GEOCODE_CACHE_MAX_ENTRIES = int(os.getenv('GEOCODE_CACHE_MAX_ENTRIES', 50000))
+GEOCODE_CACHE_MAX_BYTES = int(os.getenv('GEOCODE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# Validade (s) das respostas e dos endereços não encontrados
+GEOCODE_CACHE_TTL = float(os.getenv('GEOCODE_CACHE_TTL', 30 * 24 * 3600))
+GEOCODE_NEGATIVE_TTL = float(os.getenv('GEOCODE_NEGATIVE_TTL', 24 * 3600))
+# Intervalo mínimo (s) entre requisições ao Nominatim (política de uso: 1/s)
+GEOCODE_MIN_DELAY = float(os.getenv('GEOCODE_MIN_DELAY', 1))
+GEOCODE_USER_AGENT = os.getenv('GEOCODE_USER_AGENT', 'encantos_da_ilha_turismo')
+# Servidor do Nominatim (um local, como localhost:8080 com GEOCODE_NOMINATIM_SCHEME=http,
+# serve de substituto em testes) e URL do Photon (vazia: sem Photon)
+GEOCODE_NOMINATIM_DOMAIN = os.getenv('GEOCODE_NOMINATIM_DOMAIN', 'nominatim.openstreetmap.org')
+GEOCODE_NOMINATIM_SCHEME = os.getenv('GEOCODE_NOMINATIM_SCHEME', 'https')
+GEOCODE_PHOTON_URL = os.getenv('GEOCODE_PHOTON_URL', 'https://photon.komoot.io/api/')
+
+CIDADE = "São Luís, MA, Brasil"
+# Partes finais do endereço que só repetem a cidade (a consulta já inclui CIDADE)
+SUFIXOS_CIDADE = {'sao luis', 'sao luis ma', 'sao luis - ma', 'ma', 'maranhao', 'brasil', 'brazil'}
+# Casas decimais das coordenadas na chave da geocodificação reversa (~1 m)
+CASAS_REVERSA = 5
+# Campos do OSM guardados da geocodificação reversa
+CAMPOS_REVERSA = ('display_name', 'tourism', 'amenity', 'historic', 'shop')
+
+
+def normalize_address(endereco):
+    """
+    Chave do endereço no cache: sem acentos, minúsculas, espaços e
+    pontuação uniformes e sem a cidade no final, para que "Rua Portugal,
+    São Luís - MA" e "rua  portugal" usem a mesma entrada.
+    """
+    texto = unicodedata.normalize('NFKD', str(endereco)).encode('ascii', 'ignore').decode('ascii').lower()
+    partes = [re.sub(r'[^\w\s-]', ' ', parte) for parte in texto.split(',')]
+    partes = [' '.join(parte.split()) for parte in partes]
+    partes = [parte for parte in partes if parte]
+    while len(partes) > 1 and partes[-1] in SUFIXOS_CIDADE:
+        partes.pop()
+    return ', '.join(partes)
+
+
+class Geocoder:
+    """
+    Geocodificador com cache. `provedores` são funções consulta -> (lat, lon)
+    ou None, tentadas em ordem; `reverso` é uma função (lat, lon) -> dict
+    (display_name, address e campos do OSM) ou None. Sem eles, usa o
+    Nominatim e o Photon.
+    """
+
+    def __init__(self, provedores=None, reverso=None, cache=None):
+        self.cache = cache if cache is not None else SharedCache(
+            GEOCODE_CACHE_PATH, GEOCODE_CACHE_MAX_ENTRIES, GEOCODE_CACHE_MAX_BYTES)
+        self._provedores = provedores
+        self._reverso = reverso
+        self._lock = threading.Lock()
+        self.consultas = 0
+
+    # ===== Endereço -> coordenadas =====
+
+    def cached(self, endereco):
+        """(True, coordenadas ou None se não encontrado) se o endereço já está no cache"""
+        return self.cache.get(('geocode', normalize_address(endereco)))
+
+    def store(self, endereco, coords):
+        """Guarda as coordenadas de um endereço (None: não encontrado)"""
+        validade = GEOCODE_CACHE_TTL if coords is not None else GEOCODE_NEGATIVE_TTL
+        if coords is not None:
+            coords = (float(coords[0]), float(coords[1]))
+        self.cache.set(('geocode', normalize_address(endereco)), coords, ('geocode',), time.time() + validade)
+
+    def geocode(self, endereco):
+        """Coordenadas (lat, lon) do endereço em São Luís, ou None se não encontrado"""
+        encontrado, coords = self.cached(endereco)
+        if encontrado:
+            return coords
+        consulta = f"{endereco}, {CIDADE}"
+        falhou = False
+        for provedor in self._provedores or self._padrao():
+            try:
+                coords = provedor(consulta)
+            except Exception as e:
+                logger.warning(f"Geocodificação de '{endereco}' falhou: {e}")
+                falhou = True
+                continue
+            finally:
+                self.consultas += 1
+            if coords is not None:
+                self.store(endereco, coords)
+                return (float(coords[0]), float(coords[1]))
+        # Só guarda o "não encontrado" se todos os provedores responderam
+        if not falhou:
+            self.store(endereco, None)
+        return None
+
+    # ===== Coordenadas -> endereço =====
+
+    def reverse(self, lat, lon):
+        """Endereço das coordenadas (dict com display_name, address e campos do OSM) ou None"""
+        chave = ('reverse', round(float(lat), CASAS_REVERSA), round(float(lon), CASAS_REVERSA))
+        encontrado, local = self.cache.get(chave)
+        if encontrado:
+            return local
+        try:
+            local = (self._reverso or self._nominatim_reverso())(lat, lon)
+        except Exception as e:
+            logger.warning(f"Geocodificação reversa de ({lat}, {lon}) falhou: {e}")
+            return None
+        finally:
+            self.consultas += 1
+        validade = GEOCODE_CACHE_TTL if local is not None else GEOCODE_NEGATIVE_TTL
+        self.cache.set(chave, local, ('geocode',), time.time() + validade)
+        return local
+
+    # ===== Provedores padrão =====
+
+    def _nominatim(self):
+        with self._lock:
+            if not hasattr(self, '_geolocator'):
+                from geopy.geocoders import Nominatim
+                from geopy.extra.rate_limiter import RateLimiter
+                self._geolocator = Nominatim(user_agent=GEOCODE_USER_AGENT, domain=GEOCODE_NOMINATIM_DOMAIN,
+                                             scheme=GEOCODE_NOMINATIM_SCHEME)
+                # Erros sobem (em vez de virar None) para não serem guardados como "não encontrado"
+                self._geocode = RateLimiter(self._geolocator.geocode, min_delay_seconds=GEOCODE_MIN_DELAY,
+                                            swallow_exceptions=False)
+                self._reverse = RateLimiter(self._geolocator.reverse, min_delay_seconds=GEOCODE_MIN_DELAY,
+                                            swallow_exceptions=False)
+        return self._geocode, self._reverse
+
+    def _padrao(self):
+        geocode, _ = self._nominatim()
+
+        def nominatim(consulta):
+            local = geocode(consulta, exactly_one=True)
+            return (local.latitude, local.longitude) if local else None
+
+        return [nominatim, _photon] if GEOCODE_PHOTON_URL else [nominatim]
+
+    def _nominatim_reverso(self):
+        _, reverse = self._nominatim()
+
+        def nominatim(lat, lon):
+            local = reverse((lat, lon), language='pt', exactly_one=True)
+            if not local:
+                return None
+            dados = {campo: local.raw[campo] for campo in CAMPOS_REVERSA if campo in local.raw}
+            dados['address'] = local.address
+            return dados
+
+        return nominatim
+
+
+def _photon(consulta):
+    """Photon (komoot), usado quando o Nominatim não encontra o endereço"""
+    import requests
+    resposta = requests.get(GEOCODE_PHOTON_URL, params={'q': consulta, 'limit': 1}, timeout=10)
+    resposta.raise_for_status()
+    features = resposta.json().get('features')
+    if not features:
+        return None
+    lon, lat = features[0]['geometry']['coordinates'][:2]
+    return lat, lon
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder():
+    """Geocodificador do processo (o cache é aberto no primeiro uso)"""
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = Geocoder()
+        return _geocoder
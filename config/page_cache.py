@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import hashlib
+import functools
+from datetime import date
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask import Response, make_response, request, session
+from werkzeug.http import is_resource_modified
+from config.cache import QueryCache, cache_enabled, table_version
+from config.database import query_error_count
+
+# Cache de páginas inteiras com GET condicional. A versão de uma página é
+# derivada da versão (table_version) das tabelas que ela exibe, que vira o
+# ETag; revalidações com a mesma versão recebem 304 sem que a view seja
+# executada. Não há Last-Modified: a versão das tabelas é um contador, não
+# uma data, e o ETag também depende da data de hoje e do usuário; um
+# If-Modified-Since devolveria 304 para uma página que mudou.
+
+# Validade (s) do corpo guardado de uma página
+PAGE_CACHE_TTL = float(os.getenv('PAGE_CACHE_TTL', 300))
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv('PAGE_CACHE_MAX_ENTRIES', 256))
+PAGE_CACHE_MAX_BYTES = int(os.getenv('PAGE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# Entra no ETag: troque a cada deploy que altere templates
+PAGE_CACHE_VERSION = os.getenv('PAGE_CACHE_VERSION', '1')
+# Campos da sessão (gravados no login) que identificam quem vê a página e
+# podem aparecer nela: administradores e usuários ficam em tabelas
+# diferentes, então o mesmo user_id pode ser de duas pessoas
+SESSAO_NO_ETAG = ('user_id', 'user_type', 'user_name', 'user_email')
+
+_pages = QueryCache(max_entries=PAGE_CACHE_MAX_ENTRIES, max_bytes=PAGE_CACHE_MAX_BYTES)
+
+
+class CachedPage:
+    __slots__ = ('etag', 'body', 'content_type')
+
+    def __init__(self, etag, body, content_type):
+        self.etag = etag
+        self.body = body
+        self.content_type = content_type
+
+
+def get_page_cache_stats():
+    """Contadores do cache de páginas"""
+    return _pages.stats()
+
+
+def _apply_validators(response, etag):
+    response.set_etag(etag)
+    # O navegador pode guardar a página, mas revalida a cada acesso
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def cached_page(*tabelas):
+    """
+    Decorator para rotas GET que exibem dados de `tabelas`: responde 304 às
+    revalidações e, para visitantes anônimos, serve o HTML guardado enquanto
+    as tabelas não mudarem. Usuários logados só recebem o GET condicional.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not cache_enabled():
+                return view(*args, **kwargs)
+            # Mensagens flash pendentes precisam ser exibidas: sem cache nem 304
+            if '_flashes' in session:
+                return view(*args, **kwargs)
+
+            versoes = [table_version(t) for t in tabelas]
+            if None in versoes:
+                # Banco indisponível: sem versão não há como validar
+                return view(*args, **kwargs)
+
+            anonimo = 'user_id' not in session
+            # A página de um usuário logado (menu, nome) é só dele
+            usuario = None if anonimo else tuple(session.get(campo) for campo in SESSAO_NO_ETAG)
+            # A data entra porque as páginas mostram seções relativas a hoje
+            # ("neste fim de semana"), que mudam sem escrita nas tabelas
+            assinatura = repr((PAGE_CACHE_VERSION, date.today(), request.full_path, usuario, tabelas, versoes))
+            etag = hashlib.sha1(assinatura.encode('utf-8')).hexdigest()
+
+            if not is_resource_modified(request.environ, etag=etag):
+                return _apply_validators(Response(status=304), etag)
+
+            chave = ('page', request.full_path)
+            if anonimo:
+                encontrado, pagina = _pages.get(chave)
+                if encontrado and pagina.etag == etag:
+                    return _apply_validators(Response(pagina.body, content_type=pagina.content_type), etag)
+
+            erros = query_error_count()
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            _apply_validators(response, etag)
+
+            # Não guarda páginas que falharam ao consultar o banco ou que
+            # mexeram na sessão (mensagens flash, login)
+            if anonimo and not session.modified and query_error_count() == erros:
+                pagina = CachedPage(etag, response.get_data(), response.content_type)
+                _pages.set(chave, pagina, tabelas, time.time() + PAGE_CACHE_TTL)
+            return response
+        return wrapper
+    return decorator
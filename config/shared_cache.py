@@ -0,0 +1,278 @@
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Cache compartilhado entre os workers de um mesmo servidor (gunicorn com
+# vários processos), num arquivo SQLite em modo WAL: sem serviço externo,
+# sobrevive a reinícios e cada escrita é uma transação atômica. Tem a mesma
+# interface do QueryCache (get/set/invalidate por tag), então pode servir de
+# backend para o cache dos models (QUERY_CACHE_BACKEND=shared), para a
+# geocodificação do chat e para fragmentos renderizados.
+#
+# Os valores são gravados com pickle: o arquivo deve ficar num diretório
+# acessível só pelo usuário da aplicação.
+
+SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH', 'shared_cache.db')
+SHARED_CACHE_MAX_ENTRIES = int(os.getenv('SHARED_CACHE_MAX_ENTRIES', 20000))
+SHARED_CACHE_MAX_BYTES = int(os.getenv('SHARED_CACHE_MAX_BYTES', 128 * 1024 * 1024))
+# Espera (s) pelo lock de escrita de outro processo antes de desistir
+SHARED_CACHE_BUSY_TIMEOUT = float(os.getenv('SHARED_CACHE_BUSY_TIMEOUT', 2))
+
+# A data de último acesso (usada na remoção LRU) só é regravada depois deste
+# intervalo (s), para que leituras repetidas não virem escritas
+TOUCH_SECONDS = 30
+# Chaves maiores que isso são guardadas pelo hash
+MAX_KEY_LENGTH = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires);
+CREATE TABLE IF NOT EXISTS entry_tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entry_tags_key ON entry_tags (key);
+CREATE TABLE IF NOT EXISTS generations (
+    tag TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value) VALUES
+    ('bytes', 0), ('entries', 0), ('evictions', 0), ('invalidations', 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE meta SET value = value + NEW.size WHERE name = 'bytes';
+    UPDATE meta SET value = value + 1 WHERE name = 'entries';
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE meta SET value = value - OLD.size WHERE name = 'bytes';
+    UPDATE meta SET value = value - 1 WHERE name = 'entries';
+    DELETE FROM entry_tags WHERE key = OLD.key;
+END;
+"""
+
+
+def _encode_key(key):
+    """Chave textual estável entre processos (repr de tuplas de valores simples)"""
+    texto = key if isinstance(key, str) else repr(key)
+    if len(texto) > MAX_KEY_LENGTH:
+        return 'sha1:' + hashlib.sha1(texto.encode('utf-8')).hexdigest()
+    return texto
+
+
+class SharedCache:
+    """
+    Cache LRU com validade por entrada, limite de memória e invalidação por
+    tag, guardado num arquivo SQLite compartilhado pelos processos.
+
+    Erros do SQLite (arquivo travado por muito tempo, disco cheio) nunca
+    chegam a quem chamou: a leitura vira um miss e a escrita é descartada.
+    """
+
+    def __init__(self, path=SHARED_CACHE_PATH, max_entries=SHARED_CACHE_MAX_ENTRIES,
+                 max_bytes=SHARED_CACHE_MAX_BYTES, busy_timeout=SHARED_CACHE_BUSY_TIMEOUT):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        # Contadores deste processo
+        self.hits = 0
+        self.misses = 0
+
+    # ===== Conexões =====
+
+    def _connection(self):
+        # Uma conexão por thread; depois de um fork o processo filho abre a sua
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        # IMMEDIATE trava a escrita já no início: a verificação da geração e
+        # a gravação acontecem sem escritas de outros processos no meio
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ===== Interface do cache =====
+
+    def get(self, key):
+        """Retorna (True, valor) se a chave estiver no cache e válida"""
+        chave = _encode_key(key)
+        agora = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires, accessed FROM entries WHERE key = ?",
+                               (chave,)).fetchone()
+            if row is None or row[1] <= agora:
+                self.misses += 1
+                return False, None
+            if agora - row[2] > TOUCH_SECONDS:
+                try:
+                    conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (agora, chave))
+                except sqlite3.OperationalError:
+                    # Outro processo está escrevendo; o acesso fica para a próxima
+                    pass
+            value = pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logger.warning(f"Cache compartilhado: falha ao ler {chave}: {e}")
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, value
+
+    def _generation(self, conn, tags):
+        geracoes = {}
+        for tag in tags:
+            row = conn.execute("SELECT generation FROM generations WHERE tag = ?", (tag,)).fetchone()
+            geracoes[tag] = row[0] if row else 0
+        return tuple(geracoes[tag] for tag in tags)
+
+    def generation(self, tags):
+        try:
+            return self._generation(self._connection(), tags)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache compartilhado: falha ao ler gerações: {e}")
+            # Não coincide com nenhuma geração: o set() seguinte é descartado
+            return ()
+
+    def set(self, key, value, tags, expires, generation=None):
+        """Guarda um valor, a menos que alguma tag tenha sido invalidada desde `generation`"""
+        chave = _encode_key(key)
+        try:
+            dados = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Cache compartilhado: valor de {chave} não serializável: {e}")
+            return
+        size = len(dados) + len(chave)
+        if size > self.max_bytes:
+            return
+        try:
+            with self._transaction() as conn:
+                if generation is not None and generation != self._generation(conn, tags):
+                    return
+                conn.execute("DELETE FROM entries WHERE key = ?", (chave,))
+                conn.execute("INSERT INTO entries (key, value, expires, size, accessed) VALUES (?, ?, ?, ?, ?)",
+                             (chave, dados, expires, size, time.time()))
+                conn.executemany("INSERT OR IGNORE INTO entry_tags (tag, key) VALUES (?, ?)",
+                                 [(tag, chave) for tag in tags])
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Cache compartilhado: falha ao gravar {chave}: {e}")
+
+    def _meta(self, conn, name):
+        return conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()[0]
+
+    def _evict(self, conn):
+        """Remove as expiradas e, se ainda passar dos limites, as menos usadas"""
+        def _excesso():
+            entradas, tamanho = self._meta(conn, 'entries'), self._meta(conn, 'bytes')
+            return entradas - self.max_entries, tamanho - self.max_bytes
+
+        entradas, tamanho = _excesso()
+        if entradas <= 0 and tamanho <= 0:
+            return
+        conn.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+        entradas, tamanho = _excesso()
+        while entradas > 0 or tamanho > 0:
+            # Em blocos: sem saber o tamanho de cada entrada, remove ao menos
+            # o excesso de quantidade e no mínimo 16 por vez
+            lote = max(entradas, 16)
+            removidas = conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (lote,)).rowcount
+            conn.execute("UPDATE meta SET value = value + ? WHERE name = 'evictions'", (removidas,))
+            if removidas == 0:
+                break
+            entradas, tamanho = _excesso()
+
+    def invalidate(self, *tags):
+        """Descarta, em todos os processos, as entradas marcadas com alguma das tags"""
+        try:
+            with self._transaction() as conn:
+                for tag in tags:
+                    conn.execute("INSERT INTO generations (tag, generation) VALUES (?, 1) "
+                                 "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1", (tag,))
+                    removidas = conn.execute(
+                        "DELETE FROM entries WHERE key IN (SELECT key FROM entry_tags WHERE tag = ?)",
+                        (tag,)).rowcount
+                    conn.execute("UPDATE meta SET value = value + ? WHERE name = 'invalidations'",
+                                 (removidas,))
+        except sqlite3.Error as e:
+            logger.error(f"Cache compartilhado: falha ao invalidar {tags}: {e}")
+
+    def delete(self, key):
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM entries WHERE key = ?", (_encode_key(key),))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache compartilhado: falha ao remover {key}: {e}")
+
+    def clear(self):
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            logger.warning(f"Cache compartilhado: falha ao limpar: {e}")
+
+    def stats(self):
+        try:
+            conn = self._connection()
+            meta = dict(conn.execute("SELECT name, value FROM meta").fetchall())
+        except sqlite3.Error:
+            meta = {}
+        return {
+            'entries': meta.get('entries', 0),
+            'bytes': meta.get('bytes', 0),
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': meta.get('evictions', 0),
+            'invalidations': meta.get('invalidations', 0),
+        }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Instância do cache compartilhado do processo (o arquivo é aberto no primeiro uso)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedCache()
+        return _shared
@@ -0,0 +1,169 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, time
+from decimal import Decimal
+from functools import lru_cache
+from mysql.connector.errors import DatabaseError, IntegrityError, ProgrammingError
+
+# Backend embutido: executa as mesmas queries dos models (escritas para o
+# MySQL) sobre um arquivo SQLite em modo WAL. Este módulo imita a parte da
+# API do mysql.connector usada em config/database.py.
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'banco_sqlite.sql')
+
+# ===== Conversão de tipos =====
+# O SQLite guarda datas e decimais como texto; os templates esperam os
+# mesmos tipos Python que o MySQL devolve (date, time, Decimal, bool).
+
+sqlite3.register_adapter(date, lambda v: v.isoformat())
+sqlite3.register_adapter(datetime, lambda v: v.isoformat(sep=' ', timespec='seconds'))
+sqlite3.register_adapter(time, lambda v: v.isoformat(timespec='seconds'))
+sqlite3.register_adapter(Decimal, str)
+
+sqlite3.register_converter('DATE', lambda v: date.fromisoformat(v.decode()))
+sqlite3.register_converter('TIME', lambda v: time.fromisoformat(v.decode()))
+sqlite3.register_converter('TIMESTAMP', lambda v: datetime.fromisoformat(v.decode()))
+sqlite3.register_converter('DECIMAL', lambda v: Decimal(v.decode()))
+sqlite3.register_converter('BOOLEAN', lambda v: bool(int(v)))
+
+# ===== Dialeto =====
+
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|%s|%%")
+
+@lru_cache(maxsize=512)
+def translate(query):
+    """Converte os placeholders %s do MySQL para ? (fora de literais de texto)"""
+    def _troca(match):
+        token = match.group(0)
+        if token == '%s':
+            return '?'
+        if token == '%%':
+            return '%'
+        return token
+    return _PLACEHOLDER.sub(_troca, query)
+
+
+def _wrap_error(e):
+    """Converte erros do sqlite3 nos equivalentes do mysql.connector"""
+    if isinstance(e, sqlite3.IntegrityError):
+        return IntegrityError(msg=str(e))
+    if isinstance(e, sqlite3.ProgrammingError):
+        return ProgrammingError(msg=str(e))
+    return DatabaseError(msg=str(e))
+
+
+class SQLiteCursor:
+    """Cursor com a interface do MySQLCursor (dictionary=True)"""
+
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection._conn.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, query, params=None):
+        try:
+            self._cursor.execute(translate(query), tuple(params) if params else ())
+        except sqlite3.Error as e:
+            raise _wrap_error(e)
+
+    def executemany(self, query, seq_params):
+        try:
+            self._cursor.executemany(translate(query), [tuple(p) for p in seq_params])
+        except sqlite3.Error as e:
+            raise _wrap_error(e)
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([c[0] for c in self._cursor.description], row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(r) for r in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Conexão SQLite com a interface do MySQLConnection usada pelo pool"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            # O pool garante que só uma thread usa a conexão por vez
+            check_same_thread=False,
+            timeout=float(os.getenv('DB_SQLITE_BUSY_TIMEOUT', 5))
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+
+    def cursor(self, dictionary=False, buffered=False, prepared=False):
+        # O SQLite já lê as linhas sob demanda e mantém um cache próprio de
+        # statements compilados, então buffered/prepared não mudam nada
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        try:
+            self._conn.rollback()
+        except sqlite3.Error as e:
+            raise _wrap_error(e)
+
+    def is_connected(self):
+        try:
+            self._conn.execute('SELECT 1')
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self._conn.close()
+
+
+_bootstrap_lock = threading.Lock()
+_bootstrapped = set()
+
+def bootstrap(connection):
+    """Cria as tabelas de banco_sqlite.sql se o arquivo ainda estiver vazio"""
+    with _bootstrap_lock:
+        if connection.path in _bootstrapped:
+            return
+        existe = connection._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'eventos'"
+        ).fetchone()
+        if not existe:
+            with open(SCHEMA_PATH, encoding='utf-8') as f:
+                connection._conn.executescript(f.read())
+            connection._conn.commit()
+        _bootstrapped.add(connection.path)
+
+
+def connect(path):
+    """Abre (e, se necessário, inicializa) o banco SQLite em `path`"""
+    try:
+        connection = SQLiteConnection(path)
+        bootstrap(connection)
+        return connection
+    except sqlite3.Error as e:
+        raise _wrap_error(e)
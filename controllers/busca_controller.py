@@ -0,0 +1,81 @@
+from flask import request, url_for, jsonify
+from models.autocomplete import Autocomplete, AUTOCOMPLETE_LIMITE
+from models.entidades import Entidades
+from models.proximidade import Proximidade, PROXIMIDADE_LIMITE
+
+# Listagem aberta por cada tipo de sugestão (com ?busca=texto)
+LISTAGEM_POR_TIPO = {
+    'restaurante': 'restaurantes',
+    'bairro': 'restaurantes',
+    'evento': 'eventos',
+    'local': 'eventos',
+}
+
+# Página de cada categoria de ponto da busca por proximidade
+PAGINA_POR_PONTO = {
+    'restaurante': lambda id: url_for('restaurante_show', restaurante_id=id),
+    'evento': lambda id: url_for('evento_show', evento_id=id),
+}
+
+# Raio padrão e máximo (m) da busca por proximidade
+PROXIMIDADE_RAIO = 1000
+PROXIMIDADE_RAIO_MAX = 20000
+PROXIMIDADE_LIMITE_MAX = 200
+
+# Parâmetro da URL -> campo filtrado na busca por proximidade
+FILTROS_PROXIMIDADE = {
+    'culinaria': 'tipo_culinaria',
+    'preco': 'faixa_preco',
+    'bairro': 'bairro',
+    'tipo': 'tipo',
+    'local': 'local',
+}
+
+# Sem sugestões pelo início das palavras, sugere nomes parecidos (erros de digitação)
+TIPOS_CORRECAO = tuple(LISTAGEM_POR_TIPO)
+
+
+class BuscaController:
+    # 🔹 Sugestões da caixa de busca enquanto o usuário digita
+    def autocomplete(self):
+        termo = request.args.get('q', '').strip()
+        if not termo:
+            return jsonify([])
+        sugestoes = Autocomplete.sugestoes(termo, request.args.get('limite'))
+        if not sugestoes:
+            sugestoes = [{'texto': s['texto'], 'tipo': s['tipo']}
+                         for s in Entidades.parecidas(termo, AUTOCOMPLETE_LIMITE, tipos=TIPOS_CORRECAO)]
+        for sugestao in sugestoes:
+            sugestao['url'] = url_for(LISTAGEM_POR_TIPO[sugestao['tipo']], busca=sugestao['texto'])
+        resposta = jsonify(sugestoes)
+        # As sugestões mudam pouco: o navegador repete a resposta por um minuto
+        resposta.headers['Cache-Control'] = 'public, max-age=60'
+        return resposta
+
+    # 🔹 Restaurantes e eventos perto de um ponto (/api/nearby?lat=&lon=&radius=&kind=)
+    def proximos(self):
+        try:
+            lat = float(request.args['lat'])
+            lon = float(request.args['lon'])
+            raio = float(request.args.get('radius') or PROXIMIDADE_RAIO)
+            limite = int(request.args.get('limit') or PROXIMIDADE_LIMITE)
+        except (KeyError, ValueError):
+            return jsonify({"erro": "Informe lat e lon; radius e limit devem ser números."}), 400
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return jsonify({"erro": "Coordenadas fora do intervalo válido."}), 400
+        if not 0 < raio <= PROXIMIDADE_RAIO_MAX:
+            return jsonify({"erro": f"O raio deve estar entre 0 e {PROXIMIDADE_RAIO_MAX} metros."}), 400
+
+        categoria = request.args.get('kind') or None
+        if categoria is not None and categoria not in PAGINA_POR_PONTO:
+            return jsonify({"erro": f"kind deve ser um de: {', '.join(PAGINA_POR_PONTO)}."}), 400
+        filtros = {campo: request.args.get(param) for param, campo in FILTROS_PROXIMIDADE.items()
+                   if request.args.get(param)}
+        try:
+            pontos = Proximidade.proximos(lat, lon, raio, categoria, max(1, min(limite, PROXIMIDADE_LIMITE_MAX)),
+                                          **filtros)
+        except TypeError:
+            return jsonify({"erro": "Filtro não se aplica a essa categoria de ponto."}), 400
+        for ponto in pontos:
+            ponto['url'] = PAGINA_POR_PONTO[ponto['categoria']](ponto['id'])
+        return jsonify(pontos)
@@ -1,27 +1,23 @@
+from datetime import date
 from flask import render_template
+from models.estatistica import Estatistica
 from models.evento import Evento
-from models.restaurante import Restaurante
 
 class DashboardController:
     
     def index(self):
         """Exibe o dashboard principal"""
         try:
-            # Estatísticas gerais
-            total_eventos = Evento.get_count()
-            total_restaurantes = Restaurante.get_count()
-            eventos_hoje = Evento.get_eventos_hoje()
-            locais_unicos = Evento.get_locais_unicos()
-            
+            # Estatísticas gerais: uma leitura dos contadores, de custo constante
+            dados = Estatistica.get_dashboard()
             # Próximos eventos
-            proximos_eventos = Evento.get_proximos_eventos(5)
+            dados['proximos_eventos'] = Evento.get_proximos_eventos(5)
+            # Eventos em andamento hoje (inclusive os que começaram antes)
+            hoje = date.today()
+            dados['em_andamento'] = Evento.active_between(hoje, hoje, limite=10)
+            dados['total_em_andamento'] = Evento.count_active_between(hoje, hoje)
             
-            return render_template('dashboard/index.html',
-                                 total_eventos=total_eventos,
-                                 total_restaurantes=total_restaurantes,
-                                 eventos_hoje=eventos_hoje,
-                                 locais_unicos=locais_unicos,
-                                 proximos_eventos=proximos_eventos)
+            return render_template('dashboard/index.html', **dados)
         except Exception as e:
             # Em caso de erro, retorna valores padrão
             return render_template('dashboard/index.html',
@@ -29,5 +25,6 @@ class DashboardController:
                                  total_restaurantes=0,
                                  eventos_hoje=0,
                                  locais_unicos=0,
-                                 proximos_eventos=[])
-
+                                 proximos_eventos=[],
+                                 em_andamento=[],
+                                 total_em_andamento=0)
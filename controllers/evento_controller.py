@@ -1,29 +1,62 @@
-from flask import request, flash, redirect, url_for, render_template, current_app
+from flask import request, flash, redirect, url_for, render_template, current_app, jsonify
 from werkzeug.utils import secure_filename
-from models.evento import Evento
+from models.evento import Evento, FAIXAS_PRECO
 from models.restaurante import Restaurante
-from datetime import datetime
+from config.async_database import async_enabled, run_async
+from datetime import datetime, date, timedelta
+import asyncio
 import os
 
+# Eventos exibidos na seção "Neste fim de semana" da página pública
+FIM_DE_SEMANA_LIMITE = 10
+# Maior intervalo (dias) aceito pela API do calendário
+CALENDARIO_MAX_DIAS = 366
+# Filtros da listagem: parâmetro da URL -> faceta do model
+FILTROS_URL = {'tipo': 'tipo', 'preco': 'faixa_preco'}
+TIPOS_EVENTO = ['Show', 'Evento', 'Festival', 'Teatro', 'Exposição']
+
 class EventoController:
 
     # 🔹 Método para exibir a lista de eventos internos (admin/usuário)
     def index(self):
         try:
-            eventos = Evento.get_all()
-            return render_template("eventos/index.html", eventos=eventos)
+            busca = request.args.get('busca', '').strip()
+            # Os filtros se combinam (E entre filtros, OU entre valores do mesmo filtro)
+            filtros = {faceta: tuple(request.args.getlist(param)) for param, faceta in FILTROS_URL.items()}
+            pagina = Evento.paginate(depois=request.args.get('depois'),
+                                     antes=request.args.get('antes'),
+                                     limite=request.args.get('limite'),
+                                     busca=busca or None, **filtros)
+            return render_template("eventos/index.html", eventos=pagina.items, pagina=pagina, busca=busca,
+                                   filtros=filtros, facetas=Evento.facetas(busca=busca or None, **filtros),
+                                   tipos=TIPOS_EVENTO, faixas_preco=[rotulo for _, rotulo in FAIXAS_PRECO])
         except Exception as e:
             flash(f"Erro ao carregar eventos: {str(e)}", "error")
-            return render_template("eventos/index.html", eventos=[])
+            return render_template("eventos/index.html", eventos=[], pagina=None)
 
     # 🔹 Página pública que mostra eventos + restaurantes
     def index_visitante(self):
         try:
-            eventos = Evento.get_all()
-            restaurantes = Restaurante.get_all()
+            # Cada carrossel pagina de forma independente, com seus próprios cursores
+            args = request.args
+            eventos_cursores = dict(depois=args.get('eventos_depois'), antes=args.get('eventos_antes'),
+                                    limite=args.get('limite'))
+            restaurantes_cursores = dict(depois=args.get('restaurantes_depois'),
+                                         antes=args.get('restaurantes_antes'), limite=args.get('limite'))
+            if async_enabled():
+                # As duas listagens são buscadas em paralelo
+                eventos, restaurantes = run_async(
+                    self.index_visitante_async(eventos_cursores, restaurantes_cursores))
+            else:
+                eventos = Evento.paginate(**eventos_cursores)
+                restaurantes = Restaurante.paginate(**restaurantes_cursores)
+            sabado, domingo = self._fim_de_semana()
             return render_template("visitantes.html",
-                                   eventos=eventos,
-                                   restaurantes=restaurantes,
+                                   eventos=eventos.items,
+                                   restaurantes=restaurantes.items,
+                                   eventos_pagina=eventos,
+                                   restaurantes_pagina=restaurantes,
+                                   fim_de_semana=Evento.active_between(sabado, domingo, limite=FIM_DE_SEMANA_LIMITE),
                                    esconder_menu=True)
         except Exception as e:
             flash(f'Erro ao carregar dados públicos: {str(e)}', 'error')
@@ -32,6 +65,20 @@ class EventoController:
                                    restaurantes=[],
                                    esconder_menu=True)
 
+    # 🔹 Sábado e domingo deste fim de semana (a partir de hoje, se já for fim de semana)
+    @staticmethod
+    def _fim_de_semana():
+        hoje = date.today()
+        if hoje.weekday() == 6:
+            return hoje, hoje
+        sabado = hoje + timedelta(days=5 - hoje.weekday())
+        return sabado, sabado + timedelta(days=1)
+
+    # 🔹 Busca assíncrona dos dados da página pública
+    async def index_visitante_async(self, eventos_cursores, restaurantes_cursores):
+        return await asyncio.gather(Evento.paginate_async(**eventos_cursores),
+                                    Restaurante.paginate_async(**restaurantes_cursores))
+
     # 🔹 Página de criação de evento (GET)
     def create(self):
         tipos = ['Show', 'Evento', 'Festival', 'Teatro', 'Exposição']
@@ -182,6 +229,32 @@ class EventoController:
             flash(f"Erro ao carregar evento: {str(e)}", "error")
             return redirect(url_for("eventos"))
 
+    # 🔹 API do calendário: eventos em andamento entre ?inicio= e ?fim= (AAAA-MM-DD)
+    def calendario(self):
+        try:
+            inicio = date.fromisoformat(request.args['inicio']) if request.args.get('inicio') else date.today()
+            fim = date.fromisoformat(request.args['fim']) if request.args.get('fim') else inicio + timedelta(days=30)
+        except ValueError:
+            return jsonify({"erro": "Datas devem estar no formato AAAA-MM-DD."}), 400
+        if fim < inicio:
+            return jsonify({"erro": "A data final deve ser igual ou posterior à inicial."}), 400
+        if (fim - inicio).days > CALENDARIO_MAX_DIAS:
+            return jsonify({"erro": f"O intervalo máximo é de {CALENDARIO_MAX_DIAS} dias."}), 400
+
+        eventos = Evento.active_between(inicio, fim)
+        # Formato de eventos de dia inteiro dos calendários JS (FullCalendar):
+        # o fim é exclusivo, por isso o dia seguinte ao último
+        return jsonify([{
+            "id": evento.id,
+            "title": evento.nome_evento,
+            "start": evento.data_inicio.isoformat(),
+            "end": ((evento.data_fim or evento.data_inicio) + timedelta(days=1)).isoformat(),
+            "allDay": True,
+            "tipo": evento.tipo,
+            "local": evento.local,
+            "url": url_for("evento_show", evento_id=evento.id),
+        } for evento in eventos])
+
     # 🔹 Deleção de evento
     def delete(self, evento_id):
         try:
@@ -5,14 +5,19 @@ import requests
 import json
 import math
 import random
+import time
 from datetime import datetime
 from functools import lru_cache
 from flask import jsonify, request, session, redirect, url_for, render_template
 from langchain_groq import ChatGroq
-from geopy.geocoders import Nominatim
-from geopy.extra.rate_limiter import RateLimiter
-from geopy.distance import great_circle
 from config.database import execute_query, execute_query_one
+from config.geocoding import get_geocoder
+from models.evento import Evento
+from models.restaurante import Restaurante
+from models.distancias import Distancias, comprimento
+from models.entidades import Entidades, PONTOS_TURISTICOS
+from models.rotas import otimizar_rota
+from models.search_index import normalizar
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -21,7 +26,17 @@ from bs4 import BeautifulSoup  # Para web scraping
 
 logger = logging.getLogger(__name__)
 
+# Máximo de locais reconhecidos numa mensagem e tipos de nome que são lugares
+LOCAIS_LIMITE = 5
+TIPOS_LOCAL = ('ponto_turistico', 'local', 'bairro', 'restaurante')
+
+# Centro de São Luís, usado quando o endereço não é encontrado
+CENTRO_SAO_LUIS = (-2.530731, -44.306396)
+
 class GeoChatController:
+    # Quantidade de documentos enviados por vez ao ChromaDB
+    RAG_BATCH_SIZE = 500
+
     def __init__(self):
         try:
             self.groq_api_key = os.getenv("GROQ_API_KEY")
@@ -41,13 +56,8 @@ class GeoChatController:
             self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
             self.vector_store = self._setup_vector_store()
             
-            # Configurações de geolocalização
-            self.geolocator = Nominatim(user_agent="encantos_da_ilha_turismo")
-            self.geocode = RateLimiter(self.geolocator.geocode, min_delay_seconds=1)
-            self.reverse_geocode = RateLimiter(self.geolocator.reverse, min_delay_seconds=1)
-            
-            # Cache de localizações
-            self.location_cache = {}
+            # Geocodificação (Nominatim/Photon) com cache persistente, compartilhado pelos workers
+            self.geocoder = get_geocoder()
             
             # Configurações de segurança
             self.blocked_terms = ["senha", "admin", "sql", "delete", "drop", "insert", "update", "alter", "grant"]
@@ -61,30 +71,42 @@ class GeoChatController:
     def _setup_vector_store(self):
         """Configura o ChromaDB com dados do banco"""
         try:
-            # Carrega dados do banco para o RAG
-            events = execute_query("SELECT * FROM eventos")
-            restaurants = execute_query("SELECT * FROM restaurantes")
-            
-            documents = []
-            for event in events:
-                doc = f"Evento: {event['nome_evento']}. Tipo: {event['tipo']}. Descrição: {event['descricao']}. "
-                doc += f"Local: {event['local']}, {event['endereco']}. Data: {event['data_inicio']} a {event['data_fim']}. "
-                doc += f"Preço: {event['preco'] or 'Grátis'}. Capacidade: {event['capacidade']} pessoas."
-                documents.append(doc)
-            
-            for restaurant in restaurants:
-                doc = f"Restaurante: {restaurant['nome_restaurante']}. Culinária: {restaurant['tipo_culinaria']}. "
-                doc += f"Endereço: {restaurant['endereco']}, {restaurant['bairro']}. Preço: {restaurant['faixa_preco']}. "
-                doc += f"Abre às: {restaurant['horario_funcionamento']}. Capacidade: {restaurant['capacidade']} lugares."
-                documents.append(doc)
-            
-            # Divide documentos e cria vetores
-            texts = self.text_splitter.split_text("\n\n".join(documents))
-            return Chroma.from_texts(texts, self.embeddings)
+            # Os documentos são indexados em lotes à medida que as linhas chegam
+            # do banco, sem carregar as tabelas inteiras na memória
+            vector_store = Chroma(embedding_function=self.embeddings)
+            lote = []
+            for doc in self._iter_rag_documents():
+                lote.append(doc)
+                if len(lote) >= self.RAG_BATCH_SIZE:
+                    self._add_rag_batch(vector_store, lote)
+                    lote = []
+            if lote:
+                self._add_rag_batch(vector_store, lote)
+            return vector_store
         except Exception as e:
             logger.error(f"Erro ao configurar ChromaDB: {str(e)}")
             return None
 
+    def _iter_rag_documents(self):
+        """Gera um documento de texto por evento e por restaurante do banco"""
+        for event in Evento.iter_all():
+            doc = f"Evento: {event.nome_evento}. Tipo: {event.tipo}. Descrição: {event.descricao}. "
+            doc += f"Local: {event.local}, {event.endereco}. Data: {event.data_inicio} a {event.data_fim}. "
+            doc += f"Preço: {event.preco or 'Grátis'}. Capacidade: {event.capacidade} pessoas."
+            yield doc
+
+        for restaurant in Restaurante.iter_all():
+            doc = f"Restaurante: {restaurant.nome_restaurante}. Culinária: {restaurant.tipo_culinaria}. "
+            doc += f"Endereço: {restaurant.endereco}, {restaurant.bairro}. Preço: {restaurant.faixa_preco}. "
+            doc += f"Abre às: {restaurant.horario_funcionamento}. Capacidade: {restaurant.capacidade} lugares."
+            yield doc
+
+    def _add_rag_batch(self, vector_store, documents):
+        """Divide um lote de documentos e adiciona os vetores ao ChromaDB"""
+        texts = self.text_splitter.split_text("\n\n".join(documents))
+        if texts:
+            vector_store.add_texts(texts)
+
     def _rag_search(self, query):
         """Busca contexto relevante usando RAG"""
         if not self.vector_store:
@@ -116,59 +138,45 @@ class GeoChatController:
     def _get_precise_coordinates(self, address):
         """Obtém coordenadas precisas com múltiplas estratégias"""
         try:
-            # Cache
-            if address in self.location_cache:
-                return self.location_cache[address]
+            # Cache (inclui endereços já procurados e não encontrados)
+            encontrado, coords = self.geocoder.cached(address)
+            if encontrado:
+                return coords or CENTRO_SAO_LUIS
             
             # Tenta encontrar no banco de dados
             event = execute_query_one("SELECT latitude, longitude FROM eventos WHERE endereco LIKE %s", (f"%{address}%",))
             if event and event.get('latitude'):
                 coords = (event['latitude'], event['longitude'])
-                self.location_cache[address] = coords
+                self.geocoder.store(address, coords)
                 return coords
             
             restaurant = execute_query_one("SELECT latitude, longitude FROM restaurantes WHERE endereco LIKE %s", (f"%{address}%",))
             if restaurant and restaurant.get('latitude'):
                 coords = (restaurant['latitude'], restaurant['longitude'])
-                self.location_cache[address] = coords
+                self.geocoder.store(address, coords)
                 return coords
             
-            # OpenStreetMap Nominatim
-            location = self.geocode(f"{address}, São Luís, MA, Brasil", exactly_one=True)
-            if location:
-                coords = (location.latitude, location.longitude)
-                self.location_cache[address] = coords
+            # OpenStreetMap Nominatim e, se não encontrar, Photon
+            coords = self.geocoder.geocode(address)
+            if coords:
                 return coords
             
-            # API alternativa (Photon)
-            photon_url = f"https://photon.komoot.io/api/?q={address}, São Luís, Brasil&limit=1"
-            response = requests.get(photon_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data['features']:
-                    coords = (
-                        data['features'][0]['geometry']['coordinates'][1],
-                        data['features'][0]['geometry']['coordinates'][0]
-                    )
-                    self.location_cache[address] = coords
-                    return coords
-            
             # Fallback: Centro de São Luís
-            return (-2.530731, -44.306396)
+            return CENTRO_SAO_LUIS
         
         except Exception as e:
             logger.error(f"Erro na geocodificação de '{address}': {str(e)}")
-            return (-2.530731, -44.306396)
+            return CENTRO_SAO_LUIS
 
     def _get_location_details(self, lat, lon):
         """Obtém detalhes ricos de uma localização"""
         try:
-            location = self.reverse_geocode((lat, lon), language='pt', exactly_one=True)
+            location = self.geocoder.reverse(lat, lon)
             if location:
                 return {
-                    "name": location.raw.get('display_name', '').split(',')[0],
-                    "address": location.address,
-                    "type": self._determine_location_type(location.raw),
+                    "name": location.get('display_name', '').split(',')[0],
+                    "address": location['address'],
+                    "type": self._determine_location_type(location),
                     "lat": lat,
                     "lon": lon
                 }
@@ -236,16 +244,6 @@ class GeoChatController:
 
     def _extract_location_entities(self, text):
         """Extrai entidades geográficas do texto usando heurísticas avançadas"""
-        # Lista de locais conhecidos em São Luís
-        sao_luis_landmarks = [
-            "centro histórico", "praia grande", "lagoa da jansen", "palácio dos leões",
-            "teatro arthur azevedo", "fonte do ribeirão", "catedral de são luís",
-            "convento das mercês", "museu histórico", "cafua das mercês",
-            "praça dom pedro ii", "praça maria aragão", "feira da praia grande",
-            "parque do bom menino", "ponte josé sarney", "avenida litorânea",
-            "reviver", "rua portugal", "rua da estrela", "são francisco", "ribeirão"
-        ]
-        
         # Padrões para detecção
         patterns = [
             r"(?:perto|próximo|próxima|nas proximidades|perto de|ao lado do?|vizinho ao?)\s+([\w\s]+)",
@@ -257,9 +255,20 @@ class GeoChatController:
         
         # Verificação contra lista de locais conhecidos
         text_lower = text.lower()
-        for landmark in sao_luis_landmarks:
-            if landmark in text_lower:
-                return [landmark]
+        exatos = [landmark for landmark in PONTOS_TURISTICOS if landmark in text_lower]
+        # Sem repetir o mesmo lugar ("ribeirão" já está em "fonte do ribeirão")
+        locais = [nome for nome in exatos if not any(nome != outro and nome in outro for outro in exatos)]
+
+        # Pontos turísticos, restaurantes, locais de eventos e bairros citados,
+        # mesmo com erros de digitação ("lagoa da jansem", "teatro artur azevdo")
+        vistos = [normalizar(nome) for nome in locais]
+        for entidade in Entidades.mencionadas(text, limite=LOCAIS_LIMITE, tipos=TIPOS_LOCAL):
+            nome = normalizar(entidade['texto'])
+            if not any(nome in visto or visto in nome for visto in vistos):
+                locais.append(entidade['texto'])
+                vistos.append(nome)
+        if locais:
+            return locais[:LOCAIS_LIMITE]
         
         # Aplicação de expressões regulares
         for pattern in patterns:
@@ -313,32 +322,16 @@ class GeoChatController:
             logger.error(f"Erro ao buscar imagens: {str(e)}")
             return []
 
-    def _calculate_distance(self, point1, point2):
-        """Calcula a distância em metros entre dois pontos (lat, lon)"""
-        return great_circle(point1, point2).meters
-
-    def _generate_itinerary(self, points):
-        """Gera um itinerário otimizado entre pontos"""
-        # Algoritmo simples para ordenar pontos (poderia usar TSP em implementação real)
-        optimized_points = [points[0]]
-        remaining_points = points[1:]
-        
-        while remaining_points:
-            closest_point = min(
-                remaining_points, 
-                key=lambda p: self._calculate_distance(optimized_points[-1], p)
-            )
-            optimized_points.append(closest_point)
-            remaining_points.remove(closest_point)
-        
-        # Calcula distâncias totais
-        total_distance = 0
-        for i in range(len(optimized_points) - 1):
-            total_distance += self._calculate_distance(optimized_points[i], optimized_points[i+1])
+    def _generate_itinerary(self, points, start=0, end=None):
+        """Gera um itinerário otimizado entre pontos, saindo de points[start] (e terminando em points[end])"""
+        # Matriz de distâncias calculada (ou recortada da matriz em memória) de uma vez
+        matriz = Distancias.matriz(points)
+        # Ordem ótima (Held-Karp) para poucos pontos, busca local com prazo para muitos
+        ordem = otimizar_rota(matriz, start, end)
         
         return {
-            "points": optimized_points,
-            "total_distance": total_distance
+            "points": [points[i] for i in ordem],
+            "total_distance": comprimento(matriz, ordem)
         }
 
     def chat_page(self):
@@ -7,6 +7,14 @@ from models.evento import Evento
 # Constantes reutilizáveis
 TIPOS_CULINARIA = ['Brasileira', 'Maranhense', 'Italiana', 'Japonesa', 'Mexicana', 'Francesa']
 FAIXAS_PRECO = ['$ - Economico', '$$ - Moderado', '$$$ - Caro', '$$$$ - Muito Caro']
+# Filtros da listagem: parâmetro da URL -> faceta do model
+FILTROS_URL = {'culinaria': 'tipo_culinaria', 'preco': 'faixa_preco', 'bairro': 'bairro'}
+# Comodidades (caixas de seleção): parâmetro da URL -> (faceta, rótulo)
+COMODIDADES_URL = {
+    'delivery': ('tem_delivery', 'Delivery'),
+    'reservas': ('aceita_reservas', 'Aceita reservas'),
+    'estacionamento': ('tem_estacionamento', 'Estacionamento'),
+}
 
 class EventoController:
     def index_visitante(self):
@@ -32,29 +40,31 @@ class RestauranteController:
 
     def index(self):
         try:
-            busca = request.args.get('busca', '')
-            culinaria_filtro = request.args.get('culinaria', 'Todas')
-            preco_filtro = request.args.get('preco', 'Todas')
-
-            if busca:
-                restaurantes = Restaurante.search(busca)
-            elif culinaria_filtro != 'Todas':
-                restaurantes = Restaurante.filter_by_culinaria(culinaria_filtro)
-            elif preco_filtro != 'Todas':
-                restaurantes = Restaurante.filter_by_preco(preco_filtro)
-            else:
-                restaurantes = Restaurante.get_all()
+            busca = request.args.get('busca', '').strip()
+            # Busca e filtros se combinam (E entre filtros, OU entre valores do mesmo filtro)
+            filtros = {faceta: tuple(request.args.getlist(param)) for param, faceta in FILTROS_URL.items()}
+            for param, (faceta, _) in COMODIDADES_URL.items():
+                if request.args.get(param):
+                    filtros[faceta] = True
+
+            pagina = Restaurante.paginate(depois=request.args.get('depois'),
+                                          antes=request.args.get('antes'),
+                                          limite=request.args.get('limite'),
+                                          busca=busca or None,
+                                          **filtros)
 
             return render_template('restaurantes/index.html',
-                                   restaurantes=restaurantes,
+                                   restaurantes=pagina.items,
+                                   pagina=pagina,
                                    tipos_culinaria=TIPOS_CULINARIA,
                                    faixas_preco=FAIXAS_PRECO,
                                    busca=busca,
-                                   culinaria_filtro=culinaria_filtro,
-                                   preco_filtro=preco_filtro)
+                                   filtros=filtros,
+                                   facetas=Restaurante.facetas(busca=busca or None, **filtros),
+                                   comodidades=COMODIDADES_URL)
         except Exception as e:
             flash(f'Erro ao carregar restaurantes: {str(e)}', 'error')
-            return render_template('restaurantes/index.html', restaurantes=[])
+            return render_template('restaurantes/index.html', restaurantes=[], pagina=None)
 
     def show(self, restaurante_id):
         try:
@@ -0,0 +1,82 @@
+"""
+Linha de comando das migrações:
+
+    python -m migrations status
+    python -m migrations upgrade [--to VERSAO]
+    python -m migrations downgrade --to VERSAO
+    python -m migrations check [--seed N]
+    python -m migrations warm-geocode
+    python -m migrations backfill-coordinates [--limit N] [--interval S]
+
+`check` roda EXPLAIN em cada leitura dos models e termina com código 1 se
+alguma cair em varredura completa de tabela. Use --seed apenas num banco
+descartável: ele insere N eventos e N restaurantes sintéticos.
+
+`warm-geocode` preenche o cache de geocodificação com os pontos turísticos
+e os endereços do banco (rode no deploy, depois do upgrade).
+`backfill-coordinates` grava latitude/longitude das linhas que ainda não
+têm, com ao menos S segundos entre consultas ao geocodificador; pode ser
+interrompido e rodado de novo.
+"""
+import os
+import sys
+import logging
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from migrations import runner
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m migrations')
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('status', help='lista as migrações e se já foram aplicadas')
+    up = sub.add_parser('upgrade', help='aplica as migrações pendentes')
+    up.add_argument('--to', type=int, default=None)
+    down = sub.add_parser('downgrade', help='reverte migrações acima de uma versão')
+    down.add_argument('--to', type=int, required=True)
+    chk = sub.add_parser('check', help='verifica com EXPLAIN se as queries usam índices')
+    chk.add_argument('--seed', type=int, default=0)
+    sub.add_parser('warm-geocode', help='geocodifica os endereços que faltam no cache de geocodificação')
+    back = sub.add_parser('backfill-coordinates', help='preenche as coordenadas das linhas sem latitude/longitude')
+    back.add_argument('--limit', type=int, default=None)
+    back.add_argument('--interval', type=float, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.comando == 'status':
+        for migration, aplicada in runner.status():
+            print(f"[{'x' if aplicada else ' '}] {migration}")
+    elif args.comando == 'upgrade':
+        executadas = runner.upgrade(args.to)
+        print(f"{len(executadas)} migração(ões) aplicada(s)")
+    elif args.comando == 'downgrade':
+        revertidas = runner.downgrade(args.to)
+        print(f"{len(revertidas)} migração(ões) revertida(s)")
+    elif args.comando == 'check':
+        from migrations import explain_check
+        if args.seed:
+            explain_check.seed(args.seed)
+        falhas = explain_check.check()
+        if falhas:
+            print(f"{len(falhas)} query(s) sem índice")
+            return 1
+        print("Todas as queries usam índice")
+    elif args.comando == 'warm-geocode':
+        from migrations import geocodificacao
+        totais = geocodificacao.aquecer()
+        print(f"{totais['em_cache']} já no cache, {totais['geocodificados']} geocodificado(s), "
+              f"{totais['nao_encontrados']} não encontrado(s)")
+    elif args.comando == 'backfill-coordinates':
+        from migrations import geocodificacao
+        opcoes = {'limite': args.limit}
+        if args.interval is not None:
+            opcoes['intervalo'] = args.interval
+        totais = geocodificacao.backfill(**opcoes)
+        print(f"{totais['preenchidas']} linha(s) preenchida(s), {totais['nao_encontradas']} não encontrada(s), "
+              f"{totais['sem_endereco']} sem endereço")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import os
+import re
+import sys
+import random
+import logging
+from datetime import date, time, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.cache import contador_versao, get_cache
+from config.database import PRIMARY, SQLITE, get_backend, get_pool, register_query_hook
+from models.autocomplete import Autocomplete
+from models.coordenadas import Coordenadas
+from models.entidades import Entidades
+from models.estatistica import Estatistica
+from models.evento import Evento
+from models.memory_index import carregar_todos
+from models.proximidade import Proximidade
+from models.restaurante import Restaurante
+
+logger = logging.getLogger(__name__)
+
+# Verifica, com EXPLAIN, se cada leitura dos models usa índice. Os models são
+# chamados de verdade e o SQL executado é capturado pelo hook de
+# instrumentação, então a verificação acompanha qualquer mudança nas queries.
+
+# Leituras que varrem a tabela por natureza (e o motivo)
+FULL_SCAN_ALLOWED = {
+    'Evento.get_all': 'listagem sem LIMIT lê a tabela inteira',
+    'Restaurante.get_all': 'listagem sem LIMIT lê a tabela inteira',
+    'Evento.filter_by_status(realizados)': 'intervalo aberto no passado cobre boa parte da tabela',
+    'memory_index.carregar_todos': 'monta os índices em memória lendo as tabelas inteiras',
+}
+
+TABELAS = ('eventos', 'restaurantes')
+
+_captured = None
+
+@register_query_hook
+def _capture(info):
+    if _captured is not None:
+        _captured.append(info)
+
+
+def model_reads():
+    """(nome, chamada) de cada leitura feita pelos models"""
+    return [
+        # Os índices em memória são montados antes, para que as consultas
+        # que dependem deles só busquem as linhas encontradas
+        ('memory_index.carregar_todos', carregar_todos),
+        ('Evento.get_all', Evento.get_all),
+        ('Evento.get_by_id', lambda: Evento.get_by_id(1)),
+        ('Evento.filter_by_type', lambda: Evento.filter_by_type('Show')),
+        ('Evento.filter_by_status(proximos)', lambda: Evento.filter_by_status('proximos')),
+        ('Evento.filter_by_status(realizados)', lambda: Evento.filter_by_status('realizados')),
+        ('Evento.get_count', Evento.get_count),
+        ('Evento.get_eventos_hoje', Evento.get_eventos_hoje),
+        ('Evento.get_locais_unicos', Evento.get_locais_unicos),
+        ('Evento.get_proximos_eventos', lambda: Evento.get_proximos_eventos(5)),
+        ('Evento.search', lambda: Evento.search('festival')),
+        ('Evento.paginate(busca)', lambda: Evento.paginate(busca='festival')),
+        ('Evento.paginate(facetas)', lambda: Evento.paginate(tipo='Show', faixa_preco='Gratuito')),
+        ('Evento.facetas', lambda: Evento.facetas(busca='festival')),
+        ('Evento.paginate', Evento.paginate),
+        ('Evento.paginate(depois)', lambda: Evento.paginate(depois=Evento.paginate().next_cursor)),
+        ('Evento.active_between', lambda: Evento.active_between(date.today(), date.today() + timedelta(days=7))),
+        ('Estatistica.get_dashboard', Estatistica.get_dashboard),
+        ('Autocomplete.sugestoes', lambda: Autocomplete.sugestoes('sao')),
+        ('Entidades.parecidas', lambda: Entidades.parecidas('maranhence')),
+        ('Entidades.mencionadas', lambda: Entidades.mencionadas('perto da lagoa da jansem')),
+        ('Coordenadas.pendentes', lambda: Coordenadas.pendentes('eventos')),
+        ('Proximidade.proximos', lambda: Proximidade.proximos(-2.53, -44.30, 1000, 'restaurante')),
+        ('Restaurante.get_all', Restaurante.get_all),
+        ('Restaurante.get_by_id', lambda: Restaurante.get_by_id(1)),
+        ('Restaurante.filter_by_culinaria', lambda: Restaurante.filter_by_culinaria('Maranhense')),
+        ('Restaurante.filter_by_preco', lambda: Restaurante.filter_by_preco('$$ - Moderado')),
+        ('Restaurante.get_count', Restaurante.get_count),
+        ('Restaurante.search', lambda: Restaurante.search('porto')),
+        ('Restaurante.search(correção)', lambda: Restaurante.search('maranhence')),
+        ('Restaurante.paginate', Restaurante.paginate),
+        ('Restaurante.paginate(facetas)', lambda: Restaurante.paginate(tipo_culinaria='Maranhense', tem_delivery=True)),
+        ('Restaurante.facetas', lambda: Restaurante.facetas(tipo_culinaria='Maranhense')),
+        ('Restaurante.paginate(busca)', lambda: Restaurante.paginate(busca='porto')),
+    ]
+
+
+def capture_queries(chamada):
+    """Executa a chamada e devolve as queries que ela fez"""
+    global _captured
+    # Sem o cache, para que a chamada chegue de fato ao banco
+    get_cache().clear()
+    _captured = []
+    try:
+        chamada()
+        return _captured
+    finally:
+        _captured = None
+
+
+def _full_scans(cursor, sql, params):
+    """Tabelas lidas por varredura completa segundo o plano de execução"""
+    if get_backend() == SQLITE:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        varridas = []
+        for linha in cursor.fetchall():
+            detalhe = linha[-1]
+            match = re.match(r'^SCAN (?:TABLE )?(\w+)$', detalhe)
+            if match:
+                varridas.append(match.group(1))
+        return varridas
+
+    cursor.execute("EXPLAIN " + sql, params)
+    return [linha['table'] for linha in cursor.fetchall() if linha['type'] == 'ALL']
+
+
+def check():
+    """
+    Roda EXPLAIN em cada leitura dos models e devolve a lista de
+    (nome, sql, tabelas varridas) que caíram em varredura completa
+    """
+    connection = get_pool(PRIMARY).acquire()
+    if connection is None:
+        raise RuntimeError("Não foi possível conectar ao banco de dados")
+
+    falhas = []
+    try:
+        for nome, chamada in model_reads():
+            for info in capture_queries(chamada):
+                cursor = connection.cursor(dictionary=get_backend() != SQLITE)
+                try:
+                    varridas = [t for t in _full_scans(cursor, info['sql'], info['values'] or ())
+                                if t in TABELAS]
+                finally:
+                    cursor.close()
+
+                if not varridas:
+                    logger.info(f"ok     {nome}")
+                elif nome in FULL_SCAN_ALLOWED:
+                    logger.info(f"aceito {nome}: {FULL_SCAN_ALLOWED[nome]}")
+                else:
+                    logger.error(f"FALHA  {nome}: varredura completa em {', '.join(varridas)}")
+                    falhas.append((nome, info['fingerprint'], varridas))
+    finally:
+        get_pool(PRIMARY).release(connection)
+    return falhas
+
+
+def seed(quantidade):
+    """Insere `quantidade` eventos e restaurantes sintéticos para o EXPLAIN"""
+    rnd = random.Random(42)
+    tipos = ['Show', 'Evento', 'Festival', 'Teatro', 'Exposição']
+    culinarias = ['Brasileira', 'Maranhense', 'Italiana', 'Japonesa', 'Mexicana', 'Francesa']
+    precos = ['$ - Economico', '$$ - Moderado', '$$$ - Caro', '$$$$ - Muito Caro']
+    bairros = ['Centro', 'Ponta da Areia', 'Calhau', 'Renascença', 'São Francisco', 'Cohama']
+    hoje = date.today()
+    # Descrições com tamanho parecido com o dos cadastros reais
+    texto = ("Programação cultural com atrações locais, gastronomia típica do Maranhão "
+             "e atividades para toda a família no centro histórico de São Luís. ") * 8
+
+    eventos = []
+    for i in range(quantidade):
+        inicio = hoje + timedelta(days=rnd.randint(-730, 730))
+        eventos.append((
+            f"Evento {i}", rnd.choice(tipos), f"Evento {i}. " + texto[:rnd.randint(80, len(texto))],
+            inicio, inicio + timedelta(days=rnd.randint(0, 5)), time(rnd.randint(8, 22), 0),
+            f"Local {rnd.randint(1, quantidade // 10 + 1)}", f"Rua {i}, São Luís - MA",
+            rnd.randint(0, 200), rnd.randint(50, 5000), f"Organizador {i % 50}",
+            '(98) 3200-0000', None
+        ))
+
+    restaurantes = []
+    for i in range(quantidade):
+        restaurantes.append((
+            f"Restaurante {i:06d}", rnd.choice(culinarias), f"Restaurante {i}. " + texto[:rnd.randint(80, len(texto))],
+            f"Av. {i}, São Luís - MA", rnd.choice(bairros), '(98) 3200-0000',
+            '11:00 às 23:00', rnd.choice(precos), rnd.randint(20, 300), None,
+            rnd.random() < 0.5, rnd.random() < 0.5, rnd.random() < 0.5
+        ))
+
+    connection = get_pool(PRIMARY).acquire()
+    cursor = connection.cursor()
+    try:
+        cursor.executemany("""
+            INSERT INTO eventos (nome_evento, tipo, descricao, data_inicio, data_fim, horario,
+                                 local, endereco, preco, capacidade, organizador, contato, url_imagem)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, eventos)
+        cursor.executemany("""
+            INSERT INTO restaurantes (nome_restaurante, tipo_culinaria, descricao, endereco, bairro,
+                                      telefone, horario_funcionamento, faixa_preco, capacidade,
+                                      url_imagem, aceita_reservas, tem_delivery, tem_estacionamento)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, restaurantes)
+        # Os workers em execução notam a carga pela versão das tabelas
+        for tabela in TABELAS:
+            cursor.execute("UPDATE contadores SET valor = valor + 1 WHERE nome = %s", (contador_versao(tabela),))
+        connection.commit()
+
+        # Atualiza as estatísticas usadas pelo otimizador
+        if get_backend() == SQLITE:
+            cursor.execute("ANALYZE")
+        else:
+            cursor.execute("ANALYZE TABLE eventos, restaurantes")
+            cursor.fetchall()
+    finally:
+        cursor.close()
+        get_pool(PRIMARY).release(connection)
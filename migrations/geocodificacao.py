@@ -0,0 +1,106 @@
+"""
+Tarefas de geocodificação rodadas fora das requisições:
+
+- aquecer (python -m migrations warm-geocode): geocodifica os pontos
+  turísticos conhecidos pelo chat e todos os endereços e locais de eventos
+  e restaurantes que ainda não estão no cache (config/geocoding.py), para
+  que as mensagens do chat não esperem pelo Nominatim.
+- backfill (python -m migrations backfill-coordinates): preenche latitude
+  e longitude das linhas que ainda não têm coordenadas, respeitando um
+  intervalo entre consultas ao geocodificador.
+
+As duas só fazem o que falta (endereços fora do cache, linhas sem
+coordenadas), então podem ser interrompidas e rodadas de novo.
+"""
+import time
+import logging
+from config.database import iter_query
+from config.geocoding import GEOCODE_MIN_DELAY, get_geocoder
+from models.coordenadas import Coordenadas
+from models.entidades import PONTOS_TURISTICOS
+
+logger = logging.getLogger(__name__)
+
+# Endereços geocodificados entre um registro de progresso e outro
+PROGRESSO_A_CADA = 50
+# Linhas lidas por vez no backfill
+BACKFILL_LOTE = 100
+
+ENDERECOS = [
+    "SELECT DISTINCT endereco FROM eventos",
+    "SELECT DISTINCT local FROM eventos",
+    "SELECT DISTINCT endereco FROM restaurantes",
+]
+
+
+def enderecos():
+    """Pontos turísticos e endereços do banco, sem repetições"""
+    vistos = dict.fromkeys(PONTOS_TURISTICOS)
+    for query in ENDERECOS:
+        for linha in iter_query(query):
+            valor = next(iter(linha.values()))
+            if valor and str(valor).strip():
+                vistos.setdefault(str(valor).strip())
+    return list(vistos)
+
+
+def aquecer(geocoder=None, lista=None):
+    """
+    Geocodifica o que falta no cache. Devolve a contagem de endereços já
+    guardados, geocodificados agora e não encontrados.
+    """
+    geocoder = geocoder or get_geocoder()
+    totais = {'em_cache': 0, 'geocodificados': 0, 'nao_encontrados': 0}
+    for endereco in lista if lista is not None else enderecos():
+        if geocoder.cached(endereco)[0]:
+            totais['em_cache'] += 1
+            continue
+        if geocoder.geocode(endereco) is None:
+            totais['nao_encontrados'] += 1
+        else:
+            totais['geocodificados'] += 1
+        feitos = totais['geocodificados'] + totais['nao_encontrados']
+        if feitos % PROGRESSO_A_CADA == 0:
+            logger.info(f"Geocodificação: {feitos} endereços consultados")
+    return totais
+
+
+def backfill(geocoder=None, intervalo=GEOCODE_MIN_DELAY, limite=None, tabelas=('restaurantes', 'eventos')):
+    """
+    Geocodifica e grava as coordenadas das linhas sem latitude/longitude,
+    com ao menos `intervalo` segundos entre consultas ao geocodificador
+    (respostas do cache não esperam). `limite` encerra depois de tantas
+    linhas. Devolve a contagem de linhas preenchidas, não encontradas e
+    sem endereço.
+    """
+    geocoder = geocoder or get_geocoder()
+    totais = {'preenchidas': 0, 'nao_encontradas': 0, 'sem_endereco': 0}
+    processadas = 0
+    ultima_consulta = 0.0
+    for tabela in tabelas:
+        # Keyset por id: as linhas não encontradas continuam sem coordenadas
+        # e não voltam na mesma execução
+        depois = 0
+        while limite is None or processadas < limite:
+            lote = Coordenadas.pendentes(tabela, depois, BACKFILL_LOTE)
+            if not lote:
+                break
+            for linha in lote:
+                if limite is not None and processadas >= limite:
+                    break
+                depois = linha['id']
+                processadas += 1
+                if not linha['endereco']:
+                    totais['sem_endereco'] += 1
+                    continue
+                if not geocoder.cached(linha['endereco'])[0]:
+                    espera = ultima_consulta + intervalo - time.monotonic()
+                    if espera > 0:
+                        time.sleep(espera)
+                    ultima_consulta = time.monotonic()
+                coords = geocoder.geocode(linha['endereco'])
+                Coordenadas.gravar(tabela, linha['id'], linha['endereco'], coords)
+                totais['preenchidas' if coords else 'nao_encontradas'] += 1
+                if processadas % PROGRESSO_A_CADA == 0:
+                    logger.info(f"Backfill de coordenadas: {processadas} linhas, {totais}")
+    return totais
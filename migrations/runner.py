@@ -0,0 +1,177 @@
+import os
+import re
+import sys
+import logging
+import importlib
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from mysql.connector import Error
+from config.database import PRIMARY, SQLITE, get_backend, get_pool
+
+logger = logging.getLogger(__name__)
+
+# Migrações são módulos deste pacote chamados vNNN_descricao.py, com as
+# funções upgrade(db) e downgrade(db). As versões aplicadas ficam na
+# tabela schema_migrations.
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_FILE = re.compile(r'^v(\d+)_(\w+)\.py$')
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    nome VARCHAR(200) NOT NULL,
+    aplicada_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class MigrationError(Exception):
+    """Falha ao aplicar ou reverter uma migração"""
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    def __repr__(self):
+        return f"v{self.version:03d}_{self.name}"
+
+
+class MigrationContext:
+    """
+    Objeto recebido por upgrade()/downgrade(): executa SQL na conexão da
+    migração e esconde as diferenças de DDL entre MySQL e SQLite
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.backend = get_backend()
+
+    def execute(self, sql, params=None):
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(sql, params) if params else cursor.execute(sql)
+            return cursor.fetchall() if sql.strip().upper().startswith('SELECT') else cursor.rowcount
+        finally:
+            cursor.close()
+
+    def create_index(self, name, table, columns):
+        self.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+
+    def drop_index(self, name, table):
+        if self.backend == SQLITE:
+            self.execute(f"DROP INDEX {name}")
+        else:
+            self.execute(f"DROP INDEX {name} ON {table}")
+
+
+def discover():
+    """Lista as migrações do pacote em ordem de versão"""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            module = importlib.import_module(f"migrations.{filename[:-3]}")
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda m: m.version)
+
+    versoes = [m.version for m in migrations]
+    if len(versoes) != len(set(versoes)):
+        raise MigrationError(f"Versões de migração duplicadas: {versoes}")
+    return migrations
+
+
+def _connect():
+    connection = get_pool(PRIMARY).acquire()
+    if connection is None:
+        raise MigrationError("Não foi possível conectar ao banco de dados")
+    return connection
+
+
+def applied_versions(connection):
+    """Versões já aplicadas, registradas em schema_migrations"""
+    db = MigrationContext(connection)
+    db.execute(CREATE_TABLE)
+    connection.commit()
+    return {row[0] for row in db.execute("SELECT version FROM schema_migrations")}
+
+
+def _run(migration, direction, connection):
+    db = MigrationContext(connection)
+    try:
+        getattr(migration.module, direction)(db)
+        if direction == 'upgrade':
+            db.execute("INSERT INTO schema_migrations (version, nome) VALUES (%s, %s)",
+                       (migration.version, migration.name))
+        else:
+            db.execute("DELETE FROM schema_migrations WHERE version = %s", (migration.version,))
+        connection.commit()
+    except Error as e:
+        connection.rollback()
+        raise MigrationError(f"Erro em {migration} ({direction}): {e}")
+    logger.info(f"{direction} {migration}")
+
+
+def upgrade(target=None):
+    """Aplica, em ordem, as migrações pendentes até `target` (ou todas)"""
+    connection = _connect()
+    try:
+        aplicadas = applied_versions(connection)
+        executadas = []
+        for migration in discover():
+            if target is not None and migration.version > target:
+                break
+            if migration.version not in aplicadas:
+                _run(migration, 'upgrade', connection)
+                executadas.append(migration)
+        return executadas
+    finally:
+        get_pool(PRIMARY).release(connection)
+
+
+def downgrade(target):
+    """Reverte, da mais nova para a mais antiga, as migrações acima de `target`"""
+    connection = _connect()
+    try:
+        aplicadas = applied_versions(connection)
+        revertidas = []
+        for migration in reversed(discover()):
+            if migration.version <= target:
+                break
+            if migration.version in aplicadas:
+                _run(migration, 'downgrade', connection)
+                revertidas.append(migration)
+        return revertidas
+    finally:
+        get_pool(PRIMARY).release(connection)
+
+
+def status():
+    """Lista (migração, aplicada?) para todas as migrações conhecidas"""
+    connection = _connect()
+    try:
+        aplicadas = applied_versions(connection)
+        return [(migration, migration.version in aplicadas) for migration in discover()]
+    finally:
+        get_pool(PRIMARY).release(connection)
+
+
+def ensure_applied():
+    """
+    Levanta MigrationError se houver migrações pendentes: os models e os
+    índices em memória usam as tabelas e colunas delas. Sem conexão com o
+    banco não há o que verificar e nada é levantado.
+    """
+    connection = get_pool(PRIMARY).acquire()
+    if connection is None:
+        logger.warning("Banco indisponível: migrações pendentes não verificadas")
+        return
+    try:
+        aplicadas = applied_versions(connection)
+    finally:
+        get_pool(PRIMARY).release(connection)
+    pendentes = [str(m) for m in discover() if m.version not in aplicadas]
+    if pendentes:
+        raise MigrationError(f"Migrações pendentes: {', '.join(pendentes)}. "
+                             f"Rode 'python -m migrations upgrade' antes de iniciar o app")
@@ -0,0 +1,29 @@
+"""
+Índices secundários para os filtros e ordenações usados pelos models:
+
+- eventos: ORDER BY data_inicio, WHERE data_inicio = / >= (hoje, próximos),
+  WHERE tipo = ... ORDER BY data_inicio, WHERE data_fim < (realizados) e
+  COUNT(DISTINCT local)
+- restaurantes: ORDER BY nome_restaurante, com ou sem WHERE tipo_culinaria /
+  faixa_preco
+"""
+
+INDICES = [
+    ('idx_eventos_data_inicio', 'eventos', ['data_inicio']),
+    ('idx_eventos_tipo_data_inicio', 'eventos', ['tipo', 'data_inicio']),
+    ('idx_eventos_data_fim', 'eventos', ['data_fim']),
+    ('idx_eventos_local', 'eventos', ['local']),
+    ('idx_restaurantes_nome', 'restaurantes', ['nome_restaurante']),
+    ('idx_restaurantes_culinaria_nome', 'restaurantes', ['tipo_culinaria', 'nome_restaurante']),
+    ('idx_restaurantes_preco_nome', 'restaurantes', ['faixa_preco', 'nome_restaurante']),
+]
+
+
+def upgrade(db):
+    for nome, tabela, colunas in INDICES:
+        db.create_index(nome, tabela, colunas)
+
+
+def downgrade(db):
+    for nome, tabela, _ in reversed(INDICES):
+        db.drop_index(nome, tabela)
@@ -0,0 +1,20 @@
+"""
+Índices em data_atualizacao: o cache de páginas consulta
+MAX(data_atualizacao) de eventos e restaurantes para montar o ETag; com o
+índice o MAX é lido direto da ponta da árvore, sem varrer a tabela.
+"""
+
+INDICES = [
+    ('idx_eventos_data_atualizacao', 'eventos', ['data_atualizacao']),
+    ('idx_restaurantes_data_atualizacao', 'restaurantes', ['data_atualizacao']),
+]
+
+
+def upgrade(db):
+    for nome, tabela, colunas in INDICES:
+        db.create_index(nome, tabela, colunas)
+
+
+def downgrade(db):
+    for nome, tabela, _ in reversed(INDICES):
+        db.drop_index(nome, tabela)
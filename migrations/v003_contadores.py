@@ -0,0 +1,47 @@
+"""
+Contadores do dashboard, mantidos pelas escritas dos models (ver
+models/estatistica.py):
+
+- contadores: totais de eventos, restaurantes e locais distintos
+- eventos_por_data: eventos que começam em cada data (eventos de hoje)
+- eventos_por_local: eventos por local (mantém o total de locais distintos
+  sem COUNT(DISTINCT))
+
+As tabelas já são criadas com os valores atuais.
+"""
+
+TABELAS = ['contadores', 'eventos_por_data', 'eventos_por_local']
+
+
+def upgrade(db):
+    db.execute("""
+        CREATE TABLE contadores (
+            nome VARCHAR(50) PRIMARY KEY,
+            valor BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+    db.execute("""
+        CREATE TABLE eventos_por_data (
+            data DATE PRIMARY KEY,
+            total INT NOT NULL
+        )
+    """)
+    db.execute("""
+        CREATE TABLE eventos_por_local (
+            local VARCHAR(200) PRIMARY KEY,
+            total INT NOT NULL
+        )
+    """)
+
+    db.execute("INSERT INTO contadores (nome, valor) SELECT 'eventos', COUNT(*) FROM eventos")
+    db.execute("INSERT INTO contadores (nome, valor) SELECT 'restaurantes', COUNT(*) FROM restaurantes")
+    db.execute("INSERT INTO contadores (nome, valor) SELECT 'locais_unicos', COUNT(DISTINCT local) FROM eventos")
+    db.execute("INSERT INTO eventos_por_data (data, total) "
+               "SELECT data_inicio, COUNT(*) FROM eventos GROUP BY data_inicio")
+    db.execute("INSERT INTO eventos_por_local (local, total) "
+               "SELECT local, COUNT(*) FROM eventos GROUP BY local")
+
+
+def downgrade(db):
+    for tabela in reversed(TABELAS):
+        db.execute(f"DROP TABLE {tabela}")
@@ -0,0 +1,19 @@
+"""
+Colunas latitude/longitude em eventos e restaurantes, lidas pelo chat
+(GeoChatController) e pelo índice de proximidade (models/proximidade.py).
+Ficam NULL até o endereço ser geocodificado.
+"""
+
+TABELAS = ['eventos', 'restaurantes']
+
+
+def upgrade(db):
+    for tabela in TABELAS:
+        db.execute(f"ALTER TABLE {tabela} ADD COLUMN latitude DECIMAL(9, 6) NULL")
+        db.execute(f"ALTER TABLE {tabela} ADD COLUMN longitude DECIMAL(9, 6) NULL")
+
+
+def downgrade(db):
+    for tabela in reversed(TABELAS):
+        db.execute(f"ALTER TABLE {tabela} DROP COLUMN longitude")
+        db.execute(f"ALTER TABLE {tabela} DROP COLUMN latitude")
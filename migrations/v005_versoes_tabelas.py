@@ -0,0 +1,18 @@
+"""
+Versão de eventos e restaurantes, lida por config/cache.py (table_version)
+para validar os caches e os índices em memória: uma linha por tabela em
+contadores, somada em 1 pela transação de cada escrita dos models (ver
+models/estatistica.py, Estatistica.tabela_alterada).
+"""
+
+TABELAS = ['eventos', 'restaurantes']
+
+
+def upgrade(db):
+    for tabela in TABELAS:
+        db.execute("INSERT INTO contadores (nome, valor) VALUES (%s, 0)", (f"versao_{tabela}",))
+
+
+def downgrade(db):
+    for tabela in reversed(TABELAS):
+        db.execute("DELETE FROM contadores WHERE nome = %s", (f"versao_{tabela}",))
@@ -0,0 +1,18 @@
+"""
+Coluna versao em eventos e restaurantes: cada UPDATE dos models soma 1 a
+ela. É a chave dos cards no cache de fragmentos (config/fragment_cache.py),
+que então só renderiza de novo os cards alterados, mesmo quando duas
+escritas caem no mesmo segundo de data_atualizacao.
+"""
+
+TABELAS = ['eventos', 'restaurantes']
+
+
+def upgrade(db):
+    for tabela in TABELAS:
+        db.execute(f"ALTER TABLE {tabela} ADD COLUMN versao INT NOT NULL DEFAULT 0")
+
+
+def downgrade(db):
+    for tabela in reversed(TABELAS):
+        db.execute(f"ALTER TABLE {tabela} DROP COLUMN versao")
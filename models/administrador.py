@@ -24,7 +24,7 @@ class Administrador:
     def get_by_email(email):
         """Retorna um administrador pelo email"""
         query = "SELECT * FROM administradores WHERE email = %s"
-        return execute_query_one(query, (email,))
+        return execute_query_one(query, (email,), prepared=True)
 
     @staticmethod
     def create(admin_data):
@@ -62,12 +62,12 @@ class Administrador:
         """Autentica um administrador"""
         senha_hash = hashlib.sha256(senha.encode()).hexdigest()
         query = "SELECT id, nome, email FROM administradores WHERE email = %s AND senha = %s"
-        return execute_query_one(query, (email, senha_hash))
+        return execute_query_one(query, (email, senha_hash), prepared=True)
 
     @staticmethod
     def email_exists(email):
         """Verifica se o email já existe"""
         query = "SELECT COUNT(*) as count FROM administradores WHERE email = %s"
-        result = execute_query_one(query, (email,))
+        result = execute_query_one(query, (email,), prepared=True)
         return result['count'] > 0 if result else False
 
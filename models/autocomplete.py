@@ -0,0 +1,58 @@
+from config.database import iter_query
+from models.memory_index import MemoryIndex
+from models.prefix_index import PrefixIndex
+
+# Sugestões da caixa de busca (typeahead): nomes de restaurantes e eventos,
+# bairros e locais. Vêm de um índice de prefixos em memória, mantido pelas
+# escritas dos models como os demais índices de models/memory_index.py.
+
+AUTOCOMPLETE_LIMITE = 8
+AUTOCOMPLETE_LIMITE_MAX = 20
+
+# tabela -> (campo, tipo da sugestão)
+CAMPOS = {
+    'restaurantes': (('nome_restaurante', 'restaurante'), ('bairro', 'bairro')),
+    'eventos': (('nome_evento', 'evento'), ('local', 'local')),
+}
+
+
+def _sugestoes(tabela, linha):
+    return [(tipo, linha.get(campo)) for campo, tipo in CAMPOS[tabela]]
+
+
+class Autocomplete:
+    @staticmethod
+    def sugestoes(termo, limite=None):
+        """
+        Sugestões cujo texto tem uma palavra começando por `termo` (sem
+        diferenciar acentos), das mais populares (presentes em mais
+        restaurantes/eventos) para as menos.
+        """
+        try:
+            limite = min(int(limite), AUTOCOMPLETE_LIMITE_MAX) if limite else AUTOCOMPLETE_LIMITE
+        except (TypeError, ValueError):
+            limite = AUTOCOMPLETE_LIMITE
+        with INDICE.usar() as indice:
+            encontradas = indice.complete(termo or '', limite)
+        return [{'texto': texto, 'tipo': tipo, 'total': total} for (tipo, texto), total in encontradas]
+
+
+# ===== Índice em memória (models/memory_index.py) =====
+
+def _construir():
+    documentos = (
+        ((tabela, r['id']), _sugestoes(tabela, r))
+        for tabela, campos in CAMPOS.items()
+        for r in iter_query(f"SELECT id, {', '.join(c for c, _ in campos)} FROM {tabela}")
+    )
+    return PrefixIndex(documentos)
+
+
+def _aplicar(indice, tabela, id, linha):
+    if linha is None:
+        indice.remove((tabela, id))
+    else:
+        indice.add((tabela, id), _sugestoes(tabela, linha))
+
+
+INDICE = MemoryIndex('autocompletar', tuple(CAMPOS), _construir, _aplicar)
@@ -0,0 +1,147 @@
+import os
+import queue
+import logging
+import threading
+from config.cache import invalidate
+from config.database import execute_query, execute_query_one, execute_transaction
+from config.geocoding import get_geocoder
+from models.estatistica import Estatistica
+from models.memory_index import antes_da_escrita, depois_da_escrita
+
+logger = logging.getLogger(__name__)
+
+# Coordenadas (latitude/longitude, migração v004) de eventos e restaurantes.
+# Quando create/update grava um endereço, a geocodificação é agendada numa
+# thread em segundo plano: a requisição não espera pelo geocodificador (1
+# consulta/s no Nominatim) e as coordenadas aparecem no banco, no chat e
+# em /api/nearby assim que a consulta termina. O update do model zera as
+# coordenadas quando o endereço muda; as linhas que ficarem sem
+# coordenadas são preenchidas pelo backfill (migrations/geocodificacao.py).
+
+# GEOCODE_ON_WRITE=0 desliga a geocodificação nas escritas (só o backfill preenche)
+GEOCODE_ON_WRITE = os.getenv('GEOCODE_ON_WRITE', '1') != '0'
+
+# tabela -> expressão SQL do endereço geocodificado (eventos sem endereço usam o local)
+ENDERECOS = {
+    'restaurantes': "endereco",
+    'eventos': "COALESCE(NULLIF(endereco, ''), local)",
+}
+
+
+def endereco(tabela, linha):
+    """Endereço geocodificado de uma linha (mesma regra de ENDERECOS)"""
+    if tabela == 'eventos':
+        return linha.get('endereco') or linha.get('local')
+    return linha.get('endereco')
+
+
+def coordenadas_preservadas(tabela):
+    """
+    Trecho do SET de um UPDATE que mantém as coordenadas só se o endereço
+    não mudar (parâmetros: o novo endereço, duas vezes). Deve vir antes das
+    outras colunas: no MySQL as atribuições seguintes já veem os valores novos.
+    """
+    expressao = ENDERECOS[tabela]
+    return (f"latitude = CASE WHEN {expressao} = %s THEN latitude END, "
+            f"longitude = CASE WHEN {expressao} = %s THEN longitude END, ")
+
+
+class Coordenadas:
+    @staticmethod
+    def pendentes(tabela, depois=0, limite=100):
+        """Linhas sem coordenadas com id > depois, em ordem de id (lotes do backfill)"""
+        query = (f"SELECT id, {ENDERECOS[tabela]} AS endereco FROM {tabela} "
+                 f"WHERE id > %s AND latitude IS NULL ORDER BY id LIMIT %s")
+        return execute_query(query, (depois, limite)) or []
+
+    @staticmethod
+    def gravar(tabela, id, endereco_geocodificado, coords):
+        """
+        Grava as coordenadas (ou None) se a linha ainda tiver o endereço
+        geocodificado: um update que troque o endereço no meio do caminho
+        vence. Repassa a linha atualizada aos índices em memória.
+        """
+        lat, lon = coords if coords else (None, None)
+        query = (f"UPDATE {tabela} SET latitude = %s, longitude = %s, versao = versao + 1 "
+                 f"WHERE id = %s AND {ENDERECOS[tabela]} = %s")
+
+        def _operacao(tx):
+            resultado = tx.execute(query, (lat, lon, id, endereco_geocodificado))
+            if resultado:
+                Estatistica.tabela_alterada(tx, tabela)
+            return resultado
+
+        estado = antes_da_escrita(tabela)
+        resultado = execute_transaction(_operacao)
+        if resultado is None:
+            return False
+        invalidate(tabela)
+        # Relida inteira: os índices em memória esperam todos os campos
+        linha = execute_query_one(f"SELECT * FROM {tabela} WHERE id = %s", (id,))
+        if linha:
+            depois_da_escrita(estado, tabela, id, linha)
+        return bool(resultado)
+
+    @staticmethod
+    def geocodificar(tabela, id, geocoder=None):
+        """Geocodifica a linha se ela estiver sem coordenadas; devolve as coordenadas ou None"""
+        linha = execute_query_one(
+            f"SELECT {ENDERECOS[tabela]} AS endereco, latitude, longitude FROM {tabela} WHERE id = %s", (id,))
+        if not linha or not linha['endereco']:
+            return None
+        if linha['latitude'] is not None:
+            return linha['latitude'], linha['longitude']
+        coords = (geocoder or get_geocoder()).geocode(linha['endereco'])
+        Coordenadas.gravar(tabela, id, linha['endereco'], coords)
+        return coords
+
+    @staticmethod
+    def agendar(tabela, id):
+        """Agenda a geocodificação da linha (depois de create/update)"""
+        if GEOCODE_ON_WRITE:
+            _worker.agendar(tabela, id)
+
+
+class GeocodeWorker:
+    """
+    Thread que geocodifica as linhas agendadas, uma por vez. Agendar de
+    novo uma linha ainda na fila não a repete.
+    """
+
+    def __init__(self, geocoder=None):
+        self.geocoder = geocoder
+        self._fila = queue.Queue()
+        self._agendadas = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def agendar(self, tabela, id):
+        with self._lock:
+            if (tabela, id) in self._agendadas:
+                return
+            self._agendadas.add((tabela, id))
+            # Criada no primeiro uso; depois de um fork a thread do pai não
+            # existe no filho (is_alive() é falso) e ele cria a sua
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._executar, name='geocode-worker', daemon=True)
+                self._thread.start()
+        self._fila.put((tabela, id))
+
+    def _executar(self):
+        while True:
+            tabela, id = self._fila.get()
+            with self._lock:
+                self._agendadas.discard((tabela, id))
+            try:
+                Coordenadas.geocodificar(tabela, id, self.geocoder)
+            except Exception as e:
+                logger.error(f"Falha ao geocodificar {tabela} {id}: {e}")
+            finally:
+                self._fila.task_done()
+
+    def esperar(self):
+        """Bloqueia até a fila esvaziar"""
+        self._fila.join()
+
+
+_worker = GeocodeWorker()
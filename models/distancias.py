@@ -0,0 +1,164 @@
+import os
+import logging
+import numpy as np
+from config.database import iter_query
+from config.geocoding import get_geocoder
+from models.entidades import PONTOS_TURISTICOS
+from models.memory_index import MemoryIndex
+from models.spatial_index import RAIO_TERRA_METROS
+
+logger = logging.getLogger(__name__)
+
+# Distâncias (haversine, em metros) calculadas com NumPy: de um ponto para
+# muitos e matrizes completas numa única passada vetorizada, em vez de uma
+# chamada Python (geopy) por par de pontos.
+#
+# A matriz dos pontos fixos (pontos turísticos já geocodificados e eventos
+# e restaurantes com coordenadas) fica em memória: um itinerário entre
+# pontos conhecidos só recorta as linhas e colunas deles. Os pontos são
+# identificados pelas coordenadas, então a matriz nunca fica errada; uma
+# escrita que traga coordenadas novas só as acrescenta no próximo uso.
+
+# Pontos guardados na matriz (float32: 2000 pontos ocupam 16 MiB)
+DISTANCIAS_MAX_PONTOS = int(os.getenv('DISTANCIAS_MAX_PONTOS', 2000))
+# Casas decimais das coordenadas na chave do ponto (as do banco, DECIMAL(9, 6))
+CASAS = 6
+
+
+def _radianos(pontos):
+    coords = np.radians(np.asarray(pontos, dtype=np.float64).reshape(-1, 2))
+    return coords[:, 0], coords[:, 1]
+
+
+def _haversine(fi1, lam1, fi2, lam2):
+    a = np.sin((fi2 - fi1) / 2) ** 2 + np.cos(fi1) * np.cos(fi2) * np.sin((lam2 - lam1) / 2) ** 2
+    return 2 * RAIO_TERRA_METROS * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def distancias(origem, destinos):
+    """Vetor com a distância em metros de `origem` (lat, lon) a cada um dos `destinos`"""
+    fi1, lam1 = _radianos(origem)
+    fi2, lam2 = _radianos(destinos)
+    return _haversine(fi1[0], lam1[0], fi2, lam2)
+
+
+def matriz(pontos, destinos=None):
+    """Matriz N x M das distâncias em metros de `pontos` a `destinos` (padrão: os próprios pontos)"""
+    fi1, lam1 = _radianos(pontos)
+    fi2, lam2 = (fi1, lam1) if destinos is None else _radianos(destinos)
+    return _haversine(fi1[:, None], lam1[:, None], fi2[None, :], lam2[None, :])
+
+
+def comprimento(distancias_rota, ordem):
+    """Soma das distâncias entre pontos consecutivos de `ordem` (índices da matriz)"""
+    ordem = np.asarray(ordem)
+    return float(distancias_rota[ordem[:-1], ordem[1:]].sum()) if len(ordem) > 1 else 0.0
+
+
+def vizinho_mais_proximo(distancias_rota, inicio=0):
+    """Ordem de visita partindo de `inicio` e indo sempre ao ponto mais próximo ainda não visitado"""
+    restantes = np.ones(len(distancias_rota), dtype=bool)
+    restantes[inicio] = False
+    ordem = [inicio]
+    for _ in range(len(distancias_rota) - 1):
+        linha = np.where(restantes, distancias_rota[ordem[-1]], np.inf)
+        # Em empate fica o primeiro, como o min() sobre a lista de pontos
+        proximo = int(np.argmin(linha))
+        restantes[proximo] = False
+        ordem.append(proximo)
+    return ordem
+
+
+def _chave(lat, lon):
+    return round(float(lat), CASAS), round(float(lon), CASAS)
+
+
+class MatrizFixa:
+    """Matriz de distâncias de um conjunto de pontos que cresce aos poucos"""
+
+    def __init__(self, pontos=(), maximo=DISTANCIAS_MAX_PONTOS):
+        self.maximo = maximo
+        self._indices = {}        # (lat, lon) -> linha da matriz
+        self._coords = np.empty((0, 2))
+        self._matriz = np.empty((0, 0), dtype=np.float32)
+        self._pendentes = []
+        self.adicionar(pontos)
+
+    def __len__(self):
+        return len(self._indices) + len(self._pendentes)
+
+    def adicionar(self, pontos):
+        """Inclui pontos (lat, lon) novos enquanto houver espaço; a matriz é estendida no próximo uso"""
+        vistos = set(self._pendentes)
+        for lat, lon in pontos:
+            chave = _chave(lat, lon)
+            if len(self) >= self.maximo:
+                break
+            if chave not in self._indices and chave not in vistos:
+                vistos.add(chave)
+                self._pendentes.append(chave)
+
+    def _estender(self):
+        novos = np.array(self._pendentes, dtype=np.float64)
+        n = len(self._coords)
+        # Só as linhas e colunas dos pontos novos são calculadas
+        estendida = np.empty((n + len(novos), n + len(novos)), dtype=np.float32)
+        estendida[:n, :n] = self._matriz
+        estendida[n:, :] = matriz(novos, np.vstack([self._coords, novos]))
+        estendida[:n, n:] = estendida[n:, :n].T
+        for i, chave in enumerate(self._pendentes, n):
+            self._indices[chave] = i
+        self._coords = np.vstack([self._coords, novos])
+        self._matriz = estendida
+        self._pendentes = []
+
+    def recortar(self, pontos):
+        """Matriz das distâncias entre `pontos`, ou None se algum não está no conjunto"""
+        if self._pendentes:
+            self._estender()
+        indices = [self._indices.get(_chave(lat, lon)) for lat, lon in pontos]
+        if None in indices:
+            return None
+        return self._matriz[np.ix_(indices, indices)].astype(np.float64)
+
+
+class Distancias:
+    @staticmethod
+    def matriz(pontos):
+        """
+        Matriz das distâncias em metros entre `pontos` (lat, lon): recortada
+        da matriz em memória se todos forem pontos fixos, calculada se não.
+        """
+        pontos = [(float(lat), float(lon)) for lat, lon in pontos]
+        with INDICE.usar() as fixa:
+            recorte = fixa.recortar(pontos)
+        return recorte if recorte is not None else matriz(pontos)
+
+
+# ===== Matriz em memória (models/memory_index.py) =====
+
+def _pontos_turisticos():
+    geocoder = get_geocoder()
+    for nome in PONTOS_TURISTICOS:
+        encontrado, coords = geocoder.cached(nome)
+        if encontrado and coords:
+            yield coords
+
+
+def _construir():
+    pontos = list(_pontos_turisticos())
+    for tabela in ('restaurantes', 'eventos'):
+        pontos += [(r['latitude'], r['longitude']) for r in iter_query(
+            f"SELECT latitude, longitude FROM {tabela} WHERE latitude IS NOT NULL AND longitude IS NOT NULL")]
+    fixa = MatrizFixa(pontos)
+    if len(pontos) > fixa.maximo:
+        logger.info(f"Matriz de distâncias com {fixa.maximo} de {len(pontos)} pontos (DISTANCIAS_MAX_PONTOS)")
+    return fixa
+
+
+def _aplicar(fixa, tabela, id, linha):
+    if linha and linha.get('latitude') is not None and linha.get('longitude') is not None:
+        fixa.adicionar([(linha['latitude'], linha['longitude'])])
+
+
+INDICE = MemoryIndex('distancias', ('eventos', 'restaurantes'), _construir, _aplicar)
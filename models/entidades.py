@@ -0,0 +1,81 @@
+from itertools import chain
+from config.database import iter_query
+from models.memory_index import MemoryIndex
+from models.trigram_index import LIMIAR, LIMIAR_CONTIDO, TrigramIndex
+
+# Nomes de lugares e atrações (restaurantes, eventos, bairros, locais,
+# culinárias e pontos turísticos) num índice de trigramas, para encontrá-los
+# mesmo com erros de digitação: na busca das listagens, quando a busca
+# exata não acha nada, e nas mensagens do chat.
+
+# Pontos turísticos de São Luís reconhecidos pelo chat
+PONTOS_TURISTICOS = [
+    "centro histórico", "praia grande", "lagoa da jansen", "palácio dos leões",
+    "teatro arthur azevedo", "fonte do ribeirão", "catedral de são luís",
+    "convento das mercês", "museu histórico", "cafua das mercês",
+    "praça dom pedro ii", "praça maria aragão", "feira da praia grande",
+    "parque do bom menino", "ponte josé sarney", "avenida litorânea",
+    "reviver", "rua portugal", "rua da estrela", "são francisco", "ribeirão"
+]
+
+# tabela -> (campo, tipo do nome)
+CAMPOS = {
+    'restaurantes': (('nome_restaurante', 'restaurante'), ('bairro', 'bairro'),
+                     ('tipo_culinaria', 'culinaria')),
+    'eventos': (('nome_evento', 'evento'), ('local', 'local'), ('tipo', 'tipo_evento')),
+}
+
+ENTIDADES_LIMITE = 10
+
+
+def _nomes(tabela, linha):
+    return [(tipo, linha.get(campo)) for campo, tipo in CAMPOS[tabela]]
+
+
+def _resultado(encontrados, chave):
+    return [{'texto': texto, 'tipo': tipo, chave: round(valor, 3)} for (tipo, texto), valor in encontrados]
+
+
+class Entidades:
+    @staticmethod
+    def parecidas(termo, limite=ENTIDADES_LIMITE, limiar=LIMIAR, tipos=None):
+        """
+        Nomes parecidos com `termo` (similaridade de trigramas >= limiar com
+        o nome inteiro ou com um trecho dele), do mais para o menos parecido.
+        `tipos` restringe os tipos de nome.
+        """
+        with INDICE.usar() as indice:
+            encontrados = indice.similares(termo or '', limite, limiar, tipos)
+        return _resultado(encontrados, 'similaridade')
+
+    @staticmethod
+    def mencionadas(texto, limite=ENTIDADES_LIMITE, limiar=LIMIAR_CONTIDO, tipos=None):
+        """
+        Nomes citados no texto, mesmo com erros de digitação (ao menos
+        `limiar` dos trigramas do nome presentes no texto)
+        """
+        with INDICE.usar() as indice:
+            encontrados = indice.contidos(texto or '', limite, limiar, tipos)
+        return _resultado(encontrados, 'cobertura')
+
+
+# ===== Índice em memória (models/memory_index.py) =====
+
+def _construir():
+    pontos = ((('pontos', i), [('ponto_turistico', nome)]) for i, nome in enumerate(PONTOS_TURISTICOS))
+    documentos = (
+        ((tabela, r['id']), _nomes(tabela, r))
+        for tabela, campos in CAMPOS.items()
+        for r in iter_query(f"SELECT id, {', '.join(c for c, _ in campos)} FROM {tabela}")
+    )
+    return TrigramIndex(chain(pontos, documentos))
+
+
+def _aplicar(indice, tabela, id, linha):
+    if linha is None:
+        indice.remove((tabela, id))
+    else:
+        indice.add((tabela, id), _nomes(tabela, linha))
+
+
+INDICE = MemoryIndex('entidades', tuple(CAMPOS), _construir, _aplicar)
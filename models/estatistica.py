@@ -0,0 +1,229 @@
+import logging
+from datetime import date
+from config.database import MYSQL, execute_query_one, execute_transaction, get_backend
+from config.cache import cached, contador_versao, invalidate
+
+logger = logging.getLogger(__name__)
+
+# Estatísticas do dashboard a partir de contadores mantidos pelas escritas
+# dos models (tabelas criadas na migração v003):
+#   contadores          totais de eventos, restaurantes e locais distintos
+#   eventos_por_data    quantidade de eventos que começam em cada data
+#   eventos_por_local   quantidade de eventos em cada local
+# Cada escrita em eventos/restaurantes atualiza os contadores na mesma
+# transação, inclusive a versão da tabela (versao_eventos e
+# versao_restaurantes, migração v005) que valida os caches; reconcile()
+# recalcula tudo a partir das tabelas e corrige diferenças (por exemplo,
+# após cargas feitas direto no banco).
+
+TOTAL_EVENTOS = 'eventos'
+TOTAL_RESTAURANTES = 'restaurantes'
+LOCAIS_UNICOS = 'locais_unicos'
+
+
+def _upsert_incremento(tabela, coluna):
+    """INSERT que soma 1 ao total se a chave já existir"""
+    if get_backend() == MYSQL:
+        return (f"INSERT INTO {tabela} ({coluna}, total) VALUES (%s, 1) "
+                f"ON DUPLICATE KEY UPDATE total = total + 1")
+    return (f"INSERT INTO {tabela} ({coluna}, total) VALUES (%s, 1) "
+            f"ON CONFLICT({coluna}) DO UPDATE SET total = total + 1")
+
+
+def _data(valor):
+    # O formulário manda a data como texto; o banco devolve date
+    return date.fromisoformat(valor) if isinstance(valor, str) else valor
+
+
+def _lock(query):
+    # O SQLite já serializa as escritas; no MySQL a linha lida fica travada
+    # até o fim da transação
+    return query + " FOR UPDATE" if get_backend() == MYSQL else query
+
+
+class Estatistica:
+
+    @staticmethod
+    @cached('schema', ttl=60)
+    def contadores_disponiveis():
+        """Indica se a migração dos contadores (v003) já foi aplicada"""
+        if get_backend() == MYSQL:
+            query = ("SELECT COUNT(*) AS total FROM information_schema.tables "
+                     "WHERE table_schema = DATABASE() AND table_name = 'contadores'")
+        else:
+            query = "SELECT COUNT(*) AS total FROM sqlite_master WHERE type = 'table' AND name = 'contadores'"
+        result = execute_query_one(query)
+        return bool(result and result['total'])
+
+    @staticmethod
+    @cached('eventos', 'restaurantes', until_midnight=True)
+    def get_dashboard():
+        """
+        Números do dashboard lidos dos contadores (custo constante). Se as
+        tabelas de contadores ainda não existirem, calcula tudo numa só
+        passada pelas tabelas. O resultado guardado vale enquanto a versão
+        de eventos e restaurantes (linhas de contadores) não mudar.
+        """
+        if not Estatistica.contadores_disponiveis():
+            return Estatistica.calcular()
+        query = """
+        SELECT
+            (SELECT valor FROM contadores WHERE nome = %s) AS total_eventos,
+            (SELECT valor FROM contadores WHERE nome = %s) AS total_restaurantes,
+            (SELECT valor FROM contadores WHERE nome = %s) AS locais_unicos,
+            (SELECT total FROM eventos_por_data WHERE data = %s) AS eventos_hoje
+        """
+        result = execute_query_one(query, (TOTAL_EVENTOS, TOTAL_RESTAURANTES, LOCAIS_UNICOS, date.today()))
+        if result is None or result['total_eventos'] is None:
+            return Estatistica.calcular()
+        return {
+            'total_eventos': result['total_eventos'],
+            'total_restaurantes': result['total_restaurantes'] or 0,
+            'eventos_hoje': result['eventos_hoje'] or 0,
+            'locais_unicos': result['locais_unicos'] or 0,
+        }
+
+    @staticmethod
+    def calcular():
+        """Calcula as estatísticas numa única query sobre as tabelas"""
+        query = """
+        SELECT COUNT(*) AS total_eventos,
+               SUM(CASE WHEN data_inicio = %s THEN 1 ELSE 0 END) AS eventos_hoje,
+               COUNT(DISTINCT local) AS locais_unicos,
+               (SELECT COUNT(*) FROM restaurantes) AS total_restaurantes
+        FROM eventos
+        """
+        result = execute_query_one(query, (date.today(),)) or {}
+        return {
+            'total_eventos': result.get('total_eventos') or 0,
+            'total_restaurantes': result.get('total_restaurantes') or 0,
+            'eventos_hoje': int(result.get('eventos_hoje') or 0),
+            'locais_unicos': result.get('locais_unicos') or 0,
+        }
+
+    # ===== Manutenção dos contadores (chamadas dentro das transações dos models) =====
+    # Sem a migração v003 aplicada, as escritas seguem sem atualizar contadores
+
+    @staticmethod
+    def _somar(tx, nome, delta):
+        tx.execute("UPDATE contadores SET valor = valor + %s WHERE nome = %s", (delta, nome))
+
+    @staticmethod
+    def _incrementar_local(tx, local):
+        tx.execute(_upsert_incremento('eventos_por_local', 'local'), (local,))
+        linhas = tx.execute("SELECT total FROM eventos_por_local WHERE local = %s", (local,))
+        if linhas and linhas[0]['total'] == 1:
+            Estatistica._somar(tx, LOCAIS_UNICOS, 1)
+
+    @staticmethod
+    def _decrementar_local(tx, local):
+        tx.execute("UPDATE eventos_por_local SET total = total - 1 WHERE local = %s", (local,))
+        linhas = tx.execute("SELECT total FROM eventos_por_local WHERE local = %s", (local,))
+        if linhas and linhas[0]['total'] <= 0:
+            tx.execute("DELETE FROM eventos_por_local WHERE local = %s", (local,))
+            Estatistica._somar(tx, LOCAIS_UNICOS, -1)
+
+    @staticmethod
+    def _decrementar_data(tx, data):
+        tx.execute("UPDATE eventos_por_data SET total = total - 1 WHERE data = %s", (data,))
+        tx.execute("DELETE FROM eventos_por_data WHERE data = %s AND total <= 0", (data,))
+
+    @staticmethod
+    def tabela_alterada(tx, tabela):
+        """Soma 1 à versão da tabela (table_version em config/cache.py)"""
+        if not Estatistica.contadores_disponiveis():
+            return
+        Estatistica._somar(tx, contador_versao(tabela), 1)
+
+    @staticmethod
+    def evento_criado(tx, data_inicio, local):
+        if not Estatistica.contadores_disponiveis():
+            return
+        Estatistica._somar(tx, TOTAL_EVENTOS, 1)
+        tx.execute(_upsert_incremento('eventos_por_data', 'data'), (data_inicio,))
+        Estatistica._incrementar_local(tx, local)
+
+    @staticmethod
+    def evento_alterado(tx, antigo, data_inicio, local):
+        if not Estatistica.contadores_disponiveis():
+            return
+        if _data(antigo['data_inicio']) != _data(data_inicio):
+            Estatistica._decrementar_data(tx, antigo['data_inicio'])
+            tx.execute(_upsert_incremento('eventos_por_data', 'data'), (data_inicio,))
+        if antigo['local'] != local:
+            Estatistica._decrementar_local(tx, antigo['local'])
+            Estatistica._incrementar_local(tx, local)
+
+    @staticmethod
+    def evento_removido(tx, antigo):
+        if not Estatistica.contadores_disponiveis():
+            return
+        Estatistica._somar(tx, TOTAL_EVENTOS, -1)
+        Estatistica._decrementar_data(tx, antigo['data_inicio'])
+        Estatistica._decrementar_local(tx, antigo['local'])
+
+    @staticmethod
+    def evento_atual(tx, evento_id):
+        """Data e local gravados de um evento, travando a linha até o fim da transação"""
+        linhas = tx.execute(_lock("SELECT data_inicio, local FROM eventos WHERE id = %s"), (evento_id,))
+        return linhas[0] if linhas else None
+
+    @staticmethod
+    def restaurante_criado(tx):
+        if not Estatistica.contadores_disponiveis():
+            return
+        Estatistica._somar(tx, TOTAL_RESTAURANTES, 1)
+
+    @staticmethod
+    def restaurante_removido(tx):
+        if not Estatistica.contadores_disponiveis():
+            return
+        Estatistica._somar(tx, TOTAL_RESTAURANTES, -1)
+
+    # ===== Reconciliação =====
+
+    @staticmethod
+    def reconcile():
+        """
+        Recalcula todos os contadores a partir das tabelas, numa transação.
+        Retorna a lista de (contador, valor antigo, valor correto) que
+        estavam divergentes, ou None se a reconciliação falhar.
+        """
+        def _operacao(tx):
+            divergencias = []
+            antigos = {r['nome']: r['valor'] for r in tx.execute("SELECT nome, valor FROM contadores")}
+            corretos = tx.execute("""
+                SELECT (SELECT COUNT(*) FROM eventos) AS eventos,
+                       (SELECT COUNT(*) FROM restaurantes) AS restaurantes,
+                       (SELECT COUNT(DISTINCT local) FROM eventos) AS locais_unicos
+            """)[0]
+            for nome in (TOTAL_EVENTOS, TOTAL_RESTAURANTES, LOCAIS_UNICOS):
+                if antigos.get(nome) != corretos[nome]:
+                    divergencias.append((nome, antigos.get(nome), corretos[nome]))
+                    tx.execute("DELETE FROM contadores WHERE nome = %s", (nome,))
+                    tx.execute("INSERT INTO contadores (nome, valor) VALUES (%s, %s)", (nome, corretos[nome]))
+
+            for tabela, chave, coluna in (('eventos_por_data', 'data', 'data_inicio'),
+                                          ('eventos_por_local', 'local', 'local')):
+                antigos = {r[chave]: r['total'] for r in tx.execute(f"SELECT {chave}, total FROM {tabela}")}
+                corretos = {r['chave']: r['total'] for r in tx.execute(
+                    f"SELECT {coluna} AS chave, COUNT(*) AS total FROM eventos GROUP BY {coluna}")}
+                if antigos != corretos:
+                    diferentes = sum(1 for k in antigos.keys() | corretos.keys()
+                                     if antigos.get(k) != corretos.get(k))
+                    divergencias.append((tabela, f"{diferentes} chave(s) divergente(s)", len(corretos)))
+                    tx.execute(f"DELETE FROM {tabela}")
+                    tx.execute(f"INSERT INTO {tabela} ({chave}, total) "
+                               f"SELECT {coluna}, COUNT(*) FROM eventos GROUP BY {coluna}")
+            if divergencias:
+                # Os dashboards guardados pelos outros processos deixam de valer
+                Estatistica.tabela_alterada(tx, 'eventos')
+                Estatistica.tabela_alterada(tx, 'restaurantes')
+            return divergencias
+
+        divergencias = execute_transaction(_operacao)
+        if divergencias:
+            invalidate('eventos', 'restaurantes')
+            for nome, antigo, correto in divergencias:
+                logger.warning(f"Contador {nome} corrigido: {antigo} -> {correto}")
+        return divergencias
@@ -1,11 +1,70 @@
-from config.database import execute_query, execute_query_one
+from config.database import execute_query, execute_query_one, execute_transaction, iter_query
+from config.async_database import execute_query_async
+from config.cache import cached, invalidate
+from models.estatistica import Estatistica
+from models.interval_index import IntervalIndex
+from models.coordenadas import Coordenadas, coordenadas_preservadas, endereco
+from models.entidades import Entidades
+from models.memory_index import MemoryIndex, antes_da_escrita, depois_da_escrita
+from models.facet_index import FacetIndex
+from models.pagination import Keyset, index_page, rank_page
+from models.search_index import SearchIndex
 from datetime import datetime, date
 
+# Tamanho do resumo da descrição nos cards; um caractere a mais permite ao
+# template saber se precisa mostrar as reticências
+DESCRICAO_RESUMO = 100
+
+# Colunas usadas pelos cards das listagens (sem endereço e contato). A
+# descrição vem cortada no próprio banco; versao (migração v006) é a chave
+# do card no cache de fragmentos.
+CARD_COLUMNS = ('id', 'nome_evento', 'tipo', 'descricao', 'data_inicio', 'data_fim',
+                'horario', 'local', 'preco', 'url_imagem', 'versao')
+CARD_SELECT = ", ".join(
+    f"SUBSTR(descricao, 1, {DESCRICAO_RESUMO + 1}) AS descricao" if c == 'descricao' else c
+    for c in CARD_COLUMNS
+)
+
+# Ids por query ao buscar os cards encontrados nos índices em memória
+IN_CHUNK_SIZE = 500
+
+# Campos indexados pela busca e o peso de cada um no ranking
+BUSCA_PESOS = {'nome_evento': 3, 'tipo': 2, 'local': 2, 'organizador': 1, 'descricao': 1}
+# Tipos de nome (models/entidades.py) que corrigem uma busca sem resultado
+BUSCA_CORRECAO = ('evento', 'local', 'tipo_evento')
+
+# Faixas de preço dos filtros da listagem: (preço máximo, rótulo); a última não tem máximo
+FAIXAS_PRECO = ((0, 'Gratuito'), (50, 'Até R$ 50'), (100, 'R$ 50 a R$ 100'), (None, 'Acima de R$ 100'))
+
+
+def _data(valor):
+    return date.fromisoformat(valor) if isinstance(valor, str) else valor
+
+
+def faixa_preco(preco):
+    """Rótulo da faixa de FAIXAS_PRECO em que o preço se encaixa (sem preço: gratuito)"""
+    try:
+        preco = float(preco or 0)
+    except (TypeError, ValueError):
+        preco = 0
+    for maximo, rotulo in FAIXAS_PRECO:
+        if maximo is None or preco <= maximo:
+            return rotulo
+
+
+# Facetas dos filtros da listagem: nome -> valor da faceta numa linha
+CAMPOS_FACETAS = {
+    'tipo': lambda r: r.get('tipo'),
+    'faixa_preco': lambda r: faixa_preco(r.get('preco')),
+}
+
+
 class Evento:
     def __init__(self, id=None, nome_evento=None, tipo=None, descricao=None, 
                  data_inicio=None, data_fim=None, horario=None, local=None, 
                  endereco=None, preco=None, capacidade=None, organizador=None, 
-                 contato=None, url_imagem=None, data_criacao=None, data_atualizacao=None):
+                 contato=None, url_imagem=None, data_criacao=None, data_atualizacao=None,
+                 latitude=None, longitude=None, versao=None):
         self.id = id
         self.nome_evento = nome_evento
         self.tipo = tipo
@@ -22,19 +81,86 @@ class Evento:
         self.url_imagem = url_imagem
         self.data_criacao = data_criacao
         self.data_atualizacao = data_atualizacao
+        self.latitude = latitude
+        self.longitude = longitude
+        self.versao = versao
 
     @staticmethod
+    @cached('eventos')
     def get_all():
         """Retorna todos os eventos como objetos"""
         query = "SELECT * FROM eventos ORDER BY data_inicio DESC"
         resultados = execute_query(query)
         return [Evento(**r) for r in resultados] if resultados else []
 
+    @staticmethod
+    def iter_all(chunk_size=None):
+        """Gera todos os eventos um a um, sem carregar a tabela inteira na memória"""
+        query = "SELECT * FROM eventos ORDER BY data_inicio DESC"
+        for r in iter_query(query, chunk_size=chunk_size):
+            yield Evento(**r)
+
+    @staticmethod
+    @cached('eventos')
+    def paginate(depois=None, antes=None, limite=None, busca=None, **filtros):
+        """
+        Uma página de cards de eventos (mais recentes primeiro), a partir dos
+        cursores. `filtros` são facetas de CAMPOS_FACETAS -> valor ou tupla
+        de valores aceitos. Com `busca`, os resultados vêm por relevância.
+        """
+        selecao = Evento._selecao(filtros)
+        if busca:
+            ids = Evento._ids_busca(busca)
+            if selecao:
+                with FACETAS.usar() as indice:
+                    ids = indice.restringir(ids, indice.filtro(selecao))
+            return rank_page(ids, depois, antes, limite, Evento.get_cards)
+        if selecao:
+            def _buscar(depois, antes, limite):
+                with FACETAS.usar() as indice:
+                    return indice.pagina(indice.filtro(selecao), depois=_ordem(depois),
+                                         antes=_ordem(antes), limite=limite)
+            return index_page(_buscar, depois, antes, limite, Evento.get_cards,
+                              lambda card: (card.data_inicio, card.id), parse=KEYSET.parse)
+        query, params, contexto = KEYSET.query(depois=depois, antes=antes, limite=limite,
+                                               colunas=CARD_SELECT)
+        return KEYSET.page(execute_query(query, params), contexto, lambda r: EventoCard(**r))
+
+    @staticmethod
+    @cached('eventos')
+    def facetas(busca=None, **filtros):
+        """
+        Quantidade de eventos por valor de cada faceta, com os filtros (e a
+        busca) atuais: {faceta: {valor: quantidade}}
+        """
+        selecao = Evento._selecao(filtros)
+        base = None
+        if busca:
+            ids = Evento._ids_busca(busca)
+        with FACETAS.usar() as indice:
+            if busca:
+                base = indice.bitmap(ids)
+            return indice.contagens(selecao, base)
+
+    @staticmethod
+    def _selecao(filtros):
+        """Filtros da listagem -> {faceta: valores aceitos}, sem os vazios"""
+        selecao = {}
+        for faceta, valores in filtros.items():
+            if faceta not in CAMPOS_FACETAS:
+                raise TypeError(f"Filtro desconhecido: {faceta}")
+            if not isinstance(valores, (tuple, list, set, frozenset)):
+                valores = (valores,)
+            valores = tuple(v for v in valores if v not in (None, '', 'Todos', 'Todas'))
+            if valores:
+                selecao[faceta] = valores
+        return selecao
+
     @staticmethod
     def get_by_id(evento_id):
         """Retorna um evento pelo ID"""
         query = "SELECT * FROM eventos WHERE id = %s"
-        resultado = execute_query_one(query, (evento_id,))
+        resultado = execute_query_one(query, (evento_id,), prepared=True)
         return Evento(**resultado) if resultado else None
 
     @staticmethod
@@ -53,46 +179,95 @@ class Evento:
             evento_data['capacidade'], evento_data['organizador'], evento_data['contato'],
             evento_data['url_imagem']
         )
-        return execute_query(query, params)
+
+        novo = []
+
+        # O evento e os contadores do dashboard são gravados juntos
+        def _operacao(tx):
+            resultado = tx.execute(query, params)
+            novo.append(tx.lastrowid)
+            Estatistica.evento_criado(tx, evento_data['data_inicio'], evento_data['local'])
+            Estatistica.tabela_alterada(tx, 'eventos')
+            return resultado
+
+        estado = antes_da_escrita('eventos')
+        resultado = execute_transaction(_operacao)
+        invalidate('eventos')
+        if resultado:
+            depois_da_escrita(estado, 'eventos', novo[0], evento_data)
+            Coordenadas.agendar('eventos', novo[0])
+        return resultado
 
     @staticmethod
     def update(evento_id, evento_data):
         """Atualiza um evento"""
-        query = """
-        UPDATE eventos SET nome_evento = %s, tipo = %s, descricao = %s, 
+        # As coordenadas só continuam valendo se o endereço não mudou
+        query = f"""
+        UPDATE eventos SET {coordenadas_preservadas('eventos')}
+                          nome_evento = %s, tipo = %s, descricao = %s, 
                           data_inicio = %s, data_fim = %s, horario = %s, 
                           local = %s, endereco = %s, preco = %s, capacidade = %s, 
-                          organizador = %s, contato = %s, url_imagem = %s
+                          organizador = %s, contato = %s, url_imagem = %s,
+                          versao = versao + 1
         WHERE id = %s
         """
+        novo_endereco = endereco('eventos', evento_data)
         params = (
+            novo_endereco, novo_endereco,
             evento_data['nome_evento'], evento_data['tipo'], evento_data['descricao'],
             evento_data['data_inicio'], evento_data['data_fim'], evento_data['horario'],
             evento_data['local'], evento_data['endereco'], evento_data['preco'],
             evento_data['capacidade'], evento_data['organizador'], evento_data['contato'],
             evento_data['url_imagem'], evento_id
         )
-        return execute_query(query, params)
+
+        def _operacao(tx):
+            antigo = Estatistica.evento_atual(tx, evento_id)
+            resultado = tx.execute(query, params)
+            if antigo:
+                Estatistica.evento_alterado(tx, antigo, evento_data['data_inicio'], evento_data['local'])
+            Estatistica.tabela_alterada(tx, 'eventos')
+            return resultado
+
+        estado = antes_da_escrita('eventos')
+        resultado = execute_transaction(_operacao)
+        invalidate('eventos')
+        if resultado:
+            # Relida: é o UPDATE que decide se as coordenadas continuam valendo
+            linha = execute_query_one("SELECT * FROM eventos WHERE id = %s", (evento_id,)) or evento_data
+            depois_da_escrita(estado, 'eventos', evento_id, linha)
+            Coordenadas.agendar('eventos', evento_id)
+        return resultado
 
     @staticmethod
     def delete(evento_id):
         """Deleta um evento"""
         query = "DELETE FROM eventos WHERE id = %s"
-        return execute_query(query, (evento_id,))
+
+        def _operacao(tx):
+            antigo = Estatistica.evento_atual(tx, evento_id)
+            resultado = tx.execute(query, (evento_id,))
+            if antigo and resultado:
+                Estatistica.evento_removido(tx, antigo)
+            Estatistica.tabela_alterada(tx, 'eventos')
+            return resultado
+
+        estado = antes_da_escrita('eventos')
+        resultado = execute_transaction(_operacao)
+        invalidate('eventos')
+        if resultado:
+            depois_da_escrita(estado, 'eventos', evento_id)
+        return resultado
 
     @staticmethod
-    def search(termo_busca):
-        """Busca eventos por termo"""
-        query = """
-        SELECT * FROM eventos 
-        WHERE nome_evento LIKE %s OR descricao LIKE %s OR local LIKE %s OR organizador LIKE %s
-        ORDER BY data_inicio DESC
-        """
-        termo = f"%{termo_busca}%"
-        resultados = execute_query(query, (termo, termo, termo, termo))
-        return [Evento(**r) for r in resultados] if resultados else []
+    @cached('eventos')
+    def search(termo_busca, limite=None):
+        """Busca eventos por termo (sem acentos, pelo radical), do mais relevante ao menos"""
+        ids = Evento._ids_busca(termo_busca, limite)
+        return Evento._por_ids(ids, "*", Evento)
 
     @staticmethod
+    @cached('eventos')
     def filter_by_type(tipo):
         """Filtra eventos por tipo"""
         if tipo == "Todos":
@@ -102,6 +277,7 @@ class Evento:
         return [Evento(**r) for r in resultados] if resultados else []
 
     @staticmethod
+    @cached('eventos', until_midnight=True)
     def filter_by_status(status):
         """Filtra eventos por status (próximos ou realizados)"""
         hoje = date.today()
@@ -117,6 +293,7 @@ class Evento:
             return Evento.get_all()
 
     @staticmethod
+    @cached('eventos')
     def get_count():
         """Retorna o total de eventos"""
         query = "SELECT COUNT(*) as total FROM eventos"
@@ -124,6 +301,7 @@ class Evento:
         return result['total'] if result else 0
 
     @staticmethod
+    @cached('eventos', until_midnight=True)
     def get_eventos_hoje():
         """Retorna eventos de hoje"""
         hoje = date.today()
@@ -132,6 +310,7 @@ class Evento:
         return result['total'] if result else 0
 
     @staticmethod
+    @cached('eventos')
     def get_locais_unicos():
         """Retorna o número de locais únicos"""
         query = "SELECT COUNT(DISTINCT local) as total FROM eventos"
@@ -139,10 +318,159 @@ class Evento:
         return result['total'] if result else 0
 
     @staticmethod
+    @cached('eventos', until_midnight=True)
     def get_proximos_eventos(limit=5):
-        """Retorna os próximos eventos"""
+        """Retorna os cards dos próximos eventos"""
         hoje = date.today()
-        query = "SELECT * FROM eventos WHERE data_inicio >= %s ORDER BY data_inicio ASC LIMIT %s"
+        query = f"SELECT {CARD_SELECT} FROM eventos WHERE data_inicio >= %s ORDER BY data_inicio ASC LIMIT %s"
         resultados = execute_query(query, (hoje, limit))
+        return [EventoCard(**r) for r in resultados] if resultados else []
+
+    # ===== Eventos em andamento (índice de intervalos) =====
+
+    @staticmethod
+    @cached('eventos')
+    def active_between(inicio, fim, limite=None):
+        """
+        Cards dos eventos em andamento em algum dia entre `inicio` e `fim`
+        (inclusive), por data de início. Com `limite`, só os primeiros.
+        """
+        with PERIODOS.usar() as indice:
+            inicios = [(indice.get(id)[0], id) for id in indice.overlapping(inicio, fim)]
+        ids = [id for _, id in sorted(inicios)]
+        if limite is not None:
+            ids = ids[:limite]
+        return Evento.get_cards(ids)
+
+    @staticmethod
+    def count_active_between(inicio, fim):
+        """Quantidade de eventos em andamento entre `inicio` e `fim` (inclusive)"""
+        with PERIODOS.usar() as indice:
+            return indice.count(inicio, fim)
+
+    @staticmethod
+    def _ids_busca(termo, limite=None):
+        """
+        Ids encontrados pela busca, do mais relevante ao menos. Sem nenhum
+        resultado, busca pelos nomes citados ou parecidos com o termo
+        (erros de digitação: "teatro artur azevdo").
+        """
+        with BUSCA.usar() as indice:
+            ids = indice.search(termo, limite)
+        if ids:
+            return ids
+        nomes = (Entidades.mencionadas(termo, tipos=BUSCA_CORRECAO)
+                 or Entidades.parecidas(termo, tipos=BUSCA_CORRECAO))
+        encontrados = {}
+        with BUSCA.usar() as indice:
+            for nome in nomes:
+                encontrados.update(dict.fromkeys(indice.search(nome['texto'])))
+        ids = list(encontrados)
+        return ids[:limite] if limite else ids
+
+    @staticmethod
+    def get_cards(ids):
+        """Cards dos eventos com os ids dados, na mesma ordem"""
+        return Evento._por_ids(ids, CARD_SELECT, EventoCard)
+
+    @staticmethod
+    def _por_ids(ids, colunas, classe):
+        encontrados = {}
+        for i in range(0, len(ids), IN_CHUNK_SIZE):
+            bloco = ids[i:i + IN_CHUNK_SIZE]
+            marcadores = ", ".join(["%s"] * len(bloco))
+            query = f"SELECT {colunas} FROM eventos WHERE id IN ({marcadores})"
+            for r in execute_query(query, tuple(bloco)) or []:
+                encontrados[r['id']] = classe(**r)
+        # Um evento removido por outro processo depois da montagem do índice fica de fora
+        return [encontrados[id] for id in ids if id in encontrados]
+
+    # ===== Versões assíncronas (para consultas em paralelo com asyncio.gather) =====
+
+    @staticmethod
+    @cached('eventos')
+    async def get_all_async():
+        """Versão assíncrona de get_all"""
+        query = "SELECT * FROM eventos ORDER BY data_inicio DESC"
+        resultados = await execute_query_async(query)
         return [Evento(**r) for r in resultados] if resultados else []
 
+    @staticmethod
+    @cached('eventos')
+    async def paginate_async(depois=None, antes=None, limite=None):
+        """Versão assíncrona de paginate"""
+        query, params, contexto = KEYSET.query(depois=depois, antes=antes, limite=limite,
+                                               colunas=CARD_SELECT)
+        return KEYSET.page(await execute_query_async(query, params), contexto, lambda r: EventoCard(**r))
+
+
+class EventoCard:
+    """Versão compacta de Evento, com apenas os campos exibidos nos cards"""
+    __slots__ = CARD_COLUMNS
+
+    def __init__(self, **kwargs):
+        for campo in CARD_COLUMNS:
+            setattr(self, campo, kwargs.get(campo))
+
+
+# Listagem paginada por (data_inicio, id), dos eventos mais recentes para os mais antigos
+KEYSET = Keyset('eventos', 'data_inicio', descendente=True, parse=date.fromisoformat)
+
+
+def _ordem(cursor):
+    """Chave de ordenação nas facetas de um cursor (data_inicio, id): decrescente"""
+    if cursor is None:
+        return None
+    data_inicio, id = cursor
+    return -_data(data_inicio).toordinal(), -id
+
+
+# ===== Índices em memória (models/memory_index.py) =====
+
+def _construir_periodos():
+    return IntervalIndex((r['id'], _data(r['data_inicio']), _data(r['data_fim']))
+                         for r in iter_query("SELECT id, data_inicio, data_fim FROM eventos"))
+
+
+def _aplicar_periodo(indice, tabela, id, linha):
+    if linha is None:
+        indice.remove(id)
+    else:
+        indice.add(id, _data(linha['data_inicio']), _data(linha['data_fim']))
+
+
+def _construir_busca():
+    query = f"SELECT id, {', '.join(BUSCA_PESOS)} FROM eventos"
+    return SearchIndex(BUSCA_PESOS, ((r['id'], r) for r in iter_query(query)))
+
+
+def _aplicar_busca(indice, tabela, id, linha):
+    if linha is None:
+        indice.remove(id)
+    else:
+        indice.add(id, linha)
+
+
+def _facetas(linha):
+    return {faceta: valor(linha) for faceta, valor in CAMPOS_FACETAS.items()}
+
+
+def _construir_facetas():
+    query = "SELECT id, data_inicio, tipo, preco FROM eventos"
+    return FacetIndex((r['id'], _ordem((r['data_inicio'], r['id'])), _facetas(r))
+                      for r in iter_query(query))
+
+
+def _aplicar_facetas(indice, tabela, id, linha):
+    if linha is None:
+        indice.remove(id)
+    else:
+        indice.add(id, _ordem((linha['data_inicio'], id)), _facetas(linha))
+
+
+# Períodos (data_inicio, data_fim), para as consultas "em andamento entre duas datas"
+PERIODOS = MemoryIndex('periodos_eventos', ('eventos',), _construir_periodos, _aplicar_periodo)
+# Busca textual em nome, tipo, local, organizador e descrição
+BUSCA = MemoryIndex('busca_eventos', ('eventos',), _construir_busca, _aplicar_busca)
+# Bitmaps das facetas dos filtros da listagem
+FACETAS = MemoryIndex('facetas_eventos', ('eventos',), _construir_facetas, _aplicar_facetas)
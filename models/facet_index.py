@@ -0,0 +1,196 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+
+# Filtros por faceta em memória. Cada valor de cada faceta (culinária
+# "Italiana", delivery True...) é um bitmap: um int do Python em que o bit
+# n indica se o documento n tem aquele valor. Uma combinação de filtros é
+# um AND entre facetas (OR entre valores da mesma faceta) e a contagem de
+# um valor é a quantidade de bits do AND com ele: algumas operações sobre
+# ints de n/8 bytes, sem consultar o banco.
+#
+# Os documentos são numerados na ordem da listagem, então percorrer os bits
+# de um resultado do menor para o maior já dá a página em ordem. Como nos
+# outros índices, inclusões depois da montagem ficam numa lista ordenada à
+# parte (fora da numeração) e tudo é remontado quando essas pendências e as
+# remoções passam de uma fração do total.
+
+# Remonta quando pendentes + removidos passam de max(REBUILD_MIN, n * REBUILD_RATIO)
+REBUILD_MIN = 256
+REBUILD_RATIO = 0.2
+
+
+def _bitmap(docs):
+    """Int com os bits dos docs ligados"""
+    buffer = bytearray((max(docs) >> 3) + 1) if docs else bytearray()
+    for doc in docs:
+        buffer[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+class FacetIndex:
+    """
+    Documentos identificados por id, cada um com uma chave de ordenação
+    (`ordem`, comparável) e um dict faceta -> valor.
+    """
+
+    def __init__(self, documentos=()):
+        self._ids = []
+        self._ordens = []
+        self._valores = []
+        self._doc = {}
+        for id, ordem, valores in documentos:
+            self._doc[id] = len(self._ids)
+            self._ids.append(id)
+            self._ordens.append(ordem)
+            self._valores.append(dict(valores))
+        self._rebuild()
+
+    def _rebuild(self):
+        """Renumera os documentos na ordem da listagem e remonta os bitmaps"""
+        vivos = sorted((self._ordens[doc], id) for id, doc in self._doc.items())
+        valores = [self._valores[self._doc[id]] for _, id in vivos]
+        self._ids = [id for _, id in vivos]
+        self._ordens = [ordem for ordem, _ in vivos]
+        self._valores = valores
+        self._doc = {id: doc for doc, id in enumerate(self._ids)}
+
+        docs = {}
+        for doc, campos in enumerate(valores):
+            for faceta, valor in campos.items():
+                docs.setdefault(faceta, {}).setdefault(valor, []).append(doc)
+        self._bits = {faceta: {valor: _bitmap(d) for valor, d in por_valor.items()}
+                      for faceta, por_valor in docs.items()}
+        self._vivos = (1 << len(self._ids)) - 1
+        # Documentos 0.._ordenados-1 seguem a ordem; os incluídos depois
+        # ficam em _pendentes, como (ordem, doc) ordenados
+        self._ordenados = len(self._ids)
+        self._pendentes = []
+        self._removidos = 0
+
+    def _talvez_reconstruir(self):
+        limite = max(REBUILD_MIN, len(self._doc) * REBUILD_RATIO)
+        if len(self._pendentes) + self._removidos > limite:
+            self._rebuild()
+
+    def __len__(self):
+        return len(self._doc)
+
+    def add(self, id, ordem, valores):
+        """Inclui (ou substitui) o documento `id`"""
+        self._retirar(id)
+        doc = len(self._ids)
+        self._doc[id] = doc
+        self._ids.append(id)
+        self._ordens.append(ordem)
+        self._valores.append(dict(valores))
+        bit = 1 << doc
+        for faceta, valor in valores.items():
+            por_valor = self._bits.setdefault(faceta, {})
+            por_valor[valor] = por_valor.get(valor, 0) | bit
+        self._vivos |= bit
+        insort(self._pendentes, (ordem, doc))
+        self._talvez_reconstruir()
+
+    def remove(self, id):
+        if self._retirar(id):
+            self._talvez_reconstruir()
+
+    def _retirar(self, id):
+        doc = self._doc.pop(id, None)
+        if doc is None:
+            return False
+        mascara = ~(1 << doc)
+        for faceta, valor in self._valores[doc].items():
+            restantes = self._bits[faceta][valor] & mascara
+            if restantes:
+                self._bits[faceta][valor] = restantes
+            else:
+                del self._bits[faceta][valor]
+        self._vivos &= mascara
+        if doc >= self._ordenados:
+            self._pendentes.remove((self._ordens[doc], doc))
+        else:
+            self._removidos += 1
+        return True
+
+    # ===== Filtros e contagens =====
+
+    def filtro(self, selecao, exceto=None):
+        """
+        Bitmap dos documentos que atendem `selecao` (faceta -> valores
+        aceitos): OR entre os valores de uma faceta, AND entre facetas.
+        A faceta `exceto` é ignorada.
+        """
+        bits = self._vivos
+        for faceta, valores in selecao.items():
+            if faceta == exceto:
+                continue
+            por_valor = self._bits.get(faceta, {})
+            aceitos = 0
+            for valor in valores:
+                aceitos |= por_valor.get(valor, 0)
+            bits &= aceitos
+        return bits
+
+    def bitmap(self, ids):
+        """Bitmap dos documentos de `ids` (por exemplo, o resultado de uma busca)"""
+        return _bitmap([self._doc[id] for id in ids if id in self._doc])
+
+    def restringir(self, ids, bits):
+        """Os ids (na ordem dada) cujos documentos estão em `bits`"""
+        return [id for id in ids if id in self._doc and (bits >> self._doc[id]) & 1]
+
+    def contagens(self, selecao, base=None):
+        """
+        {faceta: {valor: quantidade}}. A contagem de cada faceta aplica os
+        filtros das outras (e `base`, se dado), mas não o dela: mostra
+        quantos resultados haveria ao escolher cada valor.
+        """
+        contagens = {}
+        for faceta, por_valor in self._bits.items():
+            bits = self.filtro(selecao, exceto=faceta)
+            if base is not None:
+                bits &= base
+            contagens[faceta] = {valor: (bits & b).bit_count() for valor, b in por_valor.items()}
+        return contagens
+
+    # ===== Paginação =====
+
+    def pagina(self, bits, depois=None, antes=None, limite=20):
+        """
+        Ids de `bits` na ordem da listagem: os `limite` seguintes à chave
+        `depois` ou, com `antes`, os anteriores a ela. Devolve (ids, há
+        mais nessa direção).
+        """
+        principais = bits & ((1 << self._ordenados) - 1)
+        quantidade = limite + 1
+        if antes is not None:
+            fim = bisect_left(self._ordens, antes, 0, self._ordenados)
+            principais &= (1 << fim) - 1
+            encontrados = []
+            while principais and len(encontrados) < quantidade:
+                doc = principais.bit_length() - 1
+                principais ^= 1 << doc
+                encontrados.append((self._ordens[doc], doc))
+            fim = bisect_left(self._pendentes, (antes,))
+            pendentes = islice((p for p in reversed(self._pendentes[:fim]) if (bits >> p[1]) & 1), quantidade)
+            encontrados = sorted(encontrados + list(pendentes), reverse=True)[:quantidade]
+            tem_mais = len(encontrados) > limite
+            encontrados = encontrados[:limite]
+            encontrados.reverse()
+        else:
+            if depois is not None:
+                inicio = bisect_right(self._ordens, depois, 0, self._ordenados)
+                principais &= ~((1 << inicio) - 1)
+            encontrados = []
+            while principais and len(encontrados) < quantidade:
+                menor = principais & -principais
+                principais ^= menor
+                doc = menor.bit_length() - 1
+                encontrados.append((self._ordens[doc], doc))
+            inicio = bisect_right(self._pendentes, (depois, float('inf'))) if depois is not None else 0
+            pendentes = islice((p for p in self._pendentes[inicio:] if (bits >> p[1]) & 1), quantidade)
+            encontrados = sorted(encontrados + list(pendentes))[:quantidade]
+            tem_mais = len(encontrados) > limite
+            encontrados = encontrados[:limite]
+        return [self._ids[doc] for _, doc in encontrados], tem_mais
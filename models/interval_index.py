@@ -0,0 +1,135 @@
+# Índice de intervalos em memória (árvore centrada). Cada nó guarda os
+# intervalos que contêm o seu ponto central, em duas listas: por início
+# crescente e por fim decrescente. Uma consulta de sobreposição visita um
+# caminho da árvore e, em cada nó, só lê os intervalos que de fato se
+# sobrepõem: O(log n + k).
+#
+# Inserções e remoções não reorganizam a árvore: as novas ficam numa lista
+# à parte (percorrida inteira nas consultas) e as removidas são ignoradas
+# até a próxima reconstrução, feita quando essas pendências passam de uma
+# fração do total.
+
+# Reconstrói quando as pendências passam de max(REBUILD_MIN, n * REBUILD_RATIO)
+REBUILD_MIN = 64
+REBUILD_RATIO = 0.125
+
+
+class _Node:
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, center, intervalos, left, right):
+        self.center = center
+        self.by_start = sorted(intervalos, key=lambda i: i[0])
+        self.by_end = sorted(intervalos, key=lambda i: i[1], reverse=True)
+        self.left = left
+        self.right = right
+
+
+def _build(intervalos):
+    """Monta a árvore com intervalos (inicio, fim, id)"""
+    if not intervalos:
+        return None
+    pontos = sorted(p for inicio, fim, _ in intervalos for p in (inicio, fim))
+    center = pontos[len(pontos) // 2]
+    esquerda, direita, aqui = [], [], []
+    for intervalo in intervalos:
+        if intervalo[1] < center:
+            esquerda.append(intervalo)
+        elif intervalo[0] > center:
+            direita.append(intervalo)
+        else:
+            aqui.append(intervalo)
+    return _Node(center, aqui, _build(esquerda), _build(direita))
+
+
+class IntervalIndex:
+    """
+    Conjunto de intervalos fechados [inicio, fim] identificados por id.
+    Os extremos podem ser de qualquer tipo comparável (datas, números).
+    """
+
+    def __init__(self, intervalos=()):
+        self._intervalos = {}
+        for id, inicio, fim in intervalos:
+            self._intervalos[id] = self._normalizar(inicio, fim)
+        self._rebuild()
+
+    @staticmethod
+    def _normalizar(inicio, fim):
+        # Sem fim (ou fim antes do início), o intervalo é só o dia de início
+        if fim is None or fim < inicio:
+            fim = inicio
+        return inicio, fim
+
+    def _rebuild(self):
+        self._root = _build([(inicio, fim, id) for id, (inicio, fim) in self._intervalos.items()])
+        self._pendentes = {}
+        self._removidos = set()
+
+    def _talvez_reconstruir(self):
+        limite = max(REBUILD_MIN, len(self._intervalos) * REBUILD_RATIO)
+        if len(self._pendentes) + len(self._removidos) > limite:
+            self._rebuild()
+
+    def __len__(self):
+        return len(self._intervalos)
+
+    def __contains__(self, id):
+        return id in self._intervalos
+
+    def get(self, id):
+        """(inicio, fim) do intervalo de `id`, ou None"""
+        return self._intervalos.get(id)
+
+    def add(self, id, inicio, fim):
+        """Inclui (ou substitui) o intervalo de `id`"""
+        if id in self._intervalos:
+            self.remove(id)
+        self._intervalos[id] = self._normalizar(inicio, fim)
+        self._pendentes[id] = self._intervalos[id]
+        self._talvez_reconstruir()
+
+    def remove(self, id):
+        """Retira o intervalo de `id`, se existir"""
+        if self._intervalos.pop(id, None) is None:
+            return
+        if self._pendentes.pop(id, None) is None:
+            # Ainda está na árvore: passa a ser ignorado nas consultas
+            self._removidos.add(id)
+        self._talvez_reconstruir()
+
+    def overlapping(self, inicio, fim):
+        """Ids dos intervalos que se sobrepõem a [inicio, fim]"""
+        ids = []
+        node = self._root
+        pilha = []
+        while node is not None or pilha:
+            if node is None:
+                node = pilha.pop()
+            if fim < node.center:
+                # Todos os intervalos do nó terminam depois de `fim`: basta
+                # os que começam até ele
+                for i in node.by_start:
+                    if i[0] > fim:
+                        break
+                    ids.append(i[2])
+                node = node.left
+            elif inicio > node.center:
+                for i in node.by_end:
+                    if i[1] < inicio:
+                        break
+                    ids.append(i[2])
+                node = node.right
+            else:
+                ids.extend(i[2] for i in node.by_start)
+                if node.right is not None:
+                    pilha.append(node.right)
+                node = node.left
+
+        if self._removidos:
+            ids = [id for id in ids if id not in self._removidos]
+        ids.extend(id for id, (i, f) in self._pendentes.items() if i <= fim and f >= inicio)
+        return ids
+
+    def count(self, inicio, fim):
+        return len(self.overlapping(inicio, fim))
@@ -0,0 +1,154 @@
+import logging
+import threading
+from contextlib import contextmanager
+from config.cache import table_version
+from config.database import query_error_count
+
+logger = logging.getLogger(__name__)
+
+# Estruturas em memória derivadas das tabelas (índice de períodos, busca,
+# autocompletar...). Cada uma é montada no primeiro uso (ou na subida do app,
+# com carregar_todos), recebe as escritas feitas pelos models deste processo
+# e é remontada quando a versão das tabelas (table_version) mostra escritas
+# de outros processos.
+#
+# A remontagem lê a tabela inteira, então não acontece dentro da requisição:
+# roda numa thread e, enquanto ela não termina, as consultas usam a
+# estrutura anterior (com alguns segundos de atraso em relação aos outros
+# processos). As escritas deste processo feitas durante a remontagem são
+# aplicadas nas duas estruturas, a atual e a nova.
+#
+# Nos models, cada escrita fica entre antes_da_escrita e depois_da_escrita:
+#
+#     estado = antes_da_escrita('eventos')
+#     resultado = execute_transaction(...)
+#     if resultado:
+#         depois_da_escrita(estado, 'eventos', evento_id, evento_data)
+
+_registrados = []
+
+
+class MemoryIndex:
+    """
+    Estrutura em memória sobre `tabelas`. `construir()` lê o banco e devolve
+    a estrutura; `aplicar(estrutura, tabela, id, linha)` aplica uma escrita
+    (linha None para remoção).
+    """
+
+    def __init__(self, nome, tabelas, construir, aplicar):
+        self.nome = nome
+        self.tabelas = tuple(tabelas)
+        self._construir = construir
+        self._aplicar = aplicar
+        self._estrutura = None
+        self._versao = None
+        self._lock = threading.Lock()
+        # Remontagem em segundo plano e as escritas a repetir na estrutura nova
+        self._thread = None
+        self._escritas = None
+        _registrados.append(self)
+
+    def _versao_atual(self):
+        versoes = tuple(table_version(t) for t in self.tabelas)
+        return None if None in versoes else versoes
+
+    def carregar(self):
+        """(Re)constrói a estrutura a partir do banco"""
+        versao, erros = self._versao_atual(), query_error_count()
+        estrutura = self._construir()
+        with self._lock:
+            self._estrutura = estrutura
+            # Se a leitura falhou, a estrutura é remontada no próximo uso
+            self._versao = versao if query_error_count() == erros else None
+        logger.info(f"Índice {self.nome} carregado")
+        return estrutura
+
+    def _atual(self):
+        versao = self._versao_atual()
+        with self._lock:
+            estrutura = self._estrutura
+            if estrutura is not None and versao is not None and versao != self._versao:
+                self._remontar_em_segundo_plano()
+        # Sem estrutura ainda não há o que servir: a primeira montagem espera
+        return estrutura if estrutura is not None else self.carregar()
+
+    def _remontar_em_segundo_plano(self):
+        # Chamado com o lock: uma remontagem por vez
+        if self._thread is not None:
+            return
+        self._escritas = []
+        self._thread = threading.Thread(target=self._remontar, name=f"remontagem-{self.nome}", daemon=True)
+        self._thread.start()
+
+    def _remontar(self):
+        estrutura = None
+        try:
+            versao, erros = self._versao_atual(), query_error_count()
+            estrutura = self._construir()
+            falhou = query_error_count() != erros
+        except Exception:
+            logger.exception(f"Falha ao remontar o índice {self.nome}")
+        with self._lock:
+            if estrutura is not None:
+                for tabela, id, linha in self._escritas:
+                    self._aplicar(estrutura, tabela, id, linha)
+                self._estrutura = estrutura
+                # Se a leitura falhou, a estrutura é remontada de novo no próximo uso
+                self._versao = None if falhou else versao
+            self._thread = None
+            self._escritas = None
+        if estrutura is not None:
+            logger.info(f"Índice {self.nome} remontado")
+
+    def aguardar(self, timeout=None):
+        """Espera a remontagem em segundo plano, se houver uma em andamento"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @contextmanager
+    def usar(self):
+        """Estrutura em dia, travada contra escritas enquanto o bloco executa"""
+        estrutura = self._atual()
+        with self._lock:
+            yield estrutura
+
+    def sincronizado(self):
+        """Indica se a estrutura reflete a versão atual das tabelas"""
+        versao = self._versao_atual()
+        with self._lock:
+            return self._estrutura is not None and versao is not None and versao == self._versao
+
+    def escrita(self, sincronizado, tabela, id, linha):
+        """
+        Aplica uma escrita deste processo. Só guarda a nova versão das
+        tabelas se a estrutura estava em dia antes da escrita; caso
+        contrário ela é remontada no próximo uso.
+        """
+        # invalidate() já descartou a versão anterior: esta é lida do banco
+        versao = self._versao_atual() if sincronizado else None
+        with self._lock:
+            if self._escritas is not None:
+                self._escritas.append((tabela, id, linha))
+            if self._estrutura is None:
+                return
+            self._aplicar(self._estrutura, tabela, id, linha)
+            self._versao = versao
+
+
+def carregar_todos():
+    """Monta todas as estruturas registradas (na subida do app)"""
+    for indice in _registrados:
+        indice.carregar()
+
+
+def antes_da_escrita(tabela):
+    """Estado das estruturas de `tabela` antes de uma escrita"""
+    return {indice: indice.sincronizado() for indice in _registrados if tabela in indice.tabelas}
+
+
+def depois_da_escrita(estado, tabela, id, linha=None):
+    """Repassa uma escrita bem-sucedida às estruturas de `tabela` (linha None: remoção)"""
+    for indice, sincronizado in estado.items():
+        indice.escrita(sincronizado, tabela, id, linha)
@@ -0,0 +1,191 @@
+import os
+import json
+import base64
+import binascii
+from datetime import date
+
+# Paginação por chave (keyset): em vez de OFFSET, cada página continua a
+# partir da última linha vista, comparando (chave, id). Com um índice na
+# chave de ordenação, a página 1000 custa o mesmo que a primeira.
+
+PAGE_SIZE = int(os.getenv('PAGE_SIZE', 20))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 100))
+
+
+class Page:
+    """Uma página de resultados e os cursores para as páginas vizinhas"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def page_size(limite=None):
+    """Tamanho de página pedido, limitado a MAX_PAGE_SIZE"""
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        return PAGE_SIZE
+    return max(1, min(limite, MAX_PAGE_SIZE))
+
+
+def encode_cursor(valor, id):
+    """Codifica (valor da chave, id) num token seguro para URLs"""
+    if isinstance(valor, date):
+        valor = valor.isoformat()
+    token = json.dumps([valor, id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(token).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, parse=None):
+    """
+    Decodifica um cursor gerado por encode_cursor. Devolve (valor, id) ou
+    None se o cursor estiver vazio ou inválido
+    """
+    if not cursor:
+        return None
+    try:
+        token = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valor, id = json.loads(token)
+        if parse is not None:
+            valor = parse(valor)
+        return valor, int(id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+class Keyset:
+    """
+    Monta as queries de uma listagem paginada por (coluna, id).
+
+    `descendente` define a ordem da listagem. As páginas seguintes buscam
+    as linhas depois do cursor; as anteriores buscam na ordem inversa e
+    invertem o resultado.
+    """
+
+    def __init__(self, tabela, coluna, descendente=False, parse=None):
+        self.tabela = tabela
+        self.coluna = coluna
+        self.descendente = descendente
+        self.parse = parse
+
+    def query(self, where=None, params=(), depois=None, antes=None, limite=None, colunas='*'):
+        """
+        Devolve (query, params, contexto) da página pedida. `colunas` deve
+        incluir a coluna de ordenação e o id, usados nos cursores
+        """
+        limite = page_size(limite)
+        depois = decode_cursor(depois, self.parse)
+        antes = decode_cursor(antes, self.parse) if depois is None else None
+
+        # Voltando uma página, percorre a ordem ao contrário a partir do cursor
+        reverso = antes is not None
+        desc = self.descendente != reverso
+        cursor = antes if reverso else depois
+
+        condicoes = [where] if where else []
+        params = list(params)
+        if cursor is not None:
+            op = '<' if desc else '>'
+            # O primeiro termo é redundante, mas delimita a faixa no índice
+            condicoes.append(f"{self.coluna} {op}= %s AND ({self.coluna} {op} %s OR id {op} %s)")
+            params.extend([cursor[0], cursor[0], cursor[1]])
+
+        direcao = 'DESC' if desc else 'ASC'
+        query = f"SELECT {colunas} FROM {self.tabela}"
+        if condicoes:
+            query += " WHERE " + " AND ".join(f"({c})" for c in condicoes)
+        query += f" ORDER BY {self.coluna} {direcao}, id {direcao} LIMIT %s"
+        # Uma linha a mais indica se existe outra página nessa direção
+        params.append(limite + 1)
+        return query, tuple(params), (limite, reverso, cursor is not None)
+
+    def page(self, resultados, contexto, criar):
+        """Converte as linhas da query em Page, com os cursores vizinhos"""
+        limite, reverso, tem_cursor = contexto
+        linhas = list(resultados or [])
+        tem_mais = len(linhas) > limite
+        linhas = linhas[:limite]
+        if reverso:
+            linhas.reverse()
+
+        items = [criar(r) for r in linhas]
+        if not items:
+            return Page(items)
+
+        primeiro = encode_cursor(linhas[0][self.coluna], linhas[0]['id'])
+        ultimo = encode_cursor(linhas[-1][self.coluna], linhas[-1]['id'])
+        if reverso:
+            return Page(items, next_cursor=ultimo, prev_cursor=primeiro if tem_mais else None)
+        return Page(items, next_cursor=ultimo if tem_mais else None,
+                    prev_cursor=primeiro if tem_cursor else None)
+
+
+def rank_page(ids, depois=None, antes=None, limite=None, carregar=None):
+    """
+    Página de uma lista de ids já ordenada fora do banco (por exemplo, por
+    relevância na busca). Os cursores são (posição, id); se a lista mudar e
+    o id não estiver mais na posição, ele é procurado na lista nova.
+    `carregar(ids)` devolve os itens da página na mesma ordem.
+    """
+    limite = page_size(limite)
+
+    def _posicao(cursor):
+        cursor = decode_cursor(cursor)
+        if cursor is None:
+            return None
+        posicao, id = cursor
+        if isinstance(posicao, int) and 0 <= posicao < len(ids) and ids[posicao] == id:
+            return posicao
+        try:
+            return ids.index(id)
+        except ValueError:
+            return None
+
+    depois = _posicao(depois)
+    antes = _posicao(antes) if depois is None else None
+    if depois is not None:
+        inicio, fim = depois + 1, depois + 1 + limite
+    elif antes is not None:
+        inicio, fim = max(0, antes - limite), antes
+    else:
+        inicio, fim = 0, limite
+    fatia = ids[inicio:fim]
+    if not fatia:
+        return Page([])
+
+    fim = inicio + len(fatia)
+    return Page(carregar(fatia),
+                next_cursor=encode_cursor(fim - 1, fatia[-1]) if fim < len(ids) else None,
+                prev_cursor=encode_cursor(inicio, fatia[0]) if inicio > 0 else None)
+
+
+def index_page(buscar, depois=None, antes=None, limite=None, carregar=None, cursor=None, parse=None):
+    """
+    Página de uma listagem ordenada fora do banco (índices em memória), com
+    os mesmos cursores (valor, id) do Keyset. `buscar(depois, antes, limite)`
+    recebe os cursores decodificados e devolve (ids, há mais nessa direção);
+    `carregar(ids)` devolve os itens na mesma ordem e `cursor(item)`, o
+    (valor, id) de cada item.
+    """
+    limite = page_size(limite)
+    depois = decode_cursor(depois, parse)
+    antes = decode_cursor(antes, parse) if depois is None else None
+    ids, tem_mais = buscar(depois, antes, limite)
+    items = carregar(ids)
+    if not items:
+        return Page(items)
+
+    primeiro = encode_cursor(*cursor(items[0]))
+    ultimo = encode_cursor(*cursor(items[-1]))
+    if antes is not None:
+        return Page(items, next_cursor=ultimo, prev_cursor=primeiro if tem_mais else None)
+    return Page(items, next_cursor=ultimo if tem_mais else None,
+                prev_cursor=primeiro if depois is not None else None)
@@ -0,0 +1,165 @@
+import heapq
+from array import array
+from bisect import bisect_left
+from models.search_index import STOPWORDS, _TOKEN, normalizar
+
+# Índice de prefixos para autocompletar. Cada sugestão (tipo, texto) entra
+# num array ordenado de chaves normalizadas, uma por início de palavra:
+# "Festival de São Luís" pode ser encontrado por "fes", "sao" ou "lu". Os
+# candidatos de um prefixo são um trecho contíguo do array (bisect), e uma
+# árvore de segmentos com o mais popular de cada faixa devolve os k mais
+# populares do trecho sem percorrê-lo: O(k log n).
+#
+# A popularidade de uma sugestão é o número de documentos (linhas) que a
+# contêm. Como no IntervalIndex, alterações não reorganizam o array: as
+# sugestões alteradas ficam numa lista à parte, percorrida nas consultas, e
+# o array é remontado quando elas passam de uma fração do total.
+
+# Remonta quando as alteradas passam de max(REBUILD_MIN, n * REBUILD_RATIO)
+REBUILD_MIN = 64
+REBUILD_RATIO = 0.01
+
+# Inícios de palavra indexados por sugestão (nomes longos não multiplicam chaves)
+MAX_PALAVRAS = 6
+
+
+def chave(texto):
+    """Texto normalizado para comparação de prefixos: 'São  Luís!' -> 'sao luis'"""
+    return ' '.join(_TOKEN.findall(normalizar(str(texto))))
+
+
+def _chaves(texto):
+    palavras = chave(texto).split()
+    inicios = [i for i, palavra in enumerate(palavras) if i == 0 or palavra not in STOPWORDS]
+    return [' '.join(palavras[i:]) for i in inicios[:MAX_PALAVRAS]]
+
+
+class PrefixIndex:
+    """
+    Sugestões (tipo, texto) vindas de documentos identificados por id;
+    cada documento contribui com um conjunto de sugestões.
+    """
+
+    def __init__(self, documentos=()):
+        self._documentos = {}     # id -> sugestões do documento
+        self._contagem = {}       # sugestão -> documentos que a contêm
+        for id, sugestoes in documentos:
+            self._incluir(id, sugestoes)
+        self._rebuild()
+
+    def _incluir(self, id, sugestoes):
+        sugestoes = tuple(dict.fromkeys(s for s in sugestoes if s[1]))
+        self._documentos[id] = sugestoes
+        for sugestao in sugestoes:
+            self._contagem[sugestao] = self._contagem.get(sugestao, 0) + 1
+        return sugestoes
+
+    def _retirar(self, id):
+        sugestoes = self._documentos.pop(id, ())
+        for sugestao in sugestoes:
+            restantes = self._contagem[sugestao] - 1
+            if restantes:
+                self._contagem[sugestao] = restantes
+            else:
+                del self._contagem[sugestao]
+        return sugestoes
+
+    def _rebuild(self):
+        entradas = sorted((c, sugestao) for sugestao in self._contagem for c in _chaves(sugestao[1]))
+        self._chaves = [c for c, _ in entradas]
+        self._sugestoes = [s for _, s in entradas]
+        self._populares = array('I', (self._contagem[s] for s in self._sugestoes))
+        self._arvore = self._montar_arvore()
+        # sugestão alterada desde a montagem -> suas chaves
+        self._alteradas = {}
+
+    def _montar_arvore(self):
+        """Árvore de segmentos: arvore[i] é a posição mais popular da faixa do nó i"""
+        n = len(self._chaves)
+        arvore = array('i', [0] * n) + array('i', range(n))
+        for i in range(n - 1, 0, -1):
+            arvore[i] = self._melhor(arvore[2 * i], arvore[2 * i + 1])
+        return arvore
+
+    def _melhor(self, a, b):
+        # Mais popular; no empate, a de chave menor (ordem alfabética)
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        pa, pb = self._populares[a], self._populares[b]
+        return a if pa > pb or (pa == pb and a < b) else b
+
+    def _mais_popular(self, inicio, fim):
+        """Posição mais popular em [inicio, fim)"""
+        n = len(self._chaves)
+        melhor = -1
+        inicio += n
+        fim += n
+        while inicio < fim:
+            if inicio & 1:
+                melhor = self._melhor(melhor, self._arvore[inicio])
+                inicio += 1
+            if fim & 1:
+                fim -= 1
+                melhor = self._melhor(melhor, self._arvore[fim])
+            inicio >>= 1
+            fim >>= 1
+        return melhor
+
+    def __len__(self):
+        return len(self._contagem)
+
+    def add(self, id, sugestoes):
+        """Inclui (ou substitui) as sugestões do documento `id`"""
+        antigas = self._retirar(id)
+        novas = self._incluir(id, sugestoes)
+        if antigas != novas:
+            self._alterar(set(antigas) ^ set(novas))
+
+    def remove(self, id):
+        self._alterar(self._retirar(id))
+
+    def _alterar(self, sugestoes):
+        for sugestao in sugestoes:
+            if sugestao not in self._alteradas:
+                self._alteradas[sugestao] = _chaves(sugestao[1])
+        if len(self._alteradas) > max(REBUILD_MIN, len(self._chaves) * REBUILD_RATIO):
+            self._rebuild()
+
+    def complete(self, prefixo, limite=10):
+        """[(sugestão, popularidade)] com alguma palavra começando por `prefixo`"""
+        prefixo = chave(prefixo)
+        if not prefixo or limite <= 0:
+            return []
+        inicio = bisect_left(self._chaves, prefixo)
+        # Primeira chave depois de todas as que começam com o prefixo
+        fim = bisect_left(self._chaves, prefixo[:-1] + chr(ord(prefixo[-1]) + 1), inicio)
+
+        encontradas = {}
+        faixas = []
+
+        def _empilhar(i, f):
+            if i < f:
+                m = self._mais_popular(i, f)
+                heapq.heappush(faixas, (-self._populares[m], m, i, f))
+
+        _empilhar(inicio, fim)
+        while faixas and len(encontradas) < limite:
+            _, m, i, f = heapq.heappop(faixas)
+            sugestao = self._sugestoes[m]
+            if sugestao not in self._alteradas and sugestao not in encontradas:
+                encontradas[sugestao] = (self._populares[m], self._chaves[m])
+            _empilhar(i, m)
+            _empilhar(m + 1, f)
+
+        for sugestao, chaves in self._alteradas.items():
+            total = self._contagem.get(sugestao)
+            if total:
+                # A menor chave com o prefixo, como a árvore escolheria no empate
+                c = min((c for c in chaves if c.startswith(prefixo)), default=None)
+                if c is not None:
+                    encontradas[sugestao] = (total, c)
+
+        ordenadas = sorted(encontradas.items(), key=lambda i: (-i[1][0], i[1][1]))
+        return [(sugestao, total) for sugestao, (total, _) in ordenadas[:limite]]
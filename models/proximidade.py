@@ -0,0 +1,83 @@
+from config.database import iter_query
+from models.memory_index import MemoryIndex
+from models.spatial_index import GridIndex
+
+# Restaurantes e eventos com coordenadas num índice espacial em memória
+# (models/spatial_index.py), para responder "o que há a até 1 km daqui"
+# com os nossos dados, sem consultar serviços externos.
+
+PROXIMIDADE_LIMITE = 50
+
+# tabela -> (categoria do ponto, campo do nome, campos que podem ser filtrados)
+CAMPOS = {
+    'restaurantes': ('restaurante', 'nome_restaurante', ('tipo_culinaria', 'faixa_preco', 'bairro')),
+    'eventos': ('evento', 'nome_evento', ('tipo', 'local')),
+}
+CATEGORIAS = {categoria: tabela for tabela, (categoria, _, _) in CAMPOS.items()}
+
+
+def _dados(tabela, id, linha):
+    categoria, campo_nome, campos = CAMPOS[tabela]
+    dados = {campo: linha.get(campo) for campo in campos}
+    dados.update(id=id, categoria=categoria, nome=linha.get(campo_nome))
+    return dados
+
+
+class Proximidade:
+    @staticmethod
+    def proximos(latitude, longitude, raio, categoria=None, limite=PROXIMIDADE_LIMITE, **filtros):
+        """
+        Restaurantes e eventos a até `raio` metros do ponto, do mais perto
+        para o mais longe. `categoria` ('restaurante' ou 'evento') restringe
+        os pontos e `filtros` (campo=valor, por exemplo
+        tipo_culinaria='Maranhense') os campos de CAMPOS.
+        """
+        if categoria is not None and categoria not in CATEGORIAS:
+            raise ValueError(f"Categoria desconhecida: {categoria}")
+        permitidos = {campo for tabela, (c, _, campos) in CAMPOS.items()
+                      if categoria in (None, c) for campo in campos}
+        desconhecidos = set(filtros) - permitidos
+        if desconhecidos:
+            raise TypeError(f"Filtros desconhecidos: {', '.join(sorted(desconhecidos))}")
+        filtros = {campo: valor for campo, valor in filtros.items() if valor not in (None, '')}
+
+        def filtro(dados):
+            return ((categoria is None or dados['categoria'] == categoria)
+                    and all(dados.get(campo) == valor for campo, valor in filtros.items()))
+
+        with INDICE.usar() as indice:
+            encontrados = indice.raio(latitude, longitude, raio, filtro if categoria or filtros else None, limite)
+            encontrados = [(distancia, indice.posicao(chave), dados) for distancia, chave, dados in encontrados]
+        return [dict(dados, latitude=lat, longitude=lon, distancia=round(distancia, 1))
+                for distancia, (lat, lon), dados in encontrados]
+
+
+# ===== Índice em memória (models/memory_index.py) =====
+
+def _construir():
+    pontos = (
+        ((tabela, r['id']), r['latitude'], r['longitude'], _dados(tabela, r['id'], r))
+        for tabela, (_, campo_nome, campos) in CAMPOS.items()
+        for r in iter_query(f"SELECT id, latitude, longitude, {campo_nome}, {', '.join(campos)} "
+                            f"FROM {tabela} WHERE latitude IS NOT NULL AND longitude IS NOT NULL")
+    )
+    return GridIndex(pontos)
+
+
+def _aplicar(indice, tabela, id, linha):
+    chave = (tabela, id)
+    if linha is None:
+        indice.remove(chave)
+        return
+    # Escritas sem as coordenadas (formulários) mantêm a posição atual
+    if 'latitude' in linha or 'longitude' in linha:
+        posicao = (linha.get('latitude'), linha.get('longitude'))
+    else:
+        posicao = indice.posicao(chave)
+    if posicao is None or None in posicao or '' in posicao:
+        indice.remove(chave)
+    else:
+        indice.add(chave, posicao[0], posicao[1], _dados(tabela, id, linha))
+
+
+INDICE = MemoryIndex('proximidade', tuple(CAMPOS), _construir, _aplicar)
@@ -1,4 +1,46 @@
-from config.database import execute_query, execute_query_one
+from config.database import execute_query, execute_query_one, execute_transaction, iter_query
+from config.async_database import execute_query_async
+from config.cache import cached, invalidate
+from models.estatistica import Estatistica
+from models.coordenadas import Coordenadas, coordenadas_preservadas, endereco
+from models.entidades import Entidades
+from models.memory_index import MemoryIndex, antes_da_escrita, depois_da_escrita
+from models.facet_index import FacetIndex
+from models.pagination import Keyset, index_page, rank_page
+from models.search_index import SearchIndex, normalizar
+
+# Tamanho do resumo da descrição nos cards; um caractere a mais permite ao
+# template saber se precisa mostrar as reticências
+DESCRICAO_RESUMO = 100
+
+# Colunas usadas pelos cards das listagens. A descrição vem cortada no
+# próprio banco; versao (migração v006) é a chave do card no cache de
+# fragmentos.
+CARD_COLUMNS = ('id', 'nome_restaurante', 'tipo_culinaria', 'descricao', 'endereco', 'bairro',
+                'telefone', 'horario_funcionamento', 'faixa_preco', 'url_imagem', 'aceita_reservas',
+                'tem_delivery', 'tem_estacionamento', 'versao')
+CARD_SELECT = ", ".join(
+    f"SUBSTR(descricao, 1, {DESCRICAO_RESUMO + 1}) AS descricao" if c == 'descricao' else c
+    for c in CARD_COLUMNS
+)
+
+# Ids por query ao buscar os cards encontrados nos índices em memória
+IN_CHUNK_SIZE = 500
+
+# Campos indexados pela busca e o peso de cada um no ranking
+BUSCA_PESOS = {'nome_restaurante': 3, 'tipo_culinaria': 2, 'bairro': 2, 'descricao': 1, 'endereco': 1}
+# Tipos de nome (models/entidades.py) que corrigem uma busca sem resultado
+BUSCA_CORRECAO = ('restaurante', 'bairro', 'culinaria')
+
+# Facetas dos filtros da listagem: nome -> valor da faceta numa linha
+CAMPOS_FACETAS = {
+    'tipo_culinaria': lambda r: r.get('tipo_culinaria'),
+    'faixa_preco': lambda r: r.get('faixa_preco'),
+    'bairro': lambda r: r.get('bairro'),
+    'tem_delivery': lambda r: bool(r.get('tem_delivery')),
+    'aceita_reservas': lambda r: bool(r.get('aceita_reservas')),
+    'tem_estacionamento': lambda r: bool(r.get('tem_estacionamento')),
+}
 
 class Restaurante:
     def __init__(self, **kwargs):
@@ -18,20 +60,88 @@ class Restaurante:
         self.tem_estacionamento = kwargs.get('tem_estacionamento', False)
         self.data_criacao = kwargs.get('data_criacao')
         self.data_atualizacao = kwargs.get('data_atualizacao')
+        self.latitude = kwargs.get('latitude')
+        self.longitude = kwargs.get('longitude')
+        self.versao = kwargs.get('versao')
 
 
 
     @staticmethod
+    @cached('restaurantes')
     def get_all():
         """Retorna todos os restaurantes como objetos"""
         query = "SELECT * FROM restaurantes ORDER BY nome_restaurante ASC"
         resultados = execute_query(query)
         return [Restaurante(**r) for r in resultados]  # Transformação em objetos
 
+    @staticmethod
+    def iter_all(chunk_size=None):
+        """Gera todos os restaurantes um a um, sem carregar a tabela inteira na memória"""
+        query = "SELECT * FROM restaurantes ORDER BY nome_restaurante ASC"
+        for r in iter_query(query, chunk_size=chunk_size):
+            yield Restaurante(**r)
+
+    @staticmethod
+    @cached('restaurantes')
+    def paginate(depois=None, antes=None, limite=None, busca=None, **filtros):
+        """
+        Uma página de cards de restaurantes em ordem alfabética. `filtros`
+        são facetas de CAMPOS_FACETAS -> valor ou tupla de valores aceitos
+        (tipo_culinaria=('Italiana', 'Japonesa'), tem_delivery=True...).
+        Com `busca`, os resultados vêm por relevância.
+        """
+        selecao = Restaurante._selecao(filtros)
+        if busca:
+            ids = Restaurante._ids_busca(busca)
+            if selecao:
+                with FACETAS.usar() as indice:
+                    ids = indice.restringir(ids, indice.filtro(selecao))
+            return rank_page(ids, depois, antes, limite, Restaurante.get_cards)
+        if selecao:
+            def _buscar(depois, antes, limite):
+                with FACETAS.usar() as indice:
+                    return indice.pagina(indice.filtro(selecao), depois=_ordem(depois),
+                                         antes=_ordem(antes), limite=limite)
+            return index_page(_buscar, depois, antes, limite, Restaurante.get_cards,
+                              lambda card: (card.nome_restaurante, card.id))
+        query, params, contexto = KEYSET.query(depois=depois, antes=antes, limite=limite,
+                                               colunas=CARD_SELECT)
+        return KEYSET.page(execute_query(query, params), contexto, lambda r: RestauranteCard(**r))
+
+    @staticmethod
+    @cached('restaurantes')
+    def facetas(busca=None, **filtros):
+        """
+        Quantidade de restaurantes por valor de cada faceta, com os filtros
+        (e a busca) atuais: {faceta: {valor: quantidade}}
+        """
+        selecao = Restaurante._selecao(filtros)
+        base = None
+        if busca:
+            ids = Restaurante._ids_busca(busca)
+        with FACETAS.usar() as indice:
+            if busca:
+                base = indice.bitmap(ids)
+            return indice.contagens(selecao, base)
+
+    @staticmethod
+    def _selecao(filtros):
+        """Filtros da listagem -> {faceta: valores aceitos}, sem os vazios"""
+        selecao = {}
+        for faceta, valores in filtros.items():
+            if faceta not in CAMPOS_FACETAS:
+                raise TypeError(f"Filtro desconhecido: {faceta}")
+            if not isinstance(valores, (tuple, list, set, frozenset)):
+                valores = (valores,)
+            valores = tuple(v for v in valores if v not in (None, '', 'Todas'))
+            if valores:
+                selecao[faceta] = valores
+        return selecao
+
     @staticmethod
     def get_by_id(restaurante_id):
         query = "SELECT * FROM restaurantes WHERE id = %s"
-        resultado = execute_query_one(query, (restaurante_id,))
+        resultado = execute_query_one(query, (restaurante_id,), prepared=True)
         return Restaurante(**resultado) if resultado else None
 
     @staticmethod
@@ -53,20 +163,41 @@ class Restaurante:
             restaurante_data.get('tem_delivery', False),
             restaurante_data.get('tem_estacionamento', False)
         )
-        return execute_query(query, params)
+
+        novo = []
+
+        # O restaurante e o contador do dashboard são gravados juntos
+        def _operacao(tx):
+            resultado = tx.execute(query, params)
+            novo.append(tx.lastrowid)
+            Estatistica.restaurante_criado(tx)
+            Estatistica.tabela_alterada(tx, 'restaurantes')
+            return resultado
+
+        estado = antes_da_escrita('restaurantes')
+        resultado = execute_transaction(_operacao)
+        invalidate('restaurantes')
+        if resultado:
+            depois_da_escrita(estado, 'restaurantes', novo[0], restaurante_data)
+            Coordenadas.agendar('restaurantes', novo[0])
+        return resultado
 
     @staticmethod
     def update(restaurante_id, restaurante_data):
-        query = """
-        UPDATE restaurantes SET nome_restaurante = %s, tipo_culinaria = %s, 
+        # As coordenadas só continuam valendo se o endereço não mudou
+        query = f"""
+        UPDATE restaurantes SET {coordenadas_preservadas('restaurantes')}
+                              nome_restaurante = %s, tipo_culinaria = %s, 
                               descricao = %s, endereco = %s, bairro = %s, 
                               telefone = %s, horario_funcionamento = %s, 
                               faixa_preco = %s, capacidade = %s, url_imagem = %s, 
                               aceita_reservas = %s, tem_delivery = %s, 
-                              tem_estacionamento = %s
+                              tem_estacionamento = %s, versao = versao + 1
         WHERE id = %s
         """
+        novo_endereco = endereco('restaurantes', restaurante_data)
         params = (
+            novo_endereco, novo_endereco,
             restaurante_data['nome_restaurante'], restaurante_data['tipo_culinaria'],
             restaurante_data['descricao'], restaurante_data['endereco'],
             restaurante_data['bairro'], restaurante_data['telefone'],
@@ -77,25 +208,87 @@ class Restaurante:
             restaurante_data.get('tem_estacionamento', False),
             restaurante_id
         )
-        return execute_query(query, params)
+
+        # A alteração e a versão da tabela são gravadas juntas
+        def _operacao(tx):
+            resultado = tx.execute(query, params)
+            Estatistica.tabela_alterada(tx, 'restaurantes')
+            return resultado
+
+        estado = antes_da_escrita('restaurantes')
+        resultado = execute_transaction(_operacao)
+        invalidate('restaurantes')
+        if resultado:
+            # Relida: é o UPDATE que decide se as coordenadas continuam valendo
+            linha = execute_query_one("SELECT * FROM restaurantes WHERE id = %s", (restaurante_id,)) or restaurante_data
+            depois_da_escrita(estado, 'restaurantes', restaurante_id, linha)
+            Coordenadas.agendar('restaurantes', restaurante_id)
+        return resultado
 
     @staticmethod
     def delete(restaurante_id):
         query = "DELETE FROM restaurantes WHERE id = %s"
-        return execute_query(query, (restaurante_id,))
+
+        def _operacao(tx):
+            resultado = tx.execute(query, (restaurante_id,))
+            if resultado:
+                Estatistica.restaurante_removido(tx)
+            Estatistica.tabela_alterada(tx, 'restaurantes')
+            return resultado
+
+        estado = antes_da_escrita('restaurantes')
+        resultado = execute_transaction(_operacao)
+        invalidate('restaurantes')
+        if resultado:
+            depois_da_escrita(estado, 'restaurantes', restaurante_id)
+        return resultado
 
     @staticmethod
-    def search(termo_busca):
-        query = """
-        SELECT * FROM restaurantes 
-        WHERE nome_restaurante LIKE %s OR descricao LIKE %s OR bairro LIKE %s OR endereco LIKE %s
-        ORDER BY nome_restaurante ASC
+    @cached('restaurantes')
+    def search(termo_busca, limite=None):
+        """Busca restaurantes por termo (sem acentos, pelo radical), do mais relevante ao menos"""
+        ids = Restaurante._ids_busca(termo_busca, limite)
+        return Restaurante._por_ids(ids, "*", Restaurante)
+
+    @staticmethod
+    def _ids_busca(termo, limite=None):
         """
-        termo = f"%{termo_busca}%"
-        resultados = execute_query(query, (termo, termo, termo, termo))
-        return [Restaurante(**r) for r in resultados]
+        Ids encontrados pela busca, do mais relevante ao menos. Sem nenhum
+        resultado, busca pelos nomes citados ou parecidos com o termo
+        (erros de digitação: "teatro artur azevdo").
+        """
+        with BUSCA.usar() as indice:
+            ids = indice.search(termo, limite)
+        if ids:
+            return ids
+        nomes = (Entidades.mencionadas(termo, tipos=BUSCA_CORRECAO)
+                 or Entidades.parecidas(termo, tipos=BUSCA_CORRECAO))
+        encontrados = {}
+        with BUSCA.usar() as indice:
+            for nome in nomes:
+                encontrados.update(dict.fromkeys(indice.search(nome['texto'])))
+        ids = list(encontrados)
+        return ids[:limite] if limite else ids
 
     @staticmethod
+    def get_cards(ids):
+        """Cards dos restaurantes com os ids dados, na mesma ordem"""
+        return Restaurante._por_ids(ids, CARD_SELECT, RestauranteCard)
+
+    @staticmethod
+    def _por_ids(ids, colunas, classe):
+        encontrados = {}
+        for i in range(0, len(ids), IN_CHUNK_SIZE):
+            bloco = ids[i:i + IN_CHUNK_SIZE]
+            marcadores = ", ".join(["%s"] * len(bloco))
+            query = f"SELECT {colunas} FROM restaurantes WHERE id IN ({marcadores})"
+            for r in execute_query(query, tuple(bloco)) or []:
+                encontrados[r['id']] = classe(**r)
+        # Um restaurante removido por outro processo depois da montagem do índice fica de fora
+        return [encontrados[id] for id in ids if id in encontrados]
+
+    @staticmethod
+    @cached('restaurantes')
     def filter_by_culinaria(tipo_culinaria):
         if tipo_culinaria == "Todas":
             return Restaurante.get_all()
@@ -104,6 +297,7 @@ class Restaurante:
         return [Restaurante(**r) for r in resultados]
 
     @staticmethod
+    @cached('restaurantes')
     def filter_by_preco(faixa_preco):
         if faixa_preco == "Todas":
             return Restaurante.get_all()
@@ -112,7 +306,85 @@ class Restaurante:
         return [Restaurante(**r) for r in resultados]
 
     @staticmethod
+    @cached('restaurantes')
     def get_count():
         query = "SELECT COUNT(*) as total FROM restaurantes"
         result = execute_query_one(query)
         return result['total'] if result else 0
+
+    # ===== Versões assíncronas (para consultas em paralelo com asyncio.gather) =====
+
+    @staticmethod
+    @cached('restaurantes')
+    async def get_all_async():
+        """Versão assíncrona de get_all"""
+        query = "SELECT * FROM restaurantes ORDER BY nome_restaurante ASC"
+        resultados = await execute_query_async(query)
+        return [Restaurante(**r) for r in resultados] if resultados else []
+
+    @staticmethod
+    @cached('restaurantes')
+    async def paginate_async(depois=None, antes=None, limite=None):
+        """Versão assíncrona de paginate (sem filtros)"""
+        query, params, contexto = KEYSET.query(depois=depois, antes=antes, limite=limite,
+                                               colunas=CARD_SELECT)
+        return KEYSET.page(await execute_query_async(query, params), contexto,
+                           lambda r: RestauranteCard(**r))
+
+
+class RestauranteCard:
+    """Versão compacta de Restaurante, com apenas os campos exibidos nos cards"""
+    __slots__ = CARD_COLUMNS
+
+    def __init__(self, **kwargs):
+        for campo in CARD_COLUMNS:
+            setattr(self, campo, kwargs.get(campo))
+
+
+# Listagem paginada por (nome_restaurante, id), em ordem alfabética
+KEYSET = Keyset('restaurantes', 'nome_restaurante')
+
+
+def _ordem(cursor):
+    """Chave de ordenação nas facetas de um cursor (nome_restaurante, id)"""
+    if cursor is None:
+        return None
+    nome, id = cursor
+    return normalizar(nome or ''), id
+
+
+# ===== Índices em memória (models/memory_index.py) =====
+
+def _construir_busca():
+    query = f"SELECT id, {', '.join(BUSCA_PESOS)} FROM restaurantes"
+    return SearchIndex(BUSCA_PESOS, ((r['id'], r) for r in iter_query(query)))
+
+
+def _aplicar_busca(indice, tabela, id, linha):
+    if linha is None:
+        indice.remove(id)
+    else:
+        indice.add(id, linha)
+
+
+def _facetas(linha):
+    return {faceta: valor(linha) for faceta, valor in CAMPOS_FACETAS.items()}
+
+
+def _construir_facetas():
+    query = f"SELECT id, nome_restaurante, {', '.join(CAMPOS_FACETAS)} FROM restaurantes"
+    return FacetIndex((r['id'], _ordem((r['nome_restaurante'], r['id'])), _facetas(r))
+                      for r in iter_query(query))
+
+
+def _aplicar_facetas(indice, tabela, id, linha):
+    if linha is None:
+        indice.remove(id)
+    else:
+        indice.add(id, _ordem((linha.get('nome_restaurante'), id)), _facetas(linha))
+
+
+# Busca textual em nome, culinária, bairro, descrição e endereço
+BUSCA = MemoryIndex('busca_restaurantes', ('restaurantes',), _construir_busca, _aplicar_busca)
+# Bitmaps das facetas dos filtros da listagem
+FACETAS = MemoryIndex('facetas_restaurantes', ('restaurantes',), _construir_facetas, _aplicar_facetas)
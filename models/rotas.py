@@ -0,0 +1,157 @@
+import os
+import time
+import numpy as np
+from models.distancias import vizinho_mais_proximo
+
+# Ordem de visita de um itinerário: o caminho mais curto que passa por
+# todos os pontos de uma matriz de distâncias (models/distancias.py),
+# começando num ponto fixo e, opcionalmente, terminando noutro.
+#
+# - Até ROTA_EXATA_MAX pontos: programação dinâmica de Held-Karp, que dá a
+#   ordem ótima (O(2^n * n^2), vetorizada por tamanho de subconjunto).
+# - Acima disso: parte do vizinho mais próximo e melhora com 2-opt
+#   (inverte um trecho) e Or-opt (move um trecho de 1 a 3 pontos para
+#   outro lugar, na mesma ordem ou invertido) até não achar melhora ou
+#   estourar ROTA_ORCAMENTO_SEGUNDOS.
+#
+# Sem ponto final, o caminho termina num ponto "fantasma" a distância zero
+# de todos: assim os dois casos são o mesmo problema com as pontas fixas.
+
+ROTA_EXATA_MAX = int(os.getenv('ROTA_EXATA_MAX', 12))
+ROTA_ORCAMENTO_SEGUNDOS = float(os.getenv('ROTA_ORCAMENTO_SEGUNDOS', 0.2))
+# Trechos movidos pelo Or-opt
+OR_OPT_TRECHOS = (1, 2, 3)
+# Melhoras menores que isso (m) são ignoradas, para não ciclar por arredondamento
+EPSILON = 1e-6
+
+
+def otimizar_rota(distancias_rota, inicio=0, fim=None, orcamento=ROTA_ORCAMENTO_SEGUNDOS):
+    """
+    Ordem de visita (índices da matriz) começando em `inicio` e, se `fim`
+    for dado, terminando nele. `orcamento` limita (em segundos) a busca
+    local usada nos conjuntos maiores que ROTA_EXATA_MAX.
+    """
+    distancias_rota = np.asarray(distancias_rota, dtype=np.float64)
+    n = len(distancias_rota)
+    if not 0 <= inicio < n or (fim is not None and not 0 <= fim < n):
+        raise ValueError("Ponto inicial ou final fora da matriz")
+    if fim == inicio and n > 1:
+        raise ValueError("Ponto inicial e final devem ser diferentes")
+    if n <= 2:
+        return [inicio] + [i for i in range(n) if i != inicio]
+
+    if fim is None:
+        fantasma = n
+        matriz = np.zeros((n + 1, n + 1))
+        matriz[:n, :n] = distancias_rota
+    else:
+        fantasma = None
+        matriz = distancias_rota
+    ultimo = fantasma if fim is None else fim
+
+    if n <= ROTA_EXATA_MAX:
+        ordem = _held_karp(matriz, inicio, ultimo)
+    else:
+        ordem = _busca_local(matriz, _inicial(matriz, inicio, ultimo), time.monotonic() + orcamento)
+    return [i for i in ordem if i != fantasma]
+
+
+def _inicial(matriz, inicio, ultimo):
+    """Vizinho mais próximo a partir de `inicio`, com `ultimo` no fim"""
+    restantes = [i for i in range(len(matriz)) if i != ultimo]
+    sub = matriz[np.ix_(restantes, restantes)]
+    ordem = [restantes[i] for i in vizinho_mais_proximo(sub, restantes.index(inicio))]
+    return np.array(ordem + [ultimo])
+
+
+# ===== Held-Karp =====
+
+def _held_karp(matriz, inicio, ultimo):
+    nos = [i for i in range(len(matriz)) if i not in (inicio, ultimo)]
+    m = len(nos)
+    entre = matriz[np.ix_(nos, nos)]
+    # custo[conjunto, j]: menor caminho que sai de `inicio`, passa pelos nós
+    # do conjunto (bits) e termina em nos[j]; anterior[conjunto, j] é o nó antes dele
+    custo = np.full((1 << m, m), np.inf)
+    anterior = np.full((1 << m, m), -1, dtype=np.int16)
+    for j in range(m):
+        custo[1 << j, j] = matriz[inicio, nos[j]]
+    conjuntos = np.arange(1 << m)
+    tamanhos = np.array([bin(c).count('1') for c in range(1 << m)])
+    for tamanho in range(2, m + 1):
+        camada = conjuntos[tamanhos == tamanho]
+        for j in range(m):
+            com_j = camada[(camada >> j) & 1 == 1]
+            sem_j = com_j ^ (1 << j)
+            candidatos = custo[sem_j] + entre[:, j]
+            melhor = np.argmin(candidatos, axis=1)
+            custo[com_j, j] = candidatos[np.arange(len(com_j)), melhor]
+            anterior[com_j, j] = melhor
+
+    todos = (1 << m) - 1
+    j = int(np.argmin(custo[todos] + matriz[nos, ultimo]))
+    caminho = []
+    conjunto = todos
+    while j >= 0:
+        caminho.append(nos[j])
+        conjunto, j = conjunto ^ (1 << j), int(anterior[conjunto, j])
+    return [inicio] + caminho[::-1] + [ultimo]
+
+
+# ===== Busca local (2-opt e Or-opt) =====
+
+def _busca_local(matriz, rota, prazo):
+    melhorou = True
+    while melhorou and time.monotonic() < prazo:
+        melhorou = _dois_opt(matriz, rota, prazo)
+        melhorou = _or_opt(matriz, rota, prazo) or melhorou
+    return [int(i) for i in rota]
+
+
+def _dois_opt(matriz, rota, prazo):
+    """Inverte rota[i..j] quando encurta o caminho (as pontas ficam fixas)"""
+    melhorou = False
+    n = len(rota)
+    for i in range(1, n - 2):
+        if time.monotonic() >= prazo:
+            break
+        a, b = rota[i - 1], rota[i]
+        c, seguinte = rota[i + 1:n - 1], rota[i + 2:n]
+        ganho = matriz[a, c] + matriz[b, seguinte] - matriz[a, b] - matriz[c, seguinte]
+        k = int(np.argmin(ganho))
+        if ganho[k] < -EPSILON:
+            j = i + 1 + k
+            rota[i:j + 1] = rota[i:j + 1][::-1].copy()
+            melhorou = True
+    return melhorou
+
+
+def _or_opt(matriz, rota, prazo):
+    """Move rota[i..i+k-1] para entre outros dois pontos, na mesma ordem ou invertido"""
+    melhorou = False
+    for k in OR_OPT_TRECHOS:
+        i = 1
+        while i + k <= len(rota) - 1:
+            if time.monotonic() >= prazo:
+                return melhorou
+            antes, primeiro, ultimo, depois = rota[i - 1], rota[i], rota[i + k - 1], rota[i + k]
+            retirada = matriz[antes, primeiro] + matriz[ultimo, depois] - matriz[antes, depois]
+            # Arestas (t, t + 1) do caminho sem o trecho
+            resto = np.concatenate([rota[:i], rota[i + k:]])
+            x, y = resto[:-1], resto[1:]
+            base = matriz[x, y]
+            direto = matriz[x, primeiro] + matriz[ultimo, y] - base
+            invertido = matriz[x, ultimo] + matriz[primeiro, y] - base
+            # Voltar para onde estava não conta
+            direto[i - 1] = invertido[i - 1] = np.inf
+            t_direto, t_invertido = int(np.argmin(direto)), int(np.argmin(invertido))
+            if direto[t_direto] <= invertido[t_invertido]:
+                t, insercao, trecho = t_direto, direto[t_direto], rota[i:i + k]
+            else:
+                t, insercao, trecho = t_invertido, invertido[t_invertido], rota[i:i + k][::-1]
+            if insercao - retirada < -EPSILON:
+                rota[:] = np.concatenate([resto[:t + 1], trecho, resto[t + 1:]])
+                melhorou = True
+            else:
+                i += 1
+    return melhorou
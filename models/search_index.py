@@ -0,0 +1,218 @@
+import re
+import math
+import heapq
+from bisect import bisect_left
+import unicodedata
+from array import array
+from functools import lru_cache
+
+# Busca textual em memória: índice invertido com ranking BM25. Os textos são
+# normalizados (minúsculas, sem acentos) e reduzidos a radicais por um
+# stemmer leve de português, então "São Luís" encontra "sao luis" e
+# "restaurantes maranhenses" encontra "restaurante maranhense".
+#
+# As listas de ocorrências são arrays compactos só de inclusão. Uma
+# alteração marca a versão anterior do documento como removida e inclui a
+# nova; o índice é recompactado quando as removidas passam de uma fração do
+# total (como no IntervalIndex).
+
+# Parâmetros do BM25
+K1 = 1.2
+B = 0.75
+
+# Recompacta quando as removidas passam de max(REBUILD_MIN, n * REBUILD_RATIO)
+REBUILD_MIN = 256
+REBUILD_RATIO = 0.2
+
+STOPWORDS = frozenset("""
+a ao aos as ate com como da das de do dos e em entre essa esse esta este
+ha isso la mais mas na nas no nos o os ou para pela pelas pelo pelos por
+que se sem sob sobre sua suas seu seus um uma umas uns
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Plurais, do sufixo mais longo para o mais curto (sobre o texto já sem acentos)
+_PLURAIS = (
+    ('oes', 'ao'), ('aes', 'ao'), ('ais', 'al'), ('eis', 'el'), ('ois', 'ol'),
+    ('res', 'r'), ('zes', 'z'), ('ns', 'm'),
+)
+# Diminutivos e advérbios (depois do plural)
+_SUFIXOS = ('zinho', 'zinha', 'inho', 'inha', 'mente')
+
+
+def normalizar(texto):
+    """Minúsculas e sem acentos: 'São Luís' -> 'sao luis'"""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    # Os acentos viram caracteres combinantes, descartados na conversão
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+
+
+# O vocabulário é pequeno perto do número de palavras indexadas
+@lru_cache(maxsize=65536)
+def radical(palavra):
+    """
+    Stemmer leve, nos moldes das etapas do RSLP: plural, diminutivo/-mente
+    e vogal final (gênero). Palavras curtas e números ficam como estão.
+    """
+    if len(palavra) <= 3 or palavra.isdigit():
+        return palavra
+    for sufixo, troca in _PLURAIS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 2:
+            palavra = palavra[:-len(sufixo)] + troca
+            break
+    else:
+        if palavra.endswith('s') and not palavra.endswith(('ss', 'us', 'is')):
+            palavra = palavra[:-1]
+    for sufixo in _SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= 3:
+            palavra = palavra[:-len(sufixo)]
+            break
+    # italiano/italiana, canto/cantinho
+    if len(palavra) > 3 and palavra[-1] in 'aeo':
+        palavra = palavra[:-1]
+    return palavra
+
+
+def tokenizar(texto):
+    """Radicais das palavras do texto, sem stopwords"""
+    if not texto:
+        return []
+    return [radical(t) for t in _TOKEN.findall(normalizar(str(texto))) if t not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    Índice invertido de documentos identificados por id. Cada documento é
+    um dict campo -> texto; `pesos` multiplica a frequência dos termos de
+    cada campo (o nome conta mais que a descrição).
+    """
+
+    def __init__(self, pesos, documentos=()):
+        self.pesos = pesos
+        self._carregar(documentos)
+
+    def _carregar(self, documentos):
+        self._postings = {}       # termo -> (array de docs, array de frequências)
+        self._ids = []            # doc interno -> id
+        self._tamanhos = array('f')
+        self._doc = {}            # id -> doc interno
+        self._removidos = set()
+        self._total_tamanho = 0.0
+        for id, campos in documentos:
+            self._incluir(id, campos)
+
+    def _termos(self, campos):
+        frequencias = {}
+        for campo, peso in self.pesos.items():
+            for termo in tokenizar(campos.get(campo)):
+                frequencias[termo] = frequencias.get(termo, 0) + peso
+        return frequencias
+
+    def _incluir(self, id, campos):
+        doc = len(self._ids)
+        frequencias = self._termos(campos)
+        for termo, freq in frequencias.items():
+            posting = self._postings.get(termo)
+            if posting is None:
+                posting = self._postings[termo] = (array('I'), array('f'))
+            posting[0].append(doc)
+            posting[1].append(freq)
+        tamanho = sum(frequencias.values())
+        self._ids.append(id)
+        self._tamanhos.append(tamanho)
+        self._total_tamanho += tamanho
+        self._doc[id] = doc
+
+    def __len__(self):
+        return len(self._doc)
+
+    def add(self, id, campos):
+        """Inclui (ou substitui) o documento `id`"""
+        self.remove(id)
+        self._incluir(id, campos)
+
+    def remove(self, id):
+        doc = self._doc.pop(id, None)
+        if doc is None:
+            return
+        self._removidos.add(doc)
+        self._total_tamanho -= self._tamanhos[doc]
+        if len(self._removidos) > max(REBUILD_MIN, len(self._doc) * REBUILD_RATIO):
+            self._recompactar()
+
+    def _recompactar(self):
+        """Remonta as listas sem os documentos removidos"""
+        vivos = {}
+        for termo, (docs, freqs) in self._postings.items():
+            for doc, freq in zip(docs, freqs):
+                if doc not in self._removidos:
+                    vivos.setdefault(doc, {})[termo] = freq
+        antigos_ids, antigos_tamanhos = self._ids, self._tamanhos
+        self._postings, self._ids, self._tamanhos = {}, [], array('f')
+        self._removidos = set()
+        self._total_tamanho = 0.0
+        for doc in sorted(vivos):
+            novo = len(self._ids)
+            for termo, freq in vivos[doc].items():
+                posting = self._postings.get(termo)
+                if posting is None:
+                    posting = self._postings[termo] = (array('I'), array('f'))
+                posting[0].append(novo)
+                posting[1].append(freq)
+            self._ids.append(antigos_ids[doc])
+            self._tamanhos.append(antigos_tamanhos[doc])
+            self._total_tamanho += antigos_tamanhos[doc]
+            self._doc[antigos_ids[doc]] = novo
+
+    def search(self, consulta, limite=None):
+        """
+        Ids dos documentos que têm todos os termos da consulta, do mais para
+        o menos relevante (BM25). Sem termos válidos, devolve lista vazia.
+        """
+        termos = list(dict.fromkeys(tokenizar(consulta)))
+        if not termos or not self._doc:
+            return []
+        postings = [self._postings.get(t) for t in termos]
+        if any(p is None for p in postings):
+            return []
+
+        total = len(self._doc)
+        media = self._total_tamanho / total if total else 1.0
+        # Do termo mais raro para o mais comum: os candidatos só diminuem
+        postings.sort(key=lambda p: len(p[0]))
+        # norma do documento = K1 * (1 - B + B * tamanho / media)
+        fixo, proporcional = K1 * (1 - B), K1 * B / media
+        tamanhos = self._tamanhos
+        pontos = None
+        for docs, freqs in postings:
+            df = len(docs)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5)) * (K1 + 1)
+            if pontos is None:
+                pontos = {doc: idf * freq / (freq + fixo + proporcional * tamanhos[doc])
+                          for doc, freq in zip(docs, freqs)}
+            elif len(pontos) * math.log2(df) < df:
+                # Poucos candidatos numa lista longa: busca binária (as
+                # listas estão em ordem de doc interno)
+                novos = {}
+                for doc, anterior in pontos.items():
+                    i = bisect_left(docs, doc)
+                    if i < df and docs[i] == doc:
+                        freq = freqs[i]
+                        novos[doc] = anterior + idf * freq / (freq + fixo + proporcional * tamanhos[doc])
+                pontos = novos
+            else:
+                pontos = {doc: pontos[doc] + idf * freq / (freq + fixo + proporcional * tamanhos[doc])
+                          for doc, freq in zip(docs, freqs) if doc in pontos}
+            if not pontos:
+                return []
+
+        if self._removidos:
+            pontos = {doc: p for doc, p in pontos.items() if doc not in self._removidos}
+        if limite is None:
+            ordenados = sorted(pontos.items(), key=lambda i: (-i[1], i[0]))
+        else:
+            ordenados = heapq.nsmallest(limite, pontos.items(), key=lambda i: (-i[1], i[0]))
+        return [self._ids[doc] for doc, _ in ordenados]
@@ -0,0 +1,140 @@
+import math
+import heapq
+
+# Pontos (latitude, longitude) numa grade de células de CELULA_GRAUS graus,
+# como buckets de geohash: cada célula guarda os pontos que caem nela. Uma
+# busca por raio só olha as células que cobrem o quadrado em volta do
+# círculo, descarta pelo quadrado (em graus) e calcula a distância exata
+# (haversine) só para o que sobra. Com pontos espalhados pela cidade, um
+# raio de 1 km confere algumas centenas de pontos, não a tabela inteira.
+# Com um limite (os N mais próximos), as células são visitadas em anéis a
+# partir do ponto e a busca para assim que nenhum anel mais distante pode
+# ter pontos mais perto que os já encontrados.
+
+# ~110 m no equador. Células pequenas deixam a busca pelos N mais próximos
+# parar cedo; um raio de 1 km sem limite percorre umas 19x19 células.
+CELULA_GRAUS = 0.001
+RAIO_TERRA_METROS = 6371008.8
+METROS_POR_GRAU = math.pi * RAIO_TERRA_METROS / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distância em metros entre dois pontos (em graus) sobre a esfera"""
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((fi2 - fi1) / 2) ** 2
+         + math.cos(fi1) * math.cos(fi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * RAIO_TERRA_METROS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _celula(lat, lon):
+    return math.floor(lat / CELULA_GRAUS), math.floor(lon / CELULA_GRAUS)
+
+
+class GridIndex:
+    """Pontos identificados por chave, cada um com um dict de dados"""
+
+    def __init__(self, pontos=()):
+        self._pontos = {}     # chave -> (lat, lon, dados)
+        self._celulas = {}    # (i, j) -> [(lat, lon, chave, lat em radianos, cosseno da lat)]
+        for chave, lat, lon, dados in pontos:
+            self.add(chave, lat, lon, dados)
+
+    def __len__(self):
+        return len(self._pontos)
+
+    def posicao(self, chave):
+        """(lat, lon) do ponto, ou None"""
+        ponto = self._pontos.get(chave)
+        return ponto[:2] if ponto else None
+
+    def add(self, chave, lat, lon, dados):
+        """Inclui (ou move) o ponto `chave`"""
+        self.remove(chave)
+        lat, lon = float(lat), float(lon)
+        self._pontos[chave] = (lat, lon, dados)
+        # Radianos e cosseno guardados poupam contas no haversine de cada busca
+        fi = math.radians(lat)
+        self._celulas.setdefault(_celula(lat, lon), []).append((lat, lon, chave, fi, math.cos(fi)))
+
+    def remove(self, chave):
+        ponto = self._pontos.pop(chave, None)
+        if ponto is None:
+            return
+        celula = _celula(ponto[0], ponto[1])
+        pontos = self._celulas[celula]
+        pontos[:] = [p for p in pontos if p[2] != chave]
+        if not pontos:
+            del self._celulas[celula]
+
+    def raio(self, lat, lon, metros, filtro=None, limite=None):
+        """
+        [(distância, chave, dados)] dos pontos a até `metros` de (lat, lon),
+        do mais perto para o mais longe. `filtro(dados)` descarta pontos e
+        `limite` fica só com os mais próximos.
+        """
+        dlat = metros / METROS_POR_GRAU
+        # Um grau de longitude encolhe com o cosseno da latitude
+        cosseno = math.cos(math.radians(min(abs(lat) + dlat, 89.9)))
+        dlon = min(dlat / cosseno, 180)
+        i0, j0 = _celula(lat - dlat, lon - dlon)
+        i1, j1 = _celula(lat + dlat, lon + dlon)
+        ci, cj = _celula(lat, lon)
+
+        encontrados = []
+        if limite is None:
+            # Com raio grande o quadrado tem mais células que a grade: percorre as existentes
+            if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self._celulas):
+                blocos = [pts for (i, j), pts in self._celulas.items() if i0 <= i <= i1 and j0 <= j <= j1]
+            else:
+                blocos = self._blocos(i0, i1, j0, j1)
+            self._conferir(blocos, lat, lon, metros, dlat, dlon, filtro, encontrados)
+        else:
+            # Anéis de células em volta da célula do ponto: os pontos do anel
+            # k + 1 estão a pelo menos k células de distância, então quando
+            # os `limite` mais próximos já estão mais perto que isso, para
+            celula_metros = CELULA_GRAUS * METROS_POR_GRAU * cosseno
+            for k in range(max(ci - i0, i1 - ci, cj - j0, j1 - cj) + 1):
+                anel = [(i, j) for i, j in _anel(ci, cj, k) if i0 <= i <= i1 and j0 <= j <= j1]
+                self._conferir(self._blocos_de(anel), lat, lon, metros, dlat, dlon, filtro, encontrados)
+                if len(encontrados) >= limite:
+                    encontrados = heapq.nsmallest(limite, encontrados, key=_ordem)
+                    if encontrados[-1][0] <= k * celula_metros:
+                        break
+        encontrados.sort(key=_ordem)
+        return encontrados[:limite] if limite is not None else encontrados
+
+    def _blocos(self, i0, i1, j0, j1):
+        return self._blocos_de((i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1))
+
+    def _blocos_de(self, celulas):
+        return [self._celulas[c] for c in celulas if c in self._celulas]
+
+    def _conferir(self, blocos, lat, lon, metros, dlat, dlon, filtro, encontrados):
+        """Acrescenta a `encontrados` os pontos dos blocos dentro do raio"""
+        fi, cosseno = math.radians(lat), math.cos(math.radians(lat))
+        sin, asin, sqrt, radianos = math.sin, math.asin, math.sqrt, math.radians
+        for pontos in blocos:
+            for plat, plon, chave, pfi, pcosseno in pontos:
+                if abs(plat - lat) > dlat or abs(plon - lon) > dlon:
+                    continue
+                # haversine() com os valores do ponto já calculados
+                a = sin((pfi - fi) / 2) ** 2 + cosseno * pcosseno * sin(radianos(plon - lon) / 2) ** 2
+                distancia = 2 * RAIO_TERRA_METROS * asin(min(1.0, sqrt(a)))
+                if distancia > metros:
+                    continue
+                dados = self._pontos[chave][2]
+                if filtro is None or filtro(dados):
+                    encontrados.append((distancia, chave, dados))
+
+
+def _ordem(encontrado):
+    return encontrado[0], encontrado[1]
+
+
+def _anel(ci, cj, k):
+    """Células a exatamente k células (em i ou j) de (ci, cj)"""
+    if k == 0:
+        return [(ci, cj)]
+    celulas = [(i, j) for i in (ci - k, ci + k) for j in range(cj - k, cj + k + 1)]
+    celulas += [(i, j) for j in (cj - k, cj + k) for i in range(ci - k + 1, ci + k)]
+    return celulas
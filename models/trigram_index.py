@@ -0,0 +1,252 @@
+import math
+import heapq
+from array import array
+from models.search_index import _TOKEN, normalizar
+
+# Busca tolerante a erros de digitação por trigramas, como no pg_trgm: cada
+# palavra, sem acentos e com espaços nas bordas, vira seus pedaços de três
+# letras ("jansen" -> "  j", " ja", "jan", "ans", "nse", "sen", "en ").
+# Nomes com muitos trigramas em comum são parecidos mesmo com uma letra
+# trocada, faltando ou sobrando ("Artur Azevdo" ~ "Arthur Azevedo").
+#
+# Duas consultas:
+#   similares(consulta)  similaridade de Jaccard entre consulta e nome (ou o
+#                        trecho do nome com o mesmo número de palavras que
+#                        mais se parece com ela, como o word_similarity do
+#                        pg_trgm), para sugestões enquanto o usuário digita
+#   contidos(texto)      nomes cujos trigramas estão quase todos no texto,
+#                        para achar lugares citados numa frase ou numa busca
+#
+# Nas duas, os candidatos vêm só de parte dos trigramas (filtragem por
+# prefixo): se um nome precisa ter pelo menos k dos seus m trigramas em
+# comum, basta procurar por m - k + 1 deles para não perder nenhum. Os
+# candidatos são então conferidos com os conjuntos completos.
+
+# Similaridade mínima padrão em similares() (a mesma do pg_trgm)
+LIMIAR = 0.3
+# Fração dos trigramas do nome que precisa estar no texto em contidos();
+# define as assinaturas montadas no índice, então é também o menor limiar aceito
+LIMIAR_CONTIDO = 0.7
+# Nomes com menos trigramas que isso não são procurados em textos (siglas,
+# palavras curtas aparecem por acaso)
+MIN_TRIGRAMAS_CONTIDO = 6
+
+# Remonta quando os nomes removidos passam de max(REBUILD_MIN, n * REBUILD_RATIO)
+REBUILD_MIN = 256
+REBUILD_RATIO = 0.2
+
+
+def _palavras(texto):
+    return _TOKEN.findall(normalizar(str(texto)))
+
+
+def _trigramas_palavra(palavra):
+    palavra = f"  {palavra} "
+    return {palavra[i:i + 3] for i in range(len(palavra) - 2)}
+
+
+def trigramas(texto):
+    """Conjunto de trigramas das palavras do texto, sem acentos"""
+    encontrados = set()
+    for palavra in _palavras(texto):
+        encontrados.update(_trigramas_palavra(palavra))
+    return encontrados
+
+
+def _minimo_contido(tamanho):
+    # A folga evita que 0.7 * 10 = 7.000000000000001 vire 8
+    return math.ceil(LIMIAR_CONTIDO * tamanho - 1e-9)
+
+
+class TrigramIndex:
+    """
+    Nomes (tipo, texto) vindos de documentos identificados por id, como no
+    PrefixIndex: cada documento contribui com um conjunto de nomes e um
+    nome fica no índice enquanto algum documento o tiver.
+    """
+
+    def __init__(self, documentos=()):
+        self._documentos = {}     # id -> nomes do documento
+        self._contagem = {}       # nome -> documentos que o contêm
+        for id, nomes in documentos:
+            self._incluir(id, nomes)
+        self._rebuild()
+
+    def _incluir(self, id, nomes):
+        nomes = tuple(dict.fromkeys(n for n in nomes if n[1]))
+        self._documentos[id] = nomes
+        novos = []
+        for nome in nomes:
+            total = self._contagem.get(nome, 0)
+            self._contagem[nome] = total + 1
+            if not total:
+                novos.append(nome)
+        return novos
+
+    def _retirar(self, id):
+        retirados = []
+        for nome in self._documentos.pop(id, ()):
+            restantes = self._contagem[nome] - 1
+            if restantes:
+                self._contagem[nome] = restantes
+            else:
+                del self._contagem[nome]
+                retirados.append(nome)
+        return retirados
+
+    def _rebuild(self):
+        self._nomes = []          # número -> nome
+        self._trigramas = []      # número -> array com os códigos dos trigramas
+        self._tamanhos = array('B')  # número -> quantidade de palavras (até 255)
+        self._codigos = {}        # trigrama -> código (int)
+        self._numero = {}         # nome -> número
+        self._removidos = set()
+        self._postings = []       # código -> array de números (todos os trigramas)
+        self._assinaturas = {}    # código -> array de números (assinaturas de contidos)
+        for nome in self._contagem:
+            self._acrescentar(nome, assinar=False)
+        # As assinaturas usam os trigramas mais raros de cada nome, o que
+        # mantém curtas as listas percorridas em contidos()
+        for numero, grams in enumerate(self._trigramas):
+            self._assinar(numero, grams)
+
+    def _acrescentar(self, nome, assinar=True):
+        numero = len(self._nomes)
+        grams = array('I', map(self._codigo, trigramas(nome[1])))
+        self._nomes.append(nome)
+        self._trigramas.append(grams)
+        self._tamanhos.append(min(len(_palavras(nome[1])), 255))
+        self._numero[nome] = numero
+        for g in grams:
+            self._postings[g].append(numero)
+        if assinar:
+            self._assinar(numero, grams)
+
+    def _codigo(self, trigrama):
+        # Códigos int ocupam bem menos que um conjunto de strings por nome
+        codigo = self._codigos.get(trigrama)
+        if codigo is None:
+            codigo = self._codigos[trigrama] = len(self._postings)
+            self._postings.append(array('I'))
+        return codigo
+
+    def _consulta(self, texto):
+        # Trigramas fora do índice não estão em nenhum nome
+        return {self._codigos[g] for g in trigramas(texto) if g in self._codigos}
+
+    def _assinar(self, numero, grams):
+        if len(grams) < MIN_TRIGRAMAS_CONTIDO:
+            return
+        raros = sorted(grams, key=lambda g: (len(self._postings[g]), g))
+        for g in raros[:len(grams) - _minimo_contido(len(grams)) + 1]:
+            posting = self._assinaturas.get(g)
+            if posting is None:
+                posting = self._assinaturas[g] = array('I')
+            posting.append(numero)
+
+    def __len__(self):
+        return len(self._contagem)
+
+    def add(self, id, nomes):
+        """Inclui (ou substitui) os nomes do documento `id`"""
+        retirados = self._retirar(id)
+        novos = self._incluir(id, nomes)
+        for nome in retirados:
+            if nome not in self._contagem:
+                self._removidos.add(self._numero.pop(nome))
+        for nome in novos:
+            if nome not in self._numero:
+                self._acrescentar(nome)
+        self._talvez_reconstruir()
+
+    def remove(self, id):
+        for nome in self._retirar(id):
+            self._removidos.add(self._numero.pop(nome))
+        self._talvez_reconstruir()
+
+    def _talvez_reconstruir(self):
+        if len(self._removidos) > max(REBUILD_MIN, len(self._nomes) * REBUILD_RATIO):
+            self._rebuild()
+
+    def similares(self, consulta, limite=10, limiar=LIMIAR, tipos=None):
+        """
+        [(nome, similaridade)] com similaridade >= limiar, da maior para a
+        menor. A similaridade é a maior entre a de Jaccard com o nome inteiro
+        e a com cada trecho de palavras seguidas do nome do tamanho da
+        consulta: "cantna" acha "Cantina Italiana" pela palavra "cantina".
+        """
+        tamanho = len(trigramas(consulta))
+        if not tamanho or limite <= 0:
+            return []
+        palavras = len(_palavras(consulta))
+        q = self._consulta(consulta)
+        # Jaccard >= limiar exige ao menos limiar * |q| trigramas em comum
+        minimo = max(1, math.ceil(limiar * tamanho - 1e-9))
+        if len(q) < minimo:
+            return []
+        raros = sorted(q, key=lambda g: len(self._postings[g]))
+        candidatos = set()
+        for g in raros[:len(q) - minimo + 1]:
+            candidatos.update(self._postings[g])
+
+        encontrados = []
+        for numero in candidatos:
+            grams = self._trigramas[numero]
+            # Um trecho do nome tem no máximo os trigramas do nome inteiro:
+            # com menos que `minimo` em comum, nem o nome nem um trecho chegam
+            if numero in self._removidos or len(grams) < minimo:
+                continue
+            nome = self._nomes[numero]
+            if tipos is not None and nome[0] not in tipos:
+                continue
+            comuns = len(q.intersection(grams))
+            if comuns < minimo:
+                continue
+            inteiro = comuns / (tamanho + len(grams) - comuns)
+            similaridade = inteiro
+            # Um trecho tem no máximo `comuns` trigramas em comum, então sua
+            # similaridade não passa de comuns / tamanho: só compara os trechos
+            # de nomes com mais palavras que a consulta quando isso supera o nome inteiro
+            if self._tamanhos[numero] > palavras and comuns / tamanho > inteiro:
+                similaridade = max(inteiro, self._similaridade_trechos(q, tamanho, palavras, nome[1]))
+            if similaridade >= limiar:
+                encontrados.append((nome, similaridade, inteiro))
+        # No empate, o nome mais parecido por inteiro vem antes ("Cantina" antes de "Cantina Italiana")
+        encontrados = heapq.nsmallest(limite, encontrados, key=lambda i: (-i[1], -i[2], i[0][1], i[0][0]))
+        return [(nome, similaridade) for nome, similaridade, _ in encontrados]
+
+    def _similaridade_trechos(self, q, tamanho, palavras, texto):
+        """Maior similaridade de Jaccard entre a consulta e os trechos de `palavras` palavras do texto"""
+        por_palavra = [{self._codigos[g] for g in _trigramas_palavra(p)} for p in _palavras(texto)]
+        melhor = 0.0
+        for inicio in range(len(por_palavra) - palavras + 1):
+            trecho = set().union(*por_palavra[inicio:inicio + palavras])
+            comuns = len(q.intersection(trecho))
+            melhor = max(melhor, comuns / (tamanho + len(trecho) - comuns))
+        return melhor
+
+    def contidos(self, texto, limite=10, limiar=LIMIAR_CONTIDO, tipos=None):
+        """
+        [(nome, fração)] dos nomes com ao menos `limiar` dos seus trigramas
+        no texto, dos mais completos (e, no empate, mais longos) para os demais
+        """
+        if limiar < LIMIAR_CONTIDO:
+            raise ValueError(f"limiar de contidos() deve ser >= {LIMIAR_CONTIDO}")
+        t = self._consulta(texto)
+        candidatos = set()
+        for g in t:
+            candidatos.update(self._assinaturas.get(g, ()))
+
+        encontrados = []
+        for numero in candidatos:
+            if numero in self._removidos:
+                continue
+            nome = self._nomes[numero]
+            if tipos is not None and nome[0] not in tipos:
+                continue
+            grams = self._trigramas[numero]
+            fracao = len(t.intersection(grams)) / len(grams)
+            if fracao >= limiar:
+                encontrados.append((nome, fracao, len(grams)))
+        encontrados = heapq.nsmallest(limite, encontrados, key=lambda i: (-i[1], -i[2], i[0][1], i[0][0]))
+        return [(nome, fracao) for nome, fracao, _ in encontrados]
@@ -0,0 +1,18 @@
+"""
+Recalcula os contadores do dashboard a partir das tabelas e corrige as
+diferenças (cargas feitas direto no banco, falhas no meio de uma escrita).
+Pode rodar periodicamente, por exemplo pelo cron:
+
+    python reconciliar_contadores.py
+"""
+import sys
+import logging
+from models.estatistica import Estatistica
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+divergencias = Estatistica.reconcile()
+if divergencias is None:
+    print("Falha ao reconciliar os contadores")
+    sys.exit(1)
+print(f"{len(divergencias)} contador(es) corrigido(s)" if divergencias else "Contadores em dia")
@@ -3,15 +3,17 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from flask import request, flash, redirect, url_for, render_template, current_app 
-from app import app, evento_controller, restaurante_controller, dashboard_controller, auth_controller, geochat_controller
+from app import app, evento_controller, restaurante_controller, dashboard_controller, auth_controller, geochat_controller, busca_controller
 from controllers.evento_controller import EventoController
 from controllers.geochat_controller import GeoChatController
+from config.page_cache import cached_page
 
 # Inicialização do controller do chatbot
 geochat_controller = GeoChatController()
 
 # ===== Rota Inicial (Visitante) =====
 @app.route('/')
+@cached_page('eventos', 'restaurantes')
 def visitante_home():
     return evento_controller.index_visitante()
 
@@ -55,9 +57,14 @@ def eventos():
     return evento_controller.index()  # ✅ Corrigido: chama o novo método index
 
 @app.route('/eventos/<int:evento_id>')
+@cached_page('eventos')
 def evento_show(evento_id):
     return evento_controller.show(evento_id)
 
+@app.route('/api/calendario')
+def evento_calendario():
+    return evento_controller.calendario()
+
 @app.route('/eventos/novo', methods=['GET'])
 def evento_create():
     return evento_controller.create()
@@ -84,6 +91,7 @@ def restaurantes():
     return restaurante_controller.index()
 
 @app.route('/restaurantes/<int:restaurante_id>')
+@cached_page('restaurantes')
 def restaurante_show(restaurante_id):
     return restaurante_controller.show(restaurante_id)
 
@@ -107,6 +115,16 @@ def restaurante_update(restaurante_id):
 def restaurante_delete(restaurante_id):
     return restaurante_controller.delete(restaurante_id)
 
+# ===== Rota do Autocompletar (caixa de busca) =====
+@app.route('/api/autocomplete')
+def autocomplete():
+    return busca_controller.autocomplete()
+
+# ===== Rota da Busca por Proximidade =====
+@app.route('/api/nearby')
+def nearby():
+    return busca_controller.proximos()
+
 # ===== Rotas do Chatbot =====
 @app.route('/chat')
 def chat_page():
@@ -0,0 +1,40 @@
+// Sugestões nas caixas de busca: campos com data-autocomplete="<url da API>"
+// recebem um <datalist> preenchido enquanto o usuário digita.
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-autocomplete]').forEach(function(input) {
+        const lista = document.createElement('datalist');
+        lista.id = input.id + '-sugestoes';
+        input.setAttribute('list', lista.id);
+        input.setAttribute('autocomplete', 'off');
+        input.after(lista);
+
+        let espera = null;
+        let pedido = null;
+
+        input.addEventListener('input', function() {
+            clearTimeout(espera);
+            const termo = input.value.trim();
+            if (!termo) {
+                lista.innerHTML = '';
+                return;
+            }
+            // Espera uma pausa na digitação e cancela o pedido anterior
+            espera = setTimeout(function() {
+                if (pedido) pedido.abort();
+                pedido = new AbortController();
+                fetch(`${input.dataset.autocomplete}?q=${encodeURIComponent(termo)}`, { signal: pedido.signal })
+                    .then(resposta => resposta.json())
+                    .then(function(sugestoes) {
+                        lista.innerHTML = '';
+                        sugestoes.forEach(function(sugestao) {
+                            const opcao = document.createElement('option');
+                            opcao.value = sugestao.texto;
+                            opcao.label = sugestao.tipo;
+                            lista.appendChild(opcao);
+                        });
+                    })
+                    .catch(() => {});
+            }, 150);
+        });
+    });
+});
@@ -0,0 +1,111 @@
+import random
+import pytest
+from models import facet_index
+from models.facet_index import FacetIndex
+
+FACETAS = {
+    'culinaria': ('Italiana', 'Maranhense', 'Japonesa', 'Árabe'),
+    'delivery': (True, False),
+    'faixa_preco': ('$', '$$', '$$$'),
+}
+SELECOES = (
+    {},
+    {'culinaria': ('Maranhense',)},
+    {'culinaria': ('Italiana', 'Japonesa'), 'delivery': (True,)},
+    {'delivery': (False,), 'faixa_preco': ('$', '$$$')},
+    {'culinaria': ('Inexistente',)},
+    {'faceta_nova': ('x',)},
+)
+
+
+def _documento(aleatorio, id):
+    valores = {faceta: aleatorio.choice(opcoes) for faceta, opcoes in FACETAS.items()}
+    # Alguns documentos sem faixa de preço
+    if aleatorio.random() < 0.1:
+        del valores['faixa_preco']
+    return id, (aleatorio.randrange(50), id), valores
+
+
+def _atende(valores, selecao, exceto=None):
+    return all(valores.get(faceta) in aceitos for faceta, aceitos in selecao.items() if faceta != exceto)
+
+
+def _contagens(documentos, selecao, base=None):
+    contagens = {}
+    for _, _, valores in documentos.values():
+        for faceta, valor in valores.items():
+            contagens.setdefault(faceta, {}).setdefault(valor, 0)
+    for id, (_, _, valores) in documentos.items():
+        for faceta, valor in valores.items():
+            if _atende(valores, selecao, exceto=faceta) and (base is None or id in base):
+                contagens[faceta][valor] += 1
+    return contagens
+
+
+def _confere(indice, documentos, limite):
+    for selecao in SELECOES:
+        esperados = sorted((ordem, id) for id, ordem, valores in documentos.values() if _atende(valores, selecao))
+        bits = indice.filtro(selecao)
+        assert indice.restringir(list(documentos), bits) == [id for id in documentos if id in {i for _, i in esperados}]
+        contagens = {faceta: por_valor for faceta, por_valor in indice.contagens(selecao).items() if por_valor}
+        assert contagens == _contagens(documentos, selecao)
+
+        # Indo para a frente a partir da chave do último, e voltando a partir da do primeiro
+        paginas, depois = [], None
+        while True:
+            ids, tem_mais = indice.pagina(bits, depois=depois, limite=limite)
+            paginas.append(ids)
+            inicio = len(paginas[:-1]) * limite
+            assert ids == [id for _, id in esperados[inicio:inicio + limite]]
+            assert tem_mais == (len(esperados) > inicio + limite)
+            if not tem_mais:
+                break
+            assert len(paginas) <= len(esperados)
+            depois = documentos[ids[-1]][1]
+        if esperados:
+            antes = documentos[paginas[-1][0]][1]
+            for anteriores in reversed(paginas[:-1]):
+                ids, tem_mais = indice.pagina(bits, antes=antes, limite=limite)
+                assert ids == anteriores
+                antes = documentos[ids[0]][1]
+            assert indice.pagina(bits, antes=antes, limite=limite) == ([], False)
+
+
+@pytest.mark.parametrize('limite', (1, 7, 500))
+def test_filtros_contagens_e_paginas_iguais_a_forca_bruta(limite):
+    aleatorio = random.Random(limite)
+    documentos = {id: _documento(aleatorio, id) for id in range(1, 301)}
+    indice = FacetIndex(documentos.values())
+    _confere(indice, documentos, limite)
+
+
+@pytest.mark.parametrize('rebuild_min', (10 ** 6, 20))
+def test_add_e_remove(monkeypatch, rebuild_min):
+    # Com REBUILD_MIN alto as inclusões ficam pendentes; baixo, tudo é renumerado
+    monkeypatch.setattr(facet_index, 'REBUILD_MIN', rebuild_min)
+    aleatorio = random.Random(rebuild_min)
+    documentos = {id: _documento(aleatorio, id) for id in range(1, 201)}
+    indice = FacetIndex(documentos.values())
+    for _ in range(120):
+        id = aleatorio.randrange(1, 260)
+        if aleatorio.random() < 0.35:
+            documentos.pop(id, None)
+            indice.remove(id)
+        else:
+            documentos[id] = _documento(aleatorio, id)
+            indice.add(*documentos[id])
+    assert len(indice) == len(documentos)
+    _confere(indice, documentos, 9)
+
+
+def test_contagens_com_base_de_uma_busca():
+    aleatorio = random.Random(3)
+    documentos = {id: _documento(aleatorio, id) for id in range(1, 101)}
+    indice = FacetIndex(documentos.values())
+    encontrados = aleatorio.sample(sorted(documentos), 30) + [999]
+    base = indice.bitmap(encontrados)
+    selecao = {'delivery': (True,)}
+    contagens = {faceta: por_valor for faceta, por_valor in indice.contagens(selecao, base).items() if por_valor}
+    assert contagens == _contagens(documentos, selecao, set(encontrados))
+    assert indice.restringir(encontrados, indice.filtro(selecao)) == [
+        id for id in encontrados if id in documentos and documentos[id][2]['delivery']]
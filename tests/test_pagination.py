@@ -0,0 +1,116 @@
+import random
+import sqlite3
+from datetime import date
+import pytest
+from models.pagination import Keyset, decode_cursor, encode_cursor, index_page, page_size, rank_page
+
+
+def _linhas(quantidade, semente):
+    aleatorio = random.Random(semente)
+    # Poucos valores distintos: muitos empates na chave, desfeitos pelo id
+    return [{'id': i, 'nome': aleatorio.choice('abcdefg'), 'nota': aleatorio.randint(0, 9)}
+            for i in range(1, quantidade + 1)]
+
+
+def _banco(linhas):
+    conexao = sqlite3.connect(':memory:')
+    conexao.row_factory = sqlite3.Row
+    conexao.execute("CREATE TABLE lugares (id INTEGER PRIMARY KEY, nome TEXT, nota INTEGER)")
+    conexao.executemany("INSERT INTO lugares VALUES (:id, :nome, :nota)", linhas)
+    return conexao
+
+
+def _pagina(conexao, keyset, **cursores):
+    query, params, contexto = keyset.query(**cursores)
+    resultados = [dict(r) for r in conexao.execute(query.replace('%s', '?'), params)]
+    return keyset.page(resultados, contexto, lambda r: r['id'])
+
+
+def _percorrer(pagina_de, limite, maximo=500):
+    """Ids de todas as páginas, indo até o fim e voltando até o começo"""
+    pagina = pagina_de(limite=limite)
+    paginas = [pagina.items]
+    assert pagina.prev_cursor is None
+    while pagina.next_cursor:
+        # Um cursor que não avança repetiria a mesma página para sempre
+        assert len(paginas) < maximo
+        pagina = pagina_de(depois=pagina.next_cursor, limite=limite)
+        paginas.append(pagina.items)
+    para_frente = [id for items in paginas for id in items]
+
+    voltando = [pagina.items]
+    while pagina.prev_cursor:
+        assert len(voltando) < maximo
+        pagina = pagina_de(antes=pagina.prev_cursor, limite=limite)
+        voltando.insert(0, pagina.items)
+    assert voltando == paginas
+    return para_frente
+
+
+@pytest.mark.parametrize('coluna, descendente', [('nome', False), ('nota', True)])
+@pytest.mark.parametrize('limite', (1, 7, 20, 200))
+def test_keyset_percorre_todas_as_linhas_sem_repetir(coluna, descendente, limite):
+    linhas = _linhas(83, semente=limite)
+    conexao = _banco(linhas)
+    keyset = Keyset('lugares', coluna, descendente=descendente)
+    esperado = [r['id'] for r in sorted(linhas, key=lambda r: (r[coluna], r['id']), reverse=descendente)]
+    assert _percorrer(lambda **cursores: _pagina(conexao, keyset, **cursores), limite) == esperado
+
+
+def test_keyset_com_filtro_e_tabela_vazia():
+    linhas = _linhas(40, semente=3)
+    conexao = _banco(linhas)
+    keyset = Keyset('lugares', 'nome')
+    pagina_de = lambda **cursores: _pagina(conexao, keyset, where='nota >= %s', params=(5,), **cursores)
+    esperado = [r['id'] for r in sorted(linhas, key=lambda r: (r['nome'], r['id'])) if r['nota'] >= 5]
+    assert _percorrer(pagina_de, 4) == esperado
+
+    pagina = _pagina(_banco([]), keyset)
+    assert pagina.items == [] and pagina.next_cursor is None and pagina.prev_cursor is None
+
+
+def test_cursor_ida_e_volta():
+    assert decode_cursor(encode_cursor('São Luís', 7)) == ('São Luís', 7)
+    assert decode_cursor(encode_cursor(date(2024, 6, 13), 3), date.fromisoformat) == (date(2024, 6, 13), 3)
+    for invalido in (None, '', '###', encode_cursor('a', 'b'), 'bm9wZQ'):
+        assert decode_cursor(invalido) is None
+
+
+def test_page_size_respeita_limites():
+    assert page_size('abc') == page_size(None)
+    assert page_size(0) == 1
+    assert page_size(10 ** 6) == page_size(10 ** 7)
+
+
+@pytest.mark.parametrize('limite', (1, 6, 50))
+def test_rank_page_percorre_a_lista(limite):
+    ids = random.Random(limite).sample(range(1000), 37)
+    pagina_de = lambda **cursores: rank_page(ids, carregar=list, **cursores)
+    assert _percorrer(pagina_de, limite) == ids
+
+
+def test_rank_page_acha_o_id_do_cursor_se_a_lista_mudar():
+    ids = list(range(10, 30))
+    pagina = rank_page(ids, limite=5, carregar=list)
+    assert pagina.items == [10, 11, 12, 13, 14]
+    # Dois itens novos no começo deslocam as posições
+    ids = [1, 2] + ids
+    assert rank_page(ids, depois=pagina.next_cursor, limite=5, carregar=list).items == [15, 16, 17, 18, 19]
+
+
+@pytest.mark.parametrize('limite', (1, 6, 50))
+def test_index_page_percorre_a_listagem(limite):
+    linhas = _linhas(45, semente=limite)
+    ordenadas = sorted(((r['nome'], r['id']) for r in linhas), reverse=True)
+
+    def _buscar(depois, antes, limite):
+        if antes is not None:
+            anteriores = [c for c in ordenadas if c > tuple(antes)]
+            return [id for _, id in anteriores[-limite:]], len(anteriores) > limite
+        seguintes = [c for c in ordenadas if depois is None or c < tuple(depois)]
+        return [id for _, id in seguintes[:limite]], len(seguintes) > limite
+
+    chaves = {id: nome for nome, id in ordenadas}
+    pagina_de = lambda **cursores: index_page(_buscar, carregar=list,
+                                              cursor=lambda id: (chaves[id], id), **cursores)
+    assert _percorrer(pagina_de, limite) == [id for _, id in ordenadas]
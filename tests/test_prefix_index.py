@@ -0,0 +1,85 @@
+import random
+import pytest
+from models import prefix_index
+from models.prefix_index import PrefixIndex, chave
+
+NOMES = ('Cantina Italiana', 'Cabana do Sol', 'Festival de São Luís', 'Feira da Praia Grande',
+         'Sabor Maranhense', 'Bar do Léo', 'São Francisco', 'Lagoa da Jansen', 'Calhau',
+         'Ponta da Areia', 'Centro Histórico', 'Festa do Divino', 'Cais da Sagração', 'Sol e Sabor')
+BAIRROS = ('Centro', 'Calhau', 'Ponta da Areia', 'São Francisco', 'Renascença', 'Cohama')
+PREFIXOS = ('c', 'ca', 'can', 'f', 'fes', 'sao', 'São', 'sao l', 'SÃO FRAN', 'lu', 'da', 'p', 'pra',
+            'ponta da a', 'r', 's', 'sa', 'x', 'cent', 'centro h')
+
+
+def _documento(aleatorio):
+    return [('restaurante', aleatorio.choice(NOMES)), ('bairro', aleatorio.choice(BAIRROS))]
+
+
+def _forca_bruta(documentos, prefixo, limite):
+    """Sugestões por contagem direta, filtrando palavra a palavra com startswith"""
+    prefixo = chave(prefixo)
+    contagem = {}
+    for sugestoes in documentos.values():
+        for sugestao in set(sugestoes):
+            contagem[sugestao] = contagem.get(sugestao, 0) + 1
+    encontradas = []
+    for (tipo, texto), total in contagem.items():
+        palavras = chave(texto).split()
+        chaves = [' '.join(palavras[i:]) for i in range(len(palavras))
+                  if i == 0 or palavras[i] not in prefix_index.STOPWORDS]
+        candidatas = [c for c in chaves if c.startswith(prefixo)]
+        if candidatas:
+            encontradas.append((-total, min(candidatas), (tipo, texto), total))
+    return [(sugestao, total) for _, _, sugestao, total in sorted(encontradas)[:limite]]
+
+
+@pytest.mark.parametrize('limite', (1, 3, 10, 100))
+def test_complete_igual_a_forca_bruta(limite):
+    aleatorio = random.Random(limite)
+    documentos = {id: _documento(aleatorio) for id in range(400)}
+    indice = PrefixIndex(documentos.items())
+    for prefixo in PREFIXOS:
+        assert indice.complete(prefixo, limite) == _forca_bruta(documentos, prefixo, limite)
+
+
+@pytest.mark.parametrize('rebuild_min', (10 ** 6, 5))
+def test_complete_depois_de_alteracoes(monkeypatch, rebuild_min):
+    # Com REBUILD_MIN alto as alteradas ficam na lista à parte; baixo, o array é remontado
+    monkeypatch.setattr(prefix_index, 'REBUILD_MIN', rebuild_min)
+    aleatorio = random.Random(rebuild_min)
+    documentos = {id: _documento(aleatorio) for id in range(300)}
+    indice = PrefixIndex(documentos.items())
+    for _ in range(150):
+        id = aleatorio.randrange(350)
+        if aleatorio.random() < 0.3:
+            documentos.pop(id, None)
+            indice.remove(id)
+        else:
+            documentos[id] = _documento(aleatorio)
+            indice.add(id, documentos[id])
+        prefixo = aleatorio.choice(PREFIXOS)
+        assert indice.complete(prefixo, 5) == _forca_bruta(documentos, prefixo, 5)
+    assert len(indice) == len({s for sugestoes in documentos.values() for s in sugestoes})
+
+
+def test_complete_some_com_a_sugestao_sem_documentos():
+    indice = PrefixIndex([(1, [('restaurante', 'Cantina Italiana')]), (2, [('restaurante', 'Cantina Italiana')]),
+                          (3, [('restaurante', 'Cabana do Sol')])])
+    assert indice.complete('ca') == [(('restaurante', 'Cantina Italiana'), 2), (('restaurante', 'Cabana do Sol'), 1)]
+    indice.remove(1)
+    indice.remove(2)
+    assert indice.complete('ita') == []
+    assert indice.complete('sol') == [(('restaurante', 'Cabana do Sol'), 1)]
+    assert indice.complete('') == indice.complete('do') == []
+
+
+@pytest.mark.parametrize('limite', (1, 4, 20))
+def test_complete_desempata_pela_ordem_alfabetica(limite):
+    # Todas com a mesma popularidade: o limite corta pela ordem das chaves
+    aleatorio = random.Random(limite)
+    silabas = ('ca', 'sa', 'ma', 'ra', 'lu', 'so', 'ba', 'ta')
+    nomes = {' '.join(''.join(aleatorio.choices(silabas, k=3)) for _ in range(2)) for _ in range(300)}
+    documentos = {id: [('restaurante', nome)] for id, nome in enumerate(sorted(nomes))}
+    indice = PrefixIndex(documentos.items())
+    for prefixo in ('c', 'ca', 'sa', 'mal', 'lub', 'z'):
+        assert indice.complete(prefixo, limite) == _forca_bruta(documentos, prefixo, limite)
@@ -0,0 +1,65 @@
+import random
+import time
+from itertools import permutations
+import pytest
+from models.distancias import comprimento, matriz
+from models.rotas import ROTA_EXATA_MAX, otimizar_rota
+
+# Retângulo aproximado da ilha de São Luís
+LATITUDES = (-2.62, -2.45)
+LONGITUDES = (-44.40, -44.18)
+
+
+def _distancias(quantidade, semente):
+    aleatorio = random.Random(semente)
+    return matriz([(aleatorio.uniform(*LATITUDES), aleatorio.uniform(*LONGITUDES)) for _ in range(quantidade)])
+
+
+def _menor_caminho(distancias_rota, inicio, fim):
+    """Comprimento do melhor caminho por força bruta"""
+    meio = [i for i in range(len(distancias_rota)) if i not in (inicio, fim)]
+    fim = [] if fim is None else [fim]
+    return min(comprimento(distancias_rota, [inicio, *ordem, *fim]) for ordem in permutations(meio))
+
+
+@pytest.mark.parametrize('quantidade', range(3, 8))
+@pytest.mark.parametrize('com_fim', (False, True))
+def test_otimizar_rota_e_otima_em_conjuntos_pequenos(quantidade, com_fim):
+    for semente in range(5):
+        distancias_rota = _distancias(quantidade, semente)
+        inicio = semente % quantidade
+        fim = (inicio + 1) % quantidade if com_fim else None
+        ordem = otimizar_rota(distancias_rota, inicio, fim)
+        assert comprimento(distancias_rota, ordem) == pytest.approx(_menor_caminho(distancias_rota, inicio, fim))
+
+
+@pytest.mark.parametrize('quantidade', (6, ROTA_EXATA_MAX + 8))
+def test_otimizar_rota_respeita_inicio_e_fim(quantidade):
+    distancias_rota = _distancias(quantidade, 1)
+    ordem = otimizar_rota(distancias_rota, inicio=2, fim=4)
+    assert ordem[0] == 2 and ordem[-1] == 4
+    assert sorted(ordem) == list(range(quantidade))
+
+    ordem = otimizar_rota(distancias_rota, inicio=3)
+    assert ordem[0] == 3
+    assert sorted(ordem) == list(range(quantidade))
+
+
+def test_otimizar_rota_grande_respeita_orcamento():
+    distancias_rota = _distancias(400, 2)
+    orcamento = 0.1
+    inicio = time.perf_counter()
+    ordem = otimizar_rota(distancias_rota, 0, 399, orcamento=orcamento)
+    decorrido = time.perf_counter() - inicio
+    assert ordem[0] == 0 and ordem[-1] == 399
+    assert sorted(ordem) == list(range(400))
+    # Folga para a solução inicial e para a última passada da busca local
+    assert decorrido < orcamento + 0.5
+
+
+def test_otimizar_rota_rejeita_pontas_invalidas():
+    distancias_rota = _distancias(5, 3)
+    with pytest.raises(ValueError):
+        otimizar_rota(distancias_rota, inicio=5)
+    with pytest.raises(ValueError):
+        otimizar_rota(distancias_rota, inicio=1, fim=1)
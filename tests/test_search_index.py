@@ -0,0 +1,129 @@
+import math
+import random
+import pytest
+from models import search_index
+from models.search_index import B, K1, SearchIndex, normalizar, radical, tokenizar
+
+PESOS = {'nome': 3, 'descricao': 1}
+
+PALAVRAS = ('restaurante restaurantes maranhense maranhenses comida típica praia praias '
+            'música músicas histórico centro pastéis pastel festa festas cantinho canto '
+            'limão limões sabor sabores jardim jardins bar mar azul').split()
+
+
+@pytest.mark.parametrize('palavras', [
+    ('restaurantes', 'restaurante', 'Restaurante'),
+    ('maranhenses', 'maranhense'),
+    ('italiano', 'italiana'),
+    ('pastéis', 'pastel', 'PASTEL'),
+    ('limões', 'limão', 'limao'),
+    ('flores', 'flor'),
+    ('jardins', 'jardim'),
+    ('cantinho', 'canto'),
+    ('rapidamente', 'rápido'),
+])
+def test_radical_junta_variacoes_da_mesma_palavra(palavras):
+    assert len({radical(normalizar(p)) for p in palavras}) == 1
+
+
+def test_radical_mantem_palavras_curtas_e_numeros():
+    assert [radical(p) for p in ('bar', 'sol', '2024', 'onibus')] == ['bar', 'sol', '2024', 'onibus']
+
+
+def test_tokenizar_ignora_acentos_e_stopwords():
+    assert tokenizar('São Luís') == tokenizar('sao luis') == ['sao', 'luis']
+    assert tokenizar('Restaurantes de comida maranhense') == tokenizar('restaurante comidas maranhenses')
+    assert tokenizar('de para com') == []
+    assert tokenizar(None) == []
+
+
+def _documentos(quantidade, semente):
+    aleatorio = random.Random(semente)
+    return [(i, {'nome': ' '.join(aleatorio.choices(PALAVRAS, k=aleatorio.randint(1, 3))),
+                 'descricao': ' '.join(aleatorio.choices(PALAVRAS, k=aleatorio.randint(0, 12)))})
+            for i in range(1, quantidade + 1)]
+
+
+def _bm25(documentos, consulta):
+    """Pontuação BM25 de cada documento com todos os termos, pela fórmula direta"""
+    frequencias = {}
+    for id, campos in documentos:
+        contagem = {}
+        for campo, peso in PESOS.items():
+            for termo in tokenizar(campos.get(campo)):
+                contagem[termo] = contagem.get(termo, 0) + peso
+        frequencias[id] = contagem
+    media = sum(sum(c.values()) for c in frequencias.values()) / len(frequencias)
+    termos = set(tokenizar(consulta))
+    pontos = {}
+    for id, contagem in frequencias.items():
+        if not termos <= contagem.keys():
+            continue
+        norma = K1 * (1 - B + B * sum(contagem.values()) / media)
+        total = 0.0
+        for termo in termos:
+            df = sum(1 for c in frequencias.values() if termo in c)
+            idf = math.log(1 + (len(frequencias) - df + 0.5) / (df + 0.5))
+            total += idf * contagem[termo] * (K1 + 1) / (contagem[termo] + norma)
+        pontos[id] = total
+    return pontos
+
+
+def _confere_ordem(resultado, pontos):
+    assert set(resultado) == set(pontos)
+    # Os tamanhos ficam em float32 no índice: empates podem sair em qualquer ordem
+    for anterior, seguinte in zip(resultado, resultado[1:]):
+        assert pontos[anterior] >= pontos[seguinte] - 1e-4
+
+
+CONSULTAS = ('restaurantes', 'praia', 'comida maranhense', 'Pastéis de limão', 'festa no centro histórico',
+             'música azul bar', 'jardim')
+
+
+@pytest.mark.parametrize('consulta', CONSULTAS)
+def test_search_ordena_como_bm25_direto(consulta):
+    documentos = _documentos(300, semente=len(consulta))
+    indice = SearchIndex(PESOS, documentos)
+    resultado = indice.search(consulta)
+    pontos = _bm25(documentos, consulta)
+    assert pontos
+    _confere_ordem(resultado, pontos)
+    assert resultado[:5] == indice.search(consulta, limite=5)
+
+
+def test_search_nome_pesa_mais_que_descricao():
+    indice = SearchIndex(PESOS, [(1, {'nome': 'Bar do Léo', 'descricao': 'petiscos e praia'}),
+                                 (2, {'nome': 'Praia Grande', 'descricao': 'bar e petiscos'})])
+    assert indice.search('praia') == [2, 1]
+    assert indice.search('bar') == [1, 2]
+    assert indice.search('praia bar') and indice.search('praia montanha') == []
+    assert indice.search('de e') == []
+
+
+def test_add_remove_e_recompactacao(monkeypatch):
+    # Recompacta logo para passar pelas duas formas de remoção
+    monkeypatch.setattr(search_index, 'REBUILD_MIN', 20)
+    documentos = dict(_documentos(200, semente=5))
+    indice = SearchIndex(PESOS, documentos.items())
+    aleatorio = random.Random(9)
+    novos = dict(_documentos(260, semente=11))
+    for id in aleatorio.sample(sorted(documentos), 80):
+        del documentos[id]
+        indice.remove(id)
+    for id in range(201, 261):
+        documentos[id] = novos[id]
+        indice.add(id, novos[id])
+    for id in aleatorio.sample(sorted(documentos), 30):
+        documentos[id] = novos[id]
+        indice.add(id, novos[id])
+    indice.remove(10 ** 6)
+
+    assert len(indice) == len(documentos)
+    for consulta in CONSULTAS:
+        resultado = indice.search(consulta)
+        assert set(resultado) == set(_bm25(documentos.items(), consulta))
+
+    # Remontado do zero, o índice dá a mesma ordem que o BM25 direto
+    indice._recompactar()
+    for consulta in CONSULTAS:
+        _confere_ordem(indice.search(consulta), _bm25(documentos.items(), consulta))
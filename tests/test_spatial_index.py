@@ -0,0 +1,56 @@
+import random
+import pytest
+from models.spatial_index import GridIndex, haversine
+
+
+def _pontos(quantidade, lat, lon, espalhamento, semente):
+    aleatorio = random.Random(semente)
+    return [(i, lat + aleatorio.uniform(-espalhamento, espalhamento),
+             lon + aleatorio.uniform(-espalhamento, espalhamento), {'par': i % 2 == 0})
+            for i in range(quantidade)]
+
+
+def _forca_bruta(pontos, lat, lon, metros, filtro=None, limite=None):
+    encontrados = sorted((haversine(lat, lon, plat, plon), chave)
+                         for chave, plat, plon, dados in pontos
+                         if haversine(lat, lon, plat, plon) <= metros and (filtro is None or filtro(dados)))
+    return encontrados[:limite] if limite is not None else encontrados
+
+
+def _confere(encontrados, esperado):
+    assert [chave for _, chave, _ in encontrados] == [chave for _, chave in esperado]
+    assert [distancia for distancia, _, _ in encontrados] == pytest.approx([distancia for distancia, _ in esperado])
+
+
+# São Luís (perto do equador) e uma latitude alta, onde um grau de longitude é metade do de latitude
+@pytest.mark.parametrize('lat, lon', [(-2.53, -44.30), (60.17, 24.94)])
+@pytest.mark.parametrize('limite', (1, 5, 50))
+def test_raio_com_limite_igual_a_forca_bruta(lat, lon, limite):
+    pontos = _pontos(3000, lat, lon, 0.05, semente=limite)
+    indice = GridIndex(pontos)
+    aleatorio = random.Random(limite)
+    for _ in range(30):
+        centro = (lat + aleatorio.uniform(-0.06, 0.06), lon + aleatorio.uniform(-0.06, 0.06))
+        metros = aleatorio.choice((300, 1500, 8000))
+        _confere(indice.raio(*centro, metros, limite=limite), _forca_bruta(pontos, *centro, metros, limite=limite))
+
+
+@pytest.mark.parametrize('lat, lon', [(-2.53, -44.30), (60.17, 24.94)])
+def test_raio_sem_limite_e_com_filtro_igual_a_forca_bruta(lat, lon):
+    pontos = _pontos(2000, lat, lon, 0.03, semente=7)
+    indice = GridIndex(pontos)
+    filtro = lambda dados: dados['par']
+    for metros in (200, 1000, 5000):
+        _confere(indice.raio(lat, lon, metros), _forca_bruta(pontos, lat, lon, metros))
+        _confere(indice.raio(lat, lon, metros, filtro=filtro, limite=10),
+                 _forca_bruta(pontos, lat, lon, metros, filtro=filtro, limite=10))
+
+
+def test_add_move_e_remove_pontos():
+    indice = GridIndex([(1, -2.53, -44.30, {}), (2, -2.54, -44.30, {})])
+    indice.add(1, -2.60, -44.20, {})
+    indice.remove(2)
+    assert len(indice) == 1
+    assert indice.posicao(1) == (-2.60, -44.20)
+    assert indice.raio(-2.53, -44.30, 2000) == []
+    assert [chave for _, chave, _ in indice.raio(-2.60, -44.20, 10, limite=3)] == [1]
@@ -0,0 +1,25 @@
+from models.trigram_index import TrigramIndex
+
+
+def _indice(*textos):
+    return TrigramIndex((i, [('restaurante', texto)]) for i, texto in enumerate(textos))
+
+
+def test_similares_acha_nome_de_varias_palavras_por_uma_delas():
+    indice = _indice('Cantina Italiana', 'Cabana do Sol', 'Maranhense')
+    nomes = [nome for (_, nome), _ in indice.similares('cantna')]
+    assert nomes == ['Cantina Italiana']
+
+
+def test_similares_compara_trecho_do_mesmo_tamanho_da_consulta():
+    indice = _indice('Teatro Arthur Azevedo', 'Lagoa da Jansen')
+    (nome, similaridade), = indice.similares('teatro artur')
+    assert nome == ('restaurante', 'Teatro Arthur Azevedo')
+    # Com o nome inteiro seria 0.48: o trecho "Teatro Arthur" pesa mais
+    assert similaridade > 0.6
+
+
+def test_similares_prefere_nome_inteiro_no_empate():
+    indice = _indice('Cantina Italiana', 'Cantina')
+    nomes = [nome for (_, nome), _ in indice.similares('cantna')]
+    assert nomes == ['Cantina', 'Cantina Italiana']
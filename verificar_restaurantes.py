@@ -2,6 +2,6 @@ from app import app
 from models.restaurante import Restaurante
 
 with app.app_context():
-    restaurantes = Restaurante.query.all()
-    for r in restaurantes:
-        print(f"{r.id} - {r.nome} - {r.endereco}")
+    # Percorre os restaurantes em blocos, sem carregar a tabela inteira
+    for r in Restaurante.iter_all():
+        print(f"{r.id} - {r.nome_restaurante} - {r.endereco}")